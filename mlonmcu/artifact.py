@@ -18,6 +18,18 @@
 #
 """Artifacts defintions internally used to refer to intermediate results."""
 
+import io
+import os
+import copy
+import json
+import stat
+import atexit
+import shutil
+import hashlib
+import tarfile
+import tempfile
+import threading
+import uuid
 from enum import Enum
 from pathlib import Path
 
@@ -65,11 +77,91 @@ def lookup_artifacts(artifacts, name=None, fmt=None, flags=None, first_only=Fals
             valid = False
         if valid:
             matches.append(artifact)
-    if len(matches) > 0 and first_only:
-        matches = [matches[0]]
+            if first_only:
+                break
     return matches
 
 
+_EXTRACT_DIR = None
+_EXTRACT_LOCK = threading.Lock()
+
+
+def get_extract_dir():
+    """Return the directory holding the shared extractions of MLF archives.
+
+    If none was set, a temporary directory is created which is removed once the process exits.
+    """
+    global _EXTRACT_DIR
+    with _EXTRACT_LOCK:
+        if _EXTRACT_DIR is None:
+            _EXTRACT_DIR = Path(tempfile.mkdtemp(prefix="mlonmcu_mlf_"))
+            atexit.register(shutil.rmtree, _EXTRACT_DIR, ignore_errors=True)
+        return _EXTRACT_DIR
+
+
+def set_extract_dir(path):
+    """Extract MLF archives to the given directory from now on (None for a temporary directory)."""
+    global _EXTRACT_DIR
+    with _EXTRACT_LOCK:
+        _EXTRACT_DIR = Path(path) if path is not None else None
+
+
+def _make_read_only(path):
+    """Remove the write permissions of all files in the given directory."""
+    for root, _, files in os.walk(path):
+        for name in files:
+            filename = Path(root) / name
+            if filename.is_symlink():
+                continue
+            mode = filename.stat().st_mode
+            os.chmod(filename, mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+
+
+def _link_tree(src, dest):
+    """Reproduce the directory src at dest using hardlinks (or copies if linking is not possible)."""
+    for root, dirs, files in os.walk(src):
+        target_root = Path(dest) / Path(root).relative_to(src)
+        target_root.mkdir(parents=True, exist_ok=True)
+        for name in files:
+            target = target_root / name
+            _replace_file(target)
+            try:
+                os.link(Path(root) / name, target)
+            except OSError:
+                shutil.copy2(Path(root) / name, target)
+
+
+_SPILL_DIR = None
+
+
+def _get_spill_dir():
+    """Return the temporary directory holding the data of evicted artifacts (removed once the process exits)."""
+    global _SPILL_DIR
+    with _EXTRACT_LOCK:
+        if _SPILL_DIR is None:
+            _SPILL_DIR = Path(tempfile.mkdtemp(prefix="mlonmcu_evicted_"))
+            atexit.register(shutil.rmtree, _SPILL_DIR, ignore_errors=True)
+        return _SPILL_DIR
+
+
+def _file_stamp(filename):
+    """Return a stamp identifying the current state of a file or None if it does not exist."""
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def _replace_file(filename):
+    """Remove an existing file before writing it again.
+
+    Exported files may be hardlinks of other files, hence they must never be modified in-place.
+    """
+    if os.path.islink(filename) or os.path.isfile(filename):
+        os.remove(filename)
+
+
 class Artifact:
     """Artifact type."""
 
@@ -88,10 +180,18 @@ class Artifact:
         # TODO: Allow to store filenames as well as raw data
         self.name = name
         # TODO: too many attributes...
-        self.content = content
+        self._content = content
         self.path = path
         self.data = data
-        self.raw = raw
+        self._raw = raw
+        self._file = None  # Most recently written export, used to link further exports
+        self._file_stamp = None
+        self._spill = None  # Private file holding the data of an evicted artifact
+        self._spill_stamp = None
+        self._reference = None  # Latest (file, stamp) holding the data of a checkpointed artifact
+        self._exports = {}  # Destination file -> (stamp of the written file, extracted or stamp of the source path)
+        self._extracted = None  # Shared directory holding the contents of the archive (MLF only)
+        self._metadata = None  # Parsed metadata.json of the archive (MLF only)
         self.fmt = fmt
         self.flags = flags if flags is not None else {}
         self.archive = archive
@@ -101,6 +201,196 @@ class Artifact:
     def __repr__(self):
         return f"Artifact({self.name}, fmt={self.fmt}, flags={self.flags})"
 
+    def _open_spill(self, mode):
+        if _file_stamp(self._spill) != self._spill_stamp:
+            raise RuntimeError(f"The data of the evicted artifact '{self.name}' was modified on disk")
+        if "b" in mode:
+            return open(self._spill, mode)
+        return open(self._spill, mode, encoding="utf-8", newline="")
+
+    @property
+    def content(self):
+        """Get the text content, reading it from disk if it was evicted from memory."""
+        if self._content is None and self._spill is not None:
+            with self._open_spill("r") as handle:
+                return handle.read()
+        return self._content
+
+    @content.setter
+    def content(self, value):
+        self._content = value
+        self._mark_dirty()
+
+    @property
+    def raw(self):
+        """Get the binary data, reading it from disk if it was evicted from memory."""
+        if self._raw is None and self._spill is not None:
+            with self._open_spill("rb") as handle:
+                return handle.read()
+        return self._raw
+
+    @raw.setter
+    def raw(self, value):
+        self._raw = value
+        self._mark_dirty()
+
+    def __copy__(self):
+        new = self.__class__.__new__(self.__class__)
+        new.__dict__.update(self.__dict__)
+        new._exports = dict(self._exports)
+        return new
+
+    def _mark_dirty(self):
+        """Forget about previous exports after the data was modified."""
+        self._file = None
+        self._file_stamp = None
+        self._spill = None
+        self._spill_stamp = None
+        self._reference = None
+        self._exports = {}
+        self._extracted = None
+        self._metadata = None
+
+    def extract(self):
+        """Return a directory holding the contents of the MLF archive.
+
+        The archive is only extracted once into a location derived from its contents, hence equal archives of
+        different runs share the same directory. The extracted files are read-only because exports of the archive
+        link to them.
+        """
+        assert self.fmt == ArtifactFormat.MLF, "extract is only available for ArtifactFormat.MLF"
+        if self._extracted is not None and self._extracted.is_dir():
+            return self._extracted
+        data = self.raw
+        dest = get_extract_dir() / hashlib.sha256(data).hexdigest()
+        if not dest.is_dir():
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            temp_dir = Path(tempfile.mkdtemp(prefix=f"{dest.name}.", dir=dest.parent))
+            try:
+                with tarfile.open(fileobj=io.BytesIO(data), mode="r") as tar_file:
+                    if hasattr(tarfile, "data_filter"):
+                        # Reject absolute paths, links pointing outside of the directory and special files
+                        tar_file.extractall(temp_dir, filter="data")
+                    else:  # Python versions without extraction filters
+                        tar_file.extractall(temp_dir)
+                _make_read_only(temp_dir)
+                os.rename(temp_dir, dest)
+            except OSError:
+                if not dest.is_dir():  # Otherwise the archive was extracted concurrently
+                    raise
+            finally:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+        self._extracted = dest
+        return dest
+
+    @property
+    def metadata(self):
+        """Get the parsed metadata.json of the MLF archive."""
+        if self._metadata is None:
+            with open(self.extract() / "metadata.json", "r") as handle:
+                self._metadata = json.load(handle)
+        return self._metadata
+
+    @property
+    def evicted(self):
+        """Returns true if the data of the artifact is only available on disk."""
+        return self._spill is not None and self._content is None and self._raw is None
+
+    def evict(self, directory=None):
+        """Drop the data of an exported artifact from memory. It will be read from disk on access.
+
+        The exported file may be replaced by other artifacts with the same name later, hence the data is kept in a
+        private file which is linked to the export if possible.
+
+        Parameters
+        ----------
+        directory : Path
+            Directory for the private file. It should be on the same filesystem as the export, otherwise the data
+            has to be copied. Defaults to a temporary directory.
+
+        Returns
+        -------
+        bool
+            True if the artifact is now evicted.
+        """
+        if self.evicted:
+            return True
+        if self.fmt in [ArtifactFormat.TEXT, ArtifactFormat.SOURCE]:
+            attr = "_content"
+        elif self.fmt in [ArtifactFormat.RAW, ArtifactFormat.BIN, ArtifactFormat.MLF, ArtifactFormat.SHARED_OBJECT]:
+            attr = "_raw"
+        else:
+            return False
+        if self._file is None or _file_stamp(self._file) != self._file_stamp:
+            return False  # Not exported or the export was replaced in the meantime
+        if directory is None:
+            directory = _get_spill_dir()
+        else:
+            Path(directory).mkdir(parents=True, exist_ok=True)
+        spill = Path(directory) / uuid.uuid4().hex
+        try:
+            os.link(self._file, spill)
+        except OSError:  # For example: cross-device links or unsupported filesystems
+            shutil.copy2(self._file, spill)
+        self._spill = spill
+        self._spill_stamp = _file_stamp(spill)
+        setattr(self, attr, None)
+        return True
+
+    def detach(self):
+        """Return a copy of the artifact which holds its data in memory and does not refer to exported files."""
+        new = copy.copy(self)
+        new._content = self.content
+        new._raw = self.raw
+        new._file = None
+        new._file_stamp = None
+        new._spill = None
+        new._spill_stamp = None
+        new._reference = None
+        new._exports = {}
+        if new.fmt != ArtifactFormat.PATH:
+            new.path = None
+        return new
+
+    def reference(self, filename):
+        """Return a copy of the artifact which reads its data from the given file instead of holding it in memory.
+
+        The file is linked to the latest export or evicted data if possible and only written if it does not hold the
+        data of the artifact yet. This allows to checkpoint artifacts without serializing their data.
+
+        Parameters
+        ----------
+        filename : Path
+            The file which should hold the data.
+
+        Returns
+        -------
+        Artifact
+            The copy or the artifact itself if it does not hold any data (ArtifactFormat.PATH).
+        """
+        if self.fmt not in [
+            ArtifactFormat.TEXT,
+            ArtifactFormat.SOURCE,
+            ArtifactFormat.RAW,
+            ArtifactFormat.BIN,
+            ArtifactFormat.MLF,
+            ArtifactFormat.SHARED_OBJECT,
+        ]:
+            return self
+        filename = Path(filename)
+        reference = getattr(self, "_reference", None)  # Missing in artifacts pickled by older versions
+        if reference is None or reference[0] != filename or _file_stamp(filename) != reference[1]:
+            filename.parent.mkdir(parents=True, exist_ok=True)
+            self._copy_to(filename)
+            reference = (filename, _file_stamp(filename))
+            self._reference = reference
+        new = copy.copy(self)
+        new._content = None
+        new._raw = None
+        new._spill, new._spill_stamp = reference
+        new._extracted = None  # Shared extractions do not outlive the session
+        return new
+
     @property
     def exported(self):
         """Returns true if the artifact was writtem to disk."""
@@ -131,27 +421,68 @@ class Artifact:
 
         """
         filename = Path(dest) / self.name
-        if self.fmt in [ArtifactFormat.TEXT, ArtifactFormat.SOURCE]:
-            assert not extract, "extract option is only available for ArtifactFormat.MLF"
-            with open(filename, "w", encoding="utf-8") as handle:
-                handle.write(self.content)
-        elif self.fmt in [ArtifactFormat.RAW, ArtifactFormat.BIN]:
+        # Exports are only skipped if the destination still is the file written before (and not a replacement)
+        entry = self._exports.get(filename)
+        up_to_date = entry is not None and _file_stamp(filename) == entry[0]
+        if self.fmt in [ArtifactFormat.PATH]:
             assert not extract, "extract option is only available for ArtifactFormat.MLF"
-            with open(filename, "wb") as handle:
-                handle.write(self.raw)
-        elif self.fmt in [ArtifactFormat.MLF, ArtifactFormat.SHARED_OBJECT]:
-            with open(filename, "wb") as handle:
-                handle.write(self.raw)
+            info = os.stat(self.path)
+            source = (info.st_size, info.st_mtime_ns)
+            if not up_to_date or entry[1] != source:
+                _replace_file(filename)
+                utils.copy(self.path, filename)
+                self._exports[filename] = (_file_stamp(filename), source)
+        elif self.fmt in [
+            ArtifactFormat.TEXT,
+            ArtifactFormat.SOURCE,
+            ArtifactFormat.RAW,
+            ArtifactFormat.BIN,
+            ArtifactFormat.MLF,
+            ArtifactFormat.SHARED_OBJECT,
+        ]:
             if extract:
-                utils.extract(filename, dest)
-                # os.remove(filename)
-        elif self.fmt in [ArtifactFormat.PATH]:
-            assert not extract, "extract option is only available for ArtifactFormat.MLF"
-            utils.copy(self.path, filename)
+                assert self.fmt == ArtifactFormat.MLF, "extract option is only available for ArtifactFormat.MLF"
+            if not up_to_date:
+                self._write(filename)
+                entry = (self._file_stamp, False)
+            if extract and not entry[1]:
+                _link_tree(self.extract(), dest)
+                entry = (entry[0], True)
+            self._exports[filename] = entry
         else:
             raise NotImplementedError
         self.path = filename if self.path is None else self.path
 
+    def _write(self, filename):
+        """Write the data to the given file and use it for further exports."""
+        self._copy_to(filename)
+        self._file = filename
+        self._file_stamp = _file_stamp(filename)
+
+    def _copy_to(self, filename):
+        """Write the data to the given file, using a hardlink if the artifact is already backed by a file."""
+        if self.evicted:
+            source, stamp = self._spill, self._spill_stamp
+        else:
+            source, stamp = self._file, self._file_stamp
+        linked = False
+        if source is not None and Path(source) != Path(filename) and _file_stamp(source) == stamp:
+            _replace_file(filename)
+            try:
+                os.link(source, filename)
+                linked = True
+            except OSError:  # For example: cross-device links or unsupported filesystems
+                pass
+        if not linked:
+            data = self.content if self.fmt in [ArtifactFormat.TEXT, ArtifactFormat.SOURCE] else self.raw
+            _replace_file(filename)
+            if self.fmt in [ArtifactFormat.TEXT, ArtifactFormat.SOURCE]:
+                with open(filename, "w", encoding="utf-8") as handle:
+                    handle.write(data)
+            else:
+                with open(filename, "wb") as handle:
+                    handle.write(data)
+
     def print_summary(self):
         """Utility to print information about an artifact to the cmdline."""
         print("Format:", self.fmt)
@@ -56,6 +56,8 @@ def get_parser(subparsers, parent=None):
 
 def _handle(args, context):
     handle_load(args, ctx=context)
+    if args.resume:
+        return  # The runs of a resumed session are already expanded
     backends = extract_backend_names(args, context=context)
     targets = extract_target_names(args, context=None)
     platforms = extract_platform_names(args, context=context)
@@ -112,12 +112,24 @@ def add_flow_options(parser):
         default=1,
         help="Use multiple threads to process runs in parallel (%(const)s if specified, else %(default)s)",
     )
+    flow_parser.add_argument(
+        "--executor",
+        type=str,
+        choices=["thread", "process"],
+        default="thread",
+        help="Process runs in parallel using worker threads or processes (default: %(default)s)",
+    )
     flow_parser.add_argument(
         "-p",
         "--progress",
         action="store_true",
         help="Display progress bar (default: %(default)s)",
     )
+    flow_parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Only list the stages to process, expected cache hits and the estimated duration (default: %(default)s)",
+    )
     flow_parser.add_argument(
         "--resume",
         action="store_true",
@@ -194,6 +206,13 @@ def kickoff_runs(args, until, context):
         print_report = bool(config["print_report"])
     elif "print_report" in context.environment.vars:
         print_report = bool(context.environment.vars["print_report"])
+    if args.plan:
+        report = session.plan_runs(until=until, num_workers=args.parallel)
+        logger.info("Plan:\n%s", str(report.df))
+        if not args.resume:
+            # Nothing was processed, hence there is no need to keep the session
+            context.discard_session(session)
+        return
     success = session.process_runs(
         until=until,
         per_stage=per_stage,
@@ -202,6 +221,7 @@ def kickoff_runs(args, until, context):
         progress=args.progress,
         context=context,
         export=True,
+        executor=args.executor,
     )
     if not success:
         logger.error("At least one error occured!")
@@ -50,6 +50,8 @@ def get_parser(subparsers):
 
 def _handle(args, context):
     handle_build(args, ctx=context)
+    if args.resume:
+        return  # The runs of a resumed session are already expanded
     targets = extract_target_names(args, context=context)  # This will eventually be ignored below
     platforms = extract_platform_names(args, context=context)
     num = args.num if args.num else [1]
@@ -65,6 +65,8 @@ def _handle(args, context):
     frontends = extract_frontend_names(args, context=context)
     postprocesses = extract_postprocess_names(args, context=context)
     session = context.get_session(label=args.label, resume=args.resume, config=config)
+    if args.resume:
+        return  # The restored runs continue at their next stage
     models = apply_modelgroups(args.models, context=context)
     for model in models:
         run = session.create_run(config=config)
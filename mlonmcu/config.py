@@ -19,6 +19,8 @@
 """Collection of utilities to manage MLonMCU configs."""
 import distutils.util
 import ast
+import copy
+from collections.abc import MutableMapping
 
 from mlonmcu.feature.type import FeatureType
 from mlonmcu.logging import get_logger
@@ -53,9 +55,170 @@ def remove_config_prefix(config, prefix, skip=None):
     return {helper(key): value for key, value in config.items() if f"{prefix}." in key and key not in skip}
 
 
+class ConfigLayer(MutableMapping):
+    """Layer of the hierarchical MLonMCU configuration (global -> session -> run).
+
+    Lookups fall through to the parent layer while updates are only stored in this layer, hence a derived layer (e.g.
+    of a run) only holds its own overrides. The keys of every layer are indexed by their prefix (the part in front of
+    the first dot) to resolve the configuration of a component without iterating over all keys.
+
+    Attributes
+    ----------
+    data : dict
+        The entries stored in this layer.
+    parent : ConfigLayer
+        The layer below this one or None.
+    """
+
+    def __init__(self, data=None, parent=None):
+        self.data = {}
+        self.parent = parent
+        self.index = {}  # prefix -> keys of this layer starting with the prefix
+        self.source = data  # Used to detect derived layers without any overrides
+        if data:
+            self.update(data)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["source"] = None
+        return state
+
+    def __deepcopy__(self, memo):
+        # The parent layers are shared, only the entries of this layer are copied
+        new = ConfigLayer(parent=self.parent)
+        memo[id(self)] = new
+        new.data = copy.deepcopy(self.data, memo)
+        new.index = {prefix: set(keys) for prefix, keys in self.index.items()}
+        return new
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def __getitem__(self, key):
+        if key in self.data:
+            return self.data[key]
+        if self.parent is not None:
+            return self.parent[key]
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.data or (self.parent is not None and key in self.parent)
+
+    def __setitem__(self, key, value):
+        if key not in self.data:
+            self.index.setdefault(key.split(".", 1)[0], set()).add(key)
+        self.data[key] = value
+
+    def __delitem__(self, key):
+        # Only the entries of this layer can be removed
+        del self.data[key]
+        self.index[key.split(".", 1)[0]].discard(key)
+
+    def __iter__(self):
+        yield from self.data
+        if self.parent is not None:
+            for key in self.parent:
+                if key not in self.data:
+                    yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __bool__(self):
+        return len(self.data) > 0 or (self.parent is not None and bool(self.parent))
+
+    def keys_with_prefix(self, prefix):
+        """Return the set of keys in this and all parent layers starting with the given prefix and a dot."""
+        ret = self.parent.keys_with_prefix(prefix) if self.parent is not None else set()
+        candidates = self.index.get(prefix.split(".", 1)[0], ())
+        ret.update(key for key in candidates if key.startswith(f"{prefix}."))
+        return ret
+
+    def derive(self, data=None):
+        """Return a new layer on top of this one which holds the entries of data differing from this layer."""
+        if data is None or data is self.source:
+            return ConfigLayer(parent=self)
+        return ConfigLayer({key: value for key, value in data.items() if key not in self or self[key] != value}, self)
+
+
+class ConfigView(MutableMapping):
+    """Read-only view on a config layer resolving the configuration of a single component lazily.
+
+    Keys are looked up with the component prefix in the underlying layer and fall back to the defaults of the
+    component. Updates are stored in the view itself and never modify the underlying layer.
+
+    Attributes
+    ----------
+    layer : ConfigLayer
+        The underlying configuration.
+    prefix : str
+        The prefix of the component.
+    defaults : dict
+        The default values used if not overwritten by user.
+    required_keys : list
+        The required keys of the component (looked up without the prefix).
+    """
+
+    def __init__(self, layer, prefix, defaults, required_keys):
+        self.layer = layer
+        self.prefix = prefix
+        self.defaults = defaults
+        self.required_keys = required_keys
+        self.overrides = {}
+        self.removed = set()
+
+    def __deepcopy__(self, memo):
+        new = ConfigView(copy.deepcopy(self.layer, memo), self.prefix, self.defaults, self.required_keys)
+        memo[id(self)] = new
+        new.overrides = copy.deepcopy(self.overrides, memo)
+        new.removed = set(self.removed)
+        return new
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def __getitem__(self, key):
+        if key in self.overrides:
+            return self.overrides[key]
+        if key not in self.removed:
+            full_key = f"{self.prefix}.{key}"
+            if full_key in self.layer and full_key not in self.required_keys:
+                return self.layer[full_key]
+            if key in self.required_keys and key in self.layer:
+                return self.layer[key]
+            if key in self.defaults:
+                return self.defaults[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        self.overrides[key] = value
+        self.removed.discard(key)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self.overrides.pop(key, None)
+        self.removed.add(key)
+
+    def __iter__(self):
+        start = len(self.prefix) + 1
+        keys = dict.fromkeys(
+            key[start:] for key in self.layer.keys_with_prefix(self.prefix) if key not in self.required_keys
+        )
+        keys.update(dict.fromkeys(key for key in self.required_keys if key in self.layer))
+        keys.update(dict.fromkeys(self.defaults))
+        keys.update(dict.fromkeys(self.overrides))
+        return (key for key in keys if key not in self.removed)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
 def filter_config(config, prefix, defaults, required_keys):
     """Filter the global config for a given component prefix.
 
+    If the config is a ConfigLayer, a view resolving the keys lazily is returned instead of a filtered copy.
+
     Arguments
     ---------
     config : dict
@@ -76,6 +239,11 @@ def filter_config(config, prefix, defaults, required_keys):
     ------
     AssertionError: If a required key is missing.
     """
+    if isinstance(config, ConfigLayer):
+        cfg = ConfigView(config, prefix, defaults, required_keys)
+        for required in required_keys:
+            assert cfg.get(required) is not None, f"Required config key can not be None: {required}"
+        return cfg
     cfg = remove_config_prefix(config, prefix, skip=required_keys)
     for required in required_keys:
         value = None
@@ -124,16 +292,6 @@ def resolve_required_config(
 
     """
 
-    def get_sublists(in_list):
-        ret = [[]]
-        for i in range(len(in_list) + 1):
-            for j in range(i + 1, len(in_list) + 1):
-                sub = in_list[i:j]
-                ret.append(sub)
-        return ret
-
-    hint_combinations = get_sublists(hints if hints else [])
-
     def get_cache_flags(features):
         result = {}
         if features:
@@ -144,17 +302,14 @@ def resolve_required_config(
 
     ret = {}
     cache_flags = get_cache_flags(features)
+    hints = tuple(hints) if hints else ()
     for key in required_keys:
         if config is None or key not in config:
             assert cache is not None, "No dependency cache was provided. Either provide a cache or config."
             if len(cache) == 0:
                 raise RuntimeError("The dependency cache is empty! Make sure `to run `mlonmcu` setup first.`")
             flags = cache_flags.get(key, ())
-            value = None
-            for hint_combination in hint_combinations:
-                if (key, tuple(list(flags) + hint_combination)) in cache:
-                    value = cache[key, flags]
-                    break
+            value = cache.resolve(key, flags=flags, hints=hints)  # Memoized by the cache
             if value is None:
                 if len(flags) == 0:
                     raise RuntimeError(
@@ -30,6 +30,8 @@ from mlonmcu.utils import ask_user
 from mlonmcu.logging import get_logger, set_log_file
 from mlonmcu.session.run import Run
 from mlonmcu.session.session import Session
+from mlonmcu.session.cache import StageCache
+from mlonmcu.session.history import StageHistory
 from mlonmcu.setup.cache import TaskCache
 import mlonmcu.setup.utils as utils
 
@@ -182,9 +184,8 @@ def load_recent_sessions(env: Environment, count: int = None) -> List[Session]:
         runs = []
         for rid in run_ids:
             run_directory = runs_directory / str(rid)
-            # run_file = run_directory / "run.txt"
-            # run = Run.from_file(run_file)  # TODO: actually implement run restore
-            run = Run()  # TODO: fix
+            run = Run()  # Placeholder, the actual state is restored from its checkpoint when resuming the session
+            run.idx = rid
             run.archived = True
             run.dir = run_directory
             runs.append(run)
@@ -265,6 +266,8 @@ class MlonMcuContext:
         A counter for determining the next session index.
     cache : TaskCache
         The cache where paths of installed dependencies can be looked up.
+    platform_targets : dict
+        The targets supported by the platforms looked up so far (see get_platforms_targets).
 
 
     """
@@ -284,6 +287,7 @@ class MlonMcuContext:
         self.session_idx = self.sessions[-1].idx if len(self.sessions) > 0 else -1
         logger.debug(f"Restored {len(self.sessions)} recent sessions")
         self.cache = TaskCache()
+        self.platform_targets = {}
 
     def create_session(self, label="", config=None):
         """Create a new session in the current context."""
@@ -292,15 +296,31 @@ class MlonMcuContext:
         temp_directory = self.environment.paths["temp"].path
         sessions_directory = temp_directory / "sessions"
         session_dir = sessions_directory / str(idx)
-        session = Session(idx=idx, label=label, dir=session_dir, config=config)
+        stage_cache = StageCache(temp_directory / "cache")
+        history = StageHistory(temp_directory / "history.db")
+        session = Session(
+            idx=idx, label=label, dir=session_dir, config=config, stage_cache=stage_cache, history=history
+        )
         self.sessions.append(session)
         self.session_idx = idx
-        # TODO: move this to a helper function
+        self._update_session_link()
+        return session
+
+    def _update_session_link(self):
+        """Point the latest symlink in the sessions directory to the most recent session (if any)."""
+        sessions_directory = self.environment.paths["temp"].path / "sessions"
         session_link = sessions_directory / "latest"
         if os.path.islink(session_link):
             os.unlink(session_link)
-        os.symlink(session_dir, session_link)
-        return session
+        if len(self.sessions) > 0:
+            os.symlink(sessions_directory / str(self.sessions[-1].idx), session_link)
+
+    def discard_session(self, session):
+        """Remove a session which was not needed from the disk and restore the previous one as latest session."""
+        session.discard()
+        self.sessions.remove(session)
+        self.session_idx = self.sessions[-1].idx if len(self.sessions) > 0 else -1
+        self._update_session_link()
 
     def load_cache(self):
         """If available load the cache.ini file in the deps directory"""
@@ -327,9 +347,13 @@ class MlonMcuContext:
         """
         if resume:
             assert len(self.sessions) > 0, "There is no recent session available"
-            # session = self.sessions[-1]
-            assert False, "The latest session can not be resumed"
-            raise NotImplementedError
+            session = self.sessions[-1]
+            if not session.active:
+                temp_directory = self.environment.paths["temp"].path
+                stage_cache = StageCache(temp_directory / "cache")
+                history = StageHistory(temp_directory / "history.db")
+                session.resume(config=config, stage_cache=stage_cache, history=history)
+            return session
 
         if self.session_idx < 0 or not self.sessions[-1].active:
             self.create_session(label=label, config=config)
@@ -49,7 +49,6 @@ class Backend(ABC):
         self.config = config if config else {}
         self.features = self.process_features(features)
         self.config = filter_config(self.config, self.name, self.DEFAULTS, self.REQUIRED)
-        self.artifacts = []
         self.supported_fmts = []
         self.tuner = None
 
@@ -81,9 +80,9 @@ class Backend(ABC):
 
     def tune_model(self):
         if not self.has_tuner:
-            return
+            return []
             # raise NotImplementedError("Backend does not support autotuning")
-        self.tuner.tune()
+        return self.tuner.tune()
 
     def set_tuning_records(self, filepath):
         if not self.has_tuner:
@@ -96,8 +95,8 @@ class Backend(ABC):
         # TODO: write tuning report to file...
         raise NotImplementedError
 
-    def export_code(self, path):
-        assert len(self.artifacts) > 0, "No artifacts found, please run generate_code() first"
+    def export_code(self, path, artifacts):
+        assert len(artifacts) > 0, "No artifacts found, please run generate_code() first"
 
         if not isinstance(path, Path):
             path = Path(path)
@@ -107,7 +106,7 @@ class Backend(ABC):
             assert (
                 path.is_dir()
             ), "The supplied path does not exists."  # Make sure it actually exists (we do not create it by default)
-            for artifact in self.artifacts:
+            for artifact in artifacts:
                 extract = artifact.fmt == ArtifactFormat.MLF
                 artifact.export(path, extract=extract)
                 # TODO: move the following to a helper function and share code
@@ -120,7 +119,7 @@ class Backend(ABC):
             # Warning: the first artifact is considered as main
             # We need to ensure that all further artifacts share the same prefix
             main_prefix = None
-            for artifact in self.artifacts:
+            for artifact in artifacts:
                 if not main:
                     main_prefix = artifact.name
                 else:
@@ -234,14 +233,14 @@ def main(backend, args=None):
     backend_inst.load_model(model)
     if args.verbose:
         config["print_outputs"] = True
-    backend_inst.generate_code()
+    artifacts = backend_inst.generate_code()
     if args.print:
         print("Printing generated artifacts:")
-        for artifact in backend_inst.artifacts:
+        for artifact in artifacts:
             print(f"=== {artifact.name} ===")
             artifact.print_summary()
             print("=== End ===")
             print()
     else:
         out = args.output
-        backend_inst.export_code(out)
+        backend_inst.export_code(out, artifacts)
@@ -55,9 +55,6 @@ class TFLMCBackend(TFLMBackend):
         super().__init__(features=features, config=config)
         self.model_data = None
         self.prefix = "model"  # Without the _
-        self.artifacts = (
-            []
-        )  # TODO: either make sure that ony one model is processed at a time or move the artifacts to the methods
         # TODO: decide if artifacts should be handled by code (str) or file path or binary data
 
     def generate_header(self):
@@ -118,7 +115,7 @@ size_t model_outputs();
             stdout_artifact = Artifact("tflmc_out.log", content=out, fmt=ArtifactFormat.TEXT)
             artifacts.append(stdout_artifact)
 
-        self.artifacts = artifacts
+        return artifacts
 
 
 if __name__ == "__main__":
@@ -330,9 +330,6 @@ class TFLMIBackend(TFLMBackend):
         self.codegen = TFLMICodegen()
         self.model_data = None
         self.prefix = "model"  # Without the _
-        self.artifacts = (
-            []
-        )  # TODO: either make sure that ony one model is processed at a time or move the artifacts to the methods
         # TODO: decide if artifacts should be handled by code (str) or file path or binary data
 
     @property
@@ -371,7 +368,7 @@ class TFLMIBackend(TFLMBackend):
         )
         artifacts.append(workspace_size_artifact)
         # TODO: stdout_artifact (Would need to invoke TFLMI in subprocess to get stdout)
-        self.artifacts = artifacts
+        return artifacts
 
 
 if __name__ == "__main__":
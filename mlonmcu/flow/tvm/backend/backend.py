@@ -25,6 +25,7 @@ from mlonmcu.models.model import ModelFormats
 from .model_info import get_tflite_model_info, get_relay_model_info, get_pb_model_info
 from .tuner import TVMTuner
 from .python_utils import prepare_python_environment
+from .tvmc_server import get_tvmc_server
 from .tvmc_utils import (
     get_target_tvmc_args,
     get_pass_config_tvmc_args,
@@ -58,6 +59,8 @@ class TVMBackend(Backend):
         "use_tuning_results": False,
         "tvmc_extra_args": [],  # Currently compile subcommand only!
         "tvmc_custom_script": None,
+        "use_tvmc_server": False,  # Compile in long-lived processes instead of starting tvmc for every build
+        "tvmc_server_workers": 0,  # 0: number of CPUs
         # See https://github.com/apache/tvm/blob/1115fd9bc261619ffa0539746ae0aebc46232dc6/python/tvm/autotvm/tophub.py
         "tophub_url": None,
         **{("autotuning_" + key): value for key, value in TVMTuner.DEFAULTS.items()},
@@ -74,9 +77,6 @@ class TVMBackend(Backend):
         self.supported_formats = [ModelFormats.TFLITE, ModelFormats.RELAY, ModelFormats.PB]
 
         self.prefix = "default"
-        self.artifacts = (
-            []
-        )  # TODO: either make sure that ony one model is processed at a time or move the artifacts to the methods
         # TODO: decide if artifacts should be handled by code (str) or file path or binary data
         tuner_config = {  # This would be more compact with a helper function but for now its fine...
             "enable": self.config["autotuning_enable"],
@@ -163,6 +163,15 @@ class TVMBackend(Backend):
     def tvmc_custom_script(self):
         return self.config["tvmc_custom_script"]
 
+    @property
+    def use_tvmc_server(self):
+        value = self.config["use_tvmc_server"]
+        return str2bool(value) if not isinstance(value, (bool, int)) else value
+
+    @property
+    def tvmc_server_workers(self):
+        return int(self.config["tvmc_server_workers"])
+
     @property
     def disabled_passes(self):
         return self.config["disabled_passes"]
@@ -227,13 +236,28 @@ class TVMBackend(Backend):
         ]
         return args
 
-    def invoke_tvmc(self, command, *args, cwd=None):
+    def invoke_tvmc(self, command, *args, cwd=None, timeout=None, cancel_event=None):
         env = prepare_python_environment(self.tvm_pythonpath, self.tvm_build_dir, self.tvm_configs_dir)
+        if self.use_tvmc_server and command == "compile" and self.tvmc_custom_script is None:
+            server = get_tvmc_server(env, max_workers=self.tvmc_server_workers)
+            return server.invoke(
+                command, *args, cwd=cwd, live=self.print_outputs, timeout=timeout, cancel_event=cancel_event
+            )
         if self.tvmc_custom_script is None:
             pre = ["-m", "tvm.driver.tvmc"]
         else:
             pre = [self.tvmc_custom_script]
-        return utils.python(*pre, command, *args, live=self.print_outputs, print_output=False, env=env, cwd=cwd)
+        return utils.python(
+            *pre,
+            command,
+            *args,
+            live=self.print_outputs,
+            print_output=False,
+            env=env,
+            cwd=cwd,
+            timeout=timeout,
+            cancel_event=cancel_event,
+        )
 
     def invoke_tvmc_compile(self, out, dump=None, cwd=None):
         args = self.get_tvmc_compile_args(out)
@@ -61,7 +61,6 @@ class TVMTuner:
         self.tracker = None
         self.servers = []
         self.pool = None
-        self.artifacts = []
         # TODO: Support non-local runners in the future -> deploy simulator on cluster
 
     @property
@@ -287,8 +286,4 @@ class TVMTuner:
             )  # TODO: rename to tvmaot_out.log?
             artifacts.append(stdout_artifact)
 
-        self.artifacts = artifacts
-
-    def get_results(self):
-        # assert self.artifact is not None
-        return self.artifacts
+        return artifacts
@@ -18,8 +18,6 @@
 #
 import sys
 import tempfile
-import json
-import tarfile
 from pathlib import Path
 
 from .backend import TVMBackend
@@ -85,21 +83,16 @@ class TVMAOTBackend(TVMBackend):
         with tempfile.TemporaryDirectory() as temp_dir:
             out_path = Path(temp_dir) / f"{self.prefix}.tar"
             out = self.invoke_tvmc_compile(out_path, dump=dump, cwd=temp_dir)
-            mlf_path = Path(temp_dir) / "mlf"
-            tarfile.open(out_path).extractall(mlf_path)
-            with open(mlf_path / "metadata.json") as handle:
-                metadata = json.load(handle)
-            # metadata_txt = json.dumps(metadata)
             with open(out_path, "rb") as handle:
                 mlf_data = handle.read()
-                artifacts.append(
-                    Artifact(
-                        f"{self.prefix}.tar",
-                        raw=mlf_data,
-                        fmt=ArtifactFormat.MLF,
-                        archive=True,
-                    )
+                mlf_artifact = Artifact(
+                    f"{self.prefix}.tar",
+                    raw=mlf_data,
+                    fmt=ArtifactFormat.MLF,
+                    archive=True,
                 )
+                artifacts.append(mlf_artifact)
+            metadata = mlf_artifact.metadata
             if full:  # FIXME: broken due to error in TVM
                 with open(str(out_path) + ".c", "r") as handle:
                     mod_src = handle.read()
@@ -147,7 +140,7 @@ class TVMAOTBackend(TVMBackend):
             )  # TODO: rename to tvmaot_out.log?
             artifacts.append(stdout_artifact)
         # assert self.target
-        self.artifacts = artifacts
+        return artifacts
 
 
 if __name__ == "__main__":
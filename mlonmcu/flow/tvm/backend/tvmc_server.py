@@ -0,0 +1,285 @@
+#
+# Copyright (c) 2022 TUM Department of Electrical and Computer Engineering.
+#
+# This file is part of MLonMCU.
+# See https://github.com/tum-ei-eda/mlonmcu.git for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Pool of long-lived tvmc processes avoiding the TVM startup cost for every compilation."""
+import os
+import sys
+import json
+import time
+import atexit
+import threading
+import selectors
+import subprocess
+from pathlib import Path
+
+from mlonmcu.logging import get_logger
+from mlonmcu.setup.process import CANCEL_INTERVAL, ProcessCancelled
+from mlonmcu.setup.usage import get_usage
+
+logger = get_logger()
+
+WORKER_SCRIPT = Path(__file__).parent / "tvmc_worker.py"
+CLOSE_TIMEOUT = 5  # Seconds to wait for a worker to exit before killing it
+
+_SERVERS = {}  # Only used by the process which started the workers, see _forget_servers
+_SERVERS_LOCK = threading.Lock()
+
+
+class TVMCWorker:
+    """A single worker process (see tvmc_worker.py) which has imported TVM already.
+
+    Attributes
+    ----------
+    process : subprocess.Popen
+        The worker process.
+    """
+
+    def __init__(self, env):
+        self.process = subprocess.Popen(
+            [sys.executable, str(WORKER_SCRIPT)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=env,
+            text=True,
+        )
+        response = self._receive()
+        if "error" in response:
+            self.close()
+            raise RuntimeError(f"Unable to start tvmc worker:\n{response['error']}")
+
+    def __repr__(self):
+        return f"TVMCWorker(pid={self.process.pid})"
+
+    @property
+    def alive(self):
+        """Returns true if the worker can process further commands."""
+        return self.process.poll() is None
+
+    def _receive(self):
+        line = self.process.stdout.readline()
+        if not line:
+            exit_code = self.process.wait()
+            raise RuntimeError(f"The tvmc worker exited unexpectedly with exit code {exit_code}")
+        return json.loads(line)
+
+    def _wait_response(self, args, timeout, cancel_event):
+        """Wait until the response to a command is available, the worker is killed on a timeout or cancellation."""
+        deadline = time.monotonic() + timeout if timeout else None
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.process.stdout, selectors.EVENT_READ)
+            while True:
+                wait = None
+                if deadline is not None:
+                    wait = deadline - time.monotonic()
+                    if wait <= 0:
+                        self.kill()
+                        raise subprocess.TimeoutExpired(["tvmc", *args], timeout)
+                if cancel_event is not None:
+                    if cancel_event.is_set():
+                        self.kill()
+                        raise ProcessCancelled(["tvmc", *args])
+                    wait = CANCEL_INTERVAL if wait is None else min(wait, CANCEL_INTERVAL)
+                if selector.select(wait):
+                    return
+
+    def invoke(self, args, cwd=None, timeout=None, cancel_event=None):
+        """Process a single tvmc command and return the exit code and output.
+
+        The CPU time of the command is accounted to the usage measured for the calling thread.
+        """
+        args = list(map(str, args))
+        request = {"args": args, "cwd": str(cwd) if cwd is not None else None}
+        self.process.stdin.write(json.dumps(request) + "\n")
+        self.process.stdin.flush()
+        if timeout or cancel_event is not None:
+            self._wait_response(args, timeout, cancel_event)
+        response = self._receive()
+        usage = get_usage()
+        if usage is not None:
+            usage.add_process_usage(response["cpu_time"], response["max_rss"])
+        return response["exit_code"], response["output"]
+
+    def kill(self):
+        """Stop the worker immediately, i.e. while it is busy."""
+        self.process.kill()
+        self.process.wait()
+
+    def close(self):
+        """Stop the worker by closing its input."""
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=CLOSE_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.process.stdout.close()
+
+
+class TVMCServer:
+    """Pool of tvmc workers sharing the same python environment.
+
+    Workers are only started on demand, hence the number of processes is bounded by the number of concurrent
+    compilations. Workers which crashed are replaced transparently by the next invocation.
+
+    Attributes
+    ----------
+    env : dict
+        Environment variables of the workers (i.e. PYTHONPATH pointing to TVM).
+    max_workers : int
+        The maximum number of worker processes.
+    """
+
+    def __init__(self, env, max_workers=None):
+        self.env = env
+        self.max_workers = max_workers if max_workers else (os.cpu_count() or 1)
+        self.idle = []
+        self.num_workers = 0
+        self.closed = False
+        self.cond = threading.Condition()
+
+    def __repr__(self):
+        return f"TVMCServer(max_workers={self.max_workers}, num_workers={self.num_workers})"
+
+    def _acquire(self):
+        with self.cond:
+            while True:
+                assert not self.closed, "The tvmc server was already closed"
+                if len(self.idle) > 0:
+                    return self.idle.pop()
+                if self.num_workers < self.max_workers:
+                    self.num_workers += 1
+                    break
+                self.cond.wait()
+        try:
+            return TVMCWorker(self.env)
+        except BaseException:
+            with self.cond:
+                self.num_workers -= 1
+                self.cond.notify()
+            raise
+
+    def _release(self, worker):
+        with self.cond:
+            keep = worker.alive and not self.closed
+            if keep:
+                self.idle.append(worker)
+            else:
+                self.num_workers -= 1
+            self.cond.notify()
+        if not keep:
+            worker.close()
+
+    def invoke(self, command, *args, cwd=None, live=False, timeout=None, cancel_event=None):
+        """Process a tvmc command in one of the workers.
+
+        Parameters
+        ----------
+        command : str
+            The tvmc subcommand (i.e. compile).
+        args : list
+            Arguments passed to the subcommand.
+        cwd : Path
+            Working directory of the command.
+        live : bool
+            Print the output once the command finished.
+        timeout : float
+            Maximum runtime of the command in seconds. The worker is killed if the timeout expires.
+        cancel_event : threading.Event
+            Optional event to cancel the command from another thread, which also kills the worker.
+
+        Returns
+        -------
+        output : str
+            The combined stdout and stderr of the command.
+
+        Raises
+        ------
+        subprocess.TimeoutExpired
+            If the command did not finish within the timeout.
+        ProcessCancelled
+            If the cancel event was set before the command finished.
+        """
+        worker = self._acquire()
+        try:
+            exit_code, out = worker.invoke([command, *args], cwd=cwd, timeout=timeout, cancel_event=cancel_event)
+        except BaseException:
+            worker.close()  # The state of the worker is unknown
+            raise
+        finally:
+            self._release(worker)
+        if live:
+            print(out, end="")
+        if exit_code != 0:
+            logger.error(out)
+        assert exit_code == 0, "The process returned an non-zero exit code {}! (CMD: `tvmc {}`)".format(
+            exit_code, " ".join(map(str, [command, *args]))
+        )
+        return out
+
+    def close(self):
+        """Stop all idle workers. Busy workers are stopped once their command finished."""
+        with self.cond:
+            self.closed = True
+            idle, self.idle = self.idle, []
+            self.num_workers -= len(idle)
+        for worker in idle:
+            worker.close()
+
+
+def get_tvmc_server(env, max_workers=None):
+    """Return the tvmc server for the given environment, which is started on first use.
+
+    Parameters
+    ----------
+    env : dict
+        Environment variables of the workers.
+    max_workers : int
+        The maximum number of worker processes (only used if the server does not exist yet).
+    """
+    key = tuple(sorted(env.items()))
+    with _SERVERS_LOCK:
+        server = _SERVERS.get(key)
+        if server is None or server.closed:
+            server = TVMCServer(env, max_workers=max_workers)
+            _SERVERS[key] = server
+        return server
+
+
+def shutdown_tvmc_servers():
+    """Stop the workers of all tvmc servers."""
+    with _SERVERS_LOCK:
+        servers = list(_SERVERS.values())
+        _SERVERS.clear()
+    for server in servers:
+        server.close()
+
+
+def _forget_servers():
+    # A forked child must not share the workers (and their pipes) with its parent, it starts its own ones on demand
+    global _SERVERS, _SERVERS_LOCK
+    _SERVERS = {}
+    _SERVERS_LOCK = threading.Lock()
+
+
+atexit.register(shutdown_tvmc_servers)
+if hasattr(os, "register_at_fork"):  # Not available on Windows
+    os.register_at_fork(after_in_child=_forget_servers)
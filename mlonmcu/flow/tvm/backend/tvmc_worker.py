@@ -0,0 +1,127 @@
+#
+# Copyright (c) 2022 TUM Department of Electrical and Computer Engineering.
+#
+# This file is part of MLonMCU.
+# See https://github.com/tum-ei-eda/mlonmcu.git for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Long-lived worker process which imports TVM once and processes tvmc commands received via stdin.
+
+Every request is a single line of JSON (``{"args": [...], "cwd": "..."}``) which is answered with a single line of
+JSON (``{"exit_code": 0, "output": "...", "cpu_time": 1.0, "max_rss": 1024}``). This file is executed as a script in
+the python environment of TVM, hence it may only depend on the standard library.
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import traceback
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def _usage():
+    """Return the CPU time in seconds and the peak RSS in kilobytes of the worker and its finished subprocesses."""
+    if resource is None:
+        return time.process_time(), 0
+    cpu_time = 0.0
+    max_rss = 0
+    for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+        usage = resource.getrusage(who)
+        cpu_time += usage.ru_utime + usage.ru_stime
+        max_rss = max(max_rss, usage.ru_maxrss)
+    return cpu_time, max_rss
+
+
+def _invoke(main, args):
+    """Call the tvmc entry point like the command line would and return its exit code."""
+    sys.argv = ["tvmc", *args]
+    try:
+        ret = main()
+    except SystemExit as e:
+        ret = e.code
+    except Exception:  # Unhandled errors would abort the python interpreter of a regular tvmc invocation
+        traceback.print_exc()
+        return 1
+    if ret is None:
+        return 0
+    if not isinstance(ret, int):
+        print(ret, file=sys.stderr)
+        return 1
+    return ret
+
+
+def _redirect(fd):
+    """Point stdout and stderr to the given file descriptor and return the previous descriptors."""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = (os.dup(1), os.dup(2))
+    os.dup2(fd, 1)
+    os.dup2(fd, 2)
+    return saved
+
+
+def _restore(saved):
+    sys.stdout.flush()
+    sys.stderr.flush()
+    for fd, old in zip((1, 2), saved):
+        os.dup2(old, fd)
+        os.close(old)
+
+
+def serve():
+    """Process requests until stdin is closed."""
+    # The original pipes are only used for the protocol, everything else printed by TVM goes to stderr
+    requests = os.fdopen(os.dup(0), "r")
+    responses = os.fdopen(os.dup(1), "w")
+    null_fd = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(null_fd, 0)
+    os.close(null_fd)
+    os.dup2(2, 1)
+
+    def _respond(data):
+        responses.write(json.dumps(data) + "\n")
+        responses.flush()
+
+    try:
+        from tvm.driver.tvmc import main as tvmc_main
+    except Exception:
+        _respond({"error": traceback.format_exc()})
+        return 1
+    _respond({"ready": True})
+    cwd = os.getcwd()
+    for line in requests:
+        request = json.loads(line)
+        start_cpu_time, _ = _usage()
+        with tempfile.TemporaryFile() as log:
+            saved = _redirect(log.fileno())
+            try:
+                os.chdir(request.get("cwd") or cwd)
+                exit_code = _invoke(tvmc_main.main, request["args"])
+            finally:
+                _restore(saved)
+                os.chdir(cwd)
+            log.seek(0)
+            output = log.read().decode(errors="replace")
+        cpu_time, max_rss = _usage()  # The peak RSS is only known for the whole lifetime of the worker
+        _respond({"exit_code": exit_code, "output": output, "cpu_time": cpu_time - start_cpu_time, "max_rss": max_rss})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(serve())
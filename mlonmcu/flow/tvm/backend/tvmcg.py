@@ -17,11 +17,8 @@
 # limitations under the License.
 #
 import sys
-import io
 import tempfile
-import json
 from pathlib import Path
-import tarfile
 
 from .backend import TVMBackend
 from .tvmrt import TVMRTBackend
@@ -50,20 +47,14 @@ class TVMCGBackend(TVMRTBackend):
         return max_workspace
 
     def generate_code(self):
-        super().generate_code()
-        artifacts = self.artifacts
+        artifacts = super().generate_code()
         artifact = None
         for artifact in artifacts:
             if artifact.fmt == ArtifactFormat.MLF:
                 with tempfile.TemporaryDirectory() as temp_dir:
                     out_file = Path(temp_dir) / "staticrt.c"
-                    mlf_path = Path(temp_dir) / "mlf"
-                    mlf_bytes = io.BytesIO(artifact.raw)
-                    tarfile.open(fileobj=mlf_bytes, mode="r").extractall(mlf_path)
-                    artifact.export(mlf_path, extract=True)
-                    metadata = None
-                    with open(mlf_path / "metadata.json") as handle:
-                        metadata = json.load(handle)
+                    mlf_path = artifact.extract()
+                    metadata = artifact.metadata
                     tvmcg_exe = self.config["utvmcg.exe"]
                     graph_json_file = mlf_path / "executor-config" / "graph" / "graph.json"
                     params_bin_file = mlf_path / "parameters" / "default.params"
@@ -85,7 +76,7 @@ class TVMCGBackend(TVMRTBackend):
                 break
         assert artifact is not None, "Failed to find MLF artifact"
         artifacts.append(artifact)
-        self.artifacts = artifacts
+        return artifacts
 
 
 if __name__ == "__main__":
@@ -18,7 +18,6 @@
 #
 import sys
 import tempfile
-import tarfile
 from pathlib import Path
 
 from .backend import TVMBackend
@@ -52,8 +51,6 @@ class TVMLLVMBackend(TVMBackend):
         with tempfile.TemporaryDirectory() as temp_dir:
             out_path = Path(temp_dir) / f"{self.prefix}.tar"
             out = self.invoke_tvmc_compile(out_path, dump=dump)
-            tar_dir = Path(temp_dir) / self.prefix
-            tarfile.open(out_path).extractall(tar_dir)
 
             with open(out_path, "rb") as handle:
                 mlf_data = handle.read()
@@ -70,7 +67,7 @@ class TVMLLVMBackend(TVMBackend):
                 "tvmc_compile_out.log", content=out, fmt=ArtifactFormat.TEXT
             )  # TODO: rename to tvmllvm_out.log?
             artifacts.append(stdout_artifact)
-        self.artifacts = artifacts
+        return artifacts
 
 
 if __name__ == "__main__":
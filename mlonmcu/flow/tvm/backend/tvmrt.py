@@ -20,7 +20,6 @@ import sys
 import tempfile
 
 # import json
-import tarfile
 from pathlib import Path
 
 from .backend import TVMBackend
@@ -76,21 +75,16 @@ class TVMRTBackend(TVMBackend):
         with tempfile.TemporaryDirectory() as temp_dir:
             out_path = Path(temp_dir) / f"{self.prefix}.tar"
             out = self.invoke_tvmc_compile(out_path, dump=dump)
-            mlf_path = Path(temp_dir) / "mlf"
-            tarfile.open(out_path).extractall(mlf_path)
-            # with open(mlf_path / "metadata.json") as handle:
-            #     metadata = json.load(handle)
-            # metadata_txt = json.dumps(metadata)
             with open(out_path, "rb") as handle:
                 mlf_data = handle.read()
-                artifacts.append(
-                    Artifact(
-                        f"{self.prefix}.tar",
-                        raw=mlf_data,
-                        fmt=ArtifactFormat.MLF,
-                        archive=True,
-                    )
+                mlf_artifact = Artifact(
+                    f"{self.prefix}.tar",
+                    raw=mlf_data,
+                    fmt=ArtifactFormat.MLF,
+                    archive=True,
                 )
+                artifacts.append(mlf_artifact)
+            mlf_path = mlf_artifact.extract()
             if full:
                 with open(str(out_path) + ".c", "r") as handle:
                     mod_src = handle.read()
@@ -135,7 +129,7 @@ class TVMRTBackend(TVMBackend):
         # prepare -> common?
         # invoke_tvmc -> common?
         # generate_wrapper()
-        self.artifacts = artifacts
+        return artifacts
 
 
 if __name__ == "__main__":
@@ -179,11 +179,10 @@ class Frontend(ABC):
         max_outs = len(self.output_formats)
         assert len(artifacts) <= max_outs, f"'{self.name}' frontend should not return more than {max_outs}"
 
-        # If we want to use the same instance of this Frontend in parallel, we need to get rid of self.artifacts...
-        self.artifacts = artifacts
+        return artifacts
 
-    def export_models(self, path):
-        assert len(self.artifacts) > 0, "No artifacts found, please run generate_models() first"
+    def export_models(self, path, artifacts):
+        assert len(artifacts) > 0, "No artifacts found, please run generate_models() first"
 
         if not isinstance(path, Path):
             path = Path(path)
@@ -193,7 +192,7 @@ class Frontend(ABC):
             assert (
                 path.is_dir()
             ), "The supplied path does not exists."  # Make sure it actually exists (we do not create it by default)
-            for artifact in self.artifacts:
+            for artifact in artifacts:
                 artifact.export(path)
         else:
             raise NotImplementedError
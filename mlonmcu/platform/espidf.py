@@ -20,10 +20,8 @@
 
 import os
 import time
-import signal
 import shutil
 import tempfile
-import subprocess
 from pathlib import Path
 import pkg_resources
 
@@ -31,6 +29,8 @@ import serial
 import psutil
 
 from mlonmcu.setup import utils
+from mlonmcu.setup.jobserver import hold_token
+from mlonmcu.setup.process import stream_process
 from mlonmcu.artifact import Artifact, ArtifactFormat
 from mlonmcu.logging import get_logger
 from mlonmcu.target import SUPPORTED_TARGETS
@@ -263,7 +263,8 @@ class EspIdfPlatform(CompilePlatform, TargetPlatform):
             *self.get_idf_cmake_args(),
             "build",
         ]
-        out += self.invoke_idf_exe(*idfArgs, live=self.print_outputs)
+        with hold_token():
+            out += self.invoke_idf_exe(*idfArgs, live=self.print_outputs)
         return out
 
     def generate_elf(self, src, target, model=None, num=1, data_file=None):
@@ -289,7 +290,7 @@ class EspIdfPlatform(CompilePlatform, TargetPlatform):
             "espidf_out.log", content=out, fmt=ArtifactFormat.TEXT  # TODO: split into one file per command
         )  # TODO: rename to tvmaot_out.log?
         artifacts.append(stdout_artifact)
-        self.artifacts = artifacts
+        return artifacts
 
     def get_idf_serial_args(self, monitor=False):
         args = []
@@ -340,11 +341,9 @@ class EspIdfPlatform(CompilePlatform, TargetPlatform):
 
             def _monitor_helper(*args, verbose=False, start_match=None, end_match=None, timeout=60):
                 # start_match and end_match are inclusive
-                if timeout:
-                    pass  # TODO: implement timeout
-                found_start = start_match is None
                 logger.debug("- Executing: %s", str(args))
-                outStr = ""
+                lines = []
+                found = {"start": start_match is None, "end": False}
                 env = os.environ.copy()
                 env["IDF_PATH"] = str(self.espidf_src_dir)
                 env["IDF_TOOLS_PATH"] = str(self.espidf_install_dir)
@@ -354,42 +353,39 @@ class EspIdfPlatform(CompilePlatform, TargetPlatform):
                     + f"> /dev/null && {self.idf_exe} "
                     + " ".join([str(arg) for arg in args])
                 )
-                process = subprocess.Popen(
-                    cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, shell=True, executable="/bin/bash", env=env
-                )
+
+                def _handle_line(line):
+                    if verbose:
+                        print(line)
+                    if start_match and start_match in line:
+                        lines.clear()
+                        found["start"] = True
+                    lines.append(line + "\n")
+                    if found["start"] and end_match and end_match in line:
+                        _kill_monitor()
+                        found["end"] = True
+                        return True  # Terminate the monitor
+                    return False
+
                 try:
-                    exit_code = None
-                    for line in process.stdout:
-                        new_line = line.decode(errors="replace")
-                        if verbose:
-                            print(new_line.replace("\n", ""))
-                        if start_match and start_match in new_line:
-                            outStr = new_line
-                            found_start = True
-                        else:
-                            outStr = outStr + new_line
-                        if found_start:
-                            if end_match and end_match in new_line:
-                                _kill_monitor()
-                                process.terminate()
-                                exit_code = 0
-                    while exit_code is None:
-                        exit_code = process.poll()
+                    exit_code = stream_process(
+                        cmd, line_func=_handle_line, timeout=timeout, shell=True, executable="/bin/bash", env=env
+                    )
+                    if found["end"]:
+                        exit_code = 0
+                    outStr = "".join(lines)
                     if not verbose and exit_code != 0:
                         logger.error(outStr)
                     assert exit_code == 0, "The process returned an non-zero exit code {}! (CMD: `{}`)".format(
                         exit_code, cmd
                     )
                 except KeyboardInterrupt:
-                    logger.debug("Interrupted subprocess. Sending SIGINT signal...")
                     _kill_monitor()
-                    pid = process.pid
-                    os.kill(pid, signal.SIGINT)
+                    outStr = "".join(lines)
                 os.system("reset")
                 return outStr
 
             logger.debug("Monitoring target software")
-            # TODO: implement timeout
             idfArgs = [
                 "-C",
                 self.project_dir,
@@ -463,7 +459,6 @@ class EspIdfPlatform(CompilePlatform, TargetPlatform):
                 return outStr
 
             logger.debug("Monitoring target software")
-            # TODO: implement timeout
             return _monitor_helper2(
                 port,
                 baud,
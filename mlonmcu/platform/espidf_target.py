@@ -19,7 +19,7 @@
 import re
 import os
 
-from mlonmcu.target.target import Target
+from mlonmcu.target.target import Target, restore_target
 from mlonmcu.target.metrics import Metrics
 
 from mlonmcu.logging import get_logger
@@ -63,13 +63,11 @@ def create_espidf_target(name, platform, base=Target):
 
             assert self.platform is not None, "ESP32 targets need a platform to execute programs"
 
-            if self.timeout_sec > 0:
-                raise NotImplementedError
-
             # ESP-IDF actually wants a project directory, but we only get the elf now. As a workaround we
             # assume the elf is right in the build directory inside the project directory
 
-            ret = self.platform.run(program, self)
+            # Benchmarks may take arbitrarily long unless timeout_sec is set
+            ret = self.platform.run(program, self, timeout=self.get_exec_timeout())
             return ret
 
         def parse_stdout(self, out):
@@ -107,4 +105,7 @@ def create_espidf_target(name, platform, base=Target):
         def get_arch(self):
             return "unkwown"
 
+        def __reduce__(self):
+            return (restore_target, (create_espidf_target, (name, platform, base), self.__getstate__()))
+
     return EspIdfTarget
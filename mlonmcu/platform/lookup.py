@@ -27,11 +27,20 @@ def get_platform_names(context):
 
 
 def get_platforms_targets(context):
+    """Return the names of the targets supported by every enabled platform.
+
+    The results are memoized per context as some platforms query the available targets via subprocesses.
+    """
     platform_names = get_platform_names(context)
+    known = getattr(context, "platform_targets", None)
+    if known is None:
+        known = {}
+        context.platform_targets = known
     platform_classes = get_platforms()
     # To initialize the platform we need to provide a config with required paths.
-    platforms = []
     for platform_name in platform_names:
+        if platform_name in known:
+            continue
         platform_cls = platform_classes[platform_name]
         required_keys = platform_cls.REQUIRED
         config = resolve_required_config(
@@ -39,8 +48,8 @@ def get_platforms_targets(context):
             cache=context.cache,
         )
         platform = platform_cls(config=config)
-        platforms.append(platform)
-    return {platform.name: platform.get_supported_targets() for platform in platforms}
+        known[platform_name] = platform.get_supported_targets()
+    return {platform_name: known[platform_name] for platform_name in platform_names}
 
 
 def print_platforms(platform_names):
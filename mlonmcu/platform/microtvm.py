@@ -22,6 +22,7 @@ import tempfile
 from pathlib import Path
 
 from mlonmcu.setup import utils
+from mlonmcu.setup.jobserver import hold_token
 from mlonmcu.logging import get_logger
 from mlonmcu.target import SUPPORTED_TARGETS
 from mlonmcu.target.target import Target
@@ -310,7 +311,8 @@ class MicroTvmPlatform(CompilePlatform, TargetPlatform):
     def compile(self, target):
         out = ""
         # TODO: build with cmake options
-        out += self.invoke_tvmc_micro("build", self.project_dir, None, self.get_template_args(target))
+        with hold_token():
+            out += self.invoke_tvmc_micro("build", self.project_dir, None, self.get_template_args(target))
         # TODO: support self.num_threads (e.g. patch esp-idf)
         return out
 
@@ -324,7 +326,7 @@ class MicroTvmPlatform(CompilePlatform, TargetPlatform):
             "microtvm_out.log", content=out, fmt=ArtifactFormat.TEXT  # TODO: split into one file per command
         )
         artifacts.append(stdout_artifact)
-        self.artifacts = artifacts
+        return artifacts
 
     def flash(self, elf, target, timeout=120):
         # Ignore elf, as we use self.project_dir instead
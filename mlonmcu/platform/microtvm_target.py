@@ -19,7 +19,7 @@
 import re
 import os
 
-from mlonmcu.target.target import Target
+from mlonmcu.target.target import Target, restore_target
 from mlonmcu.target.metrics import Metrics
 
 from mlonmcu.logging import get_logger
@@ -113,4 +113,7 @@ def create_microtvm_target(name, platform, base=Target):
         def get_arch(self):
             return "unkwown"
 
+        def __reduce__(self):
+            return (restore_target, (create_microtvm_target, (name, platform, base), self.__getstate__()))
+
     return MicroTvmTarget
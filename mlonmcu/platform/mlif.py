@@ -108,6 +108,10 @@ class MlifPlatform(CompilePlatform, TargetPlatform):
             base = Target
         return create_mlif_target(name, self, base=base)
 
+    @property
+    def supports_stage_cache(self):
+        return True
+
     @property
     def mlif_dir(self):
         return Path(self.config["mlif.src_dir"])
@@ -219,4 +223,4 @@ class MlifPlatform(CompilePlatform, TargetPlatform):
             "mlif_out.log", content=out, fmt=ArtifactFormat.TEXT
         )  # TODO: rename to tvmaot_out.log?
         artifacts.append(stdout_artifact)
-        self.artifacts = artifacts
+        return artifacts
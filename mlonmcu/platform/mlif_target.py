@@ -18,7 +18,7 @@
 #
 from enum import IntEnum
 
-from mlonmcu.target.target import Target
+from mlonmcu.target.target import Target, restore_target
 from mlonmcu.target.host_x86 import HostX86Target
 from mlonmcu.target.etiss_pulpino import EtissPulpinoTarget
 from mlonmcu.target.corstone300 import Corstone300Target
@@ -108,4 +108,7 @@ def create_mlif_target(name, platform, base=Target):
             ret["TARGET_SYSTEM"] = target_system
             return ret
 
+        def __reduce__(self):
+            return (restore_target, (create_mlif_target, (name, platform, base), self.__getstate__()))
+
     return MlifTarget
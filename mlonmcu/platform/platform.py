@@ -69,7 +69,6 @@ class Platform:
         self.features = self.process_features(features)
         self.config = filter_config(self.config, self.name, self.DEFAULTS, self.REQUIRED)
         # self.context = context
-        self.artifacts = []
 
     def init_directory(self, path=None, context=None):
         raise NotImplementedError
@@ -134,6 +133,11 @@ class CompilePlatform(Platform):
     def supports_compile(self):
         return True
 
+    @property
+    def supports_stage_cache(self):
+        """Returns true if the generated artifacts only depend on the codegen sources, definitions and target."""
+        return False
+
     @property
     def debug(self):
         return bool(self.config["debug"])
@@ -166,15 +170,15 @@ class CompilePlatform(Platform):
     def generate_elf(self, src, target, model=None, num=1, data_file=None):
         raise NotImplementedError
 
-    def export_elf(self, path):
-        assert len(self.artifacts) > 0, "No artifacts found, please run generate_elf() first"
+    def export_elf(self, path, artifacts):
+        assert len(artifacts) > 0, "No artifacts found, please run generate_elf() first"
 
         if not isinstance(path, Path):
             path = Path(path)
         assert (
             path.is_dir()
         ), "The supplied path does not exists."  # Make sure it actually exists (we do not create it by default)
-        for artifact in self.artifacts:
+        for artifact in artifacts:
             artifact.export(path)
 
 
@@ -17,6 +17,11 @@
 # limitations under the License.
 #
 """Definitions of the Report class used by MLonMCU sessions and runs."""
+import os
+import csv
+import json
+import math
+import tempfile
 from pathlib import Path
 import pandas as pd
 
@@ -26,21 +31,118 @@ pd.set_option("display.max_rows", None)
 pd.set_option("display.width", 0)
 
 SUPPORTED_FMTS = ["csv", "xlsx"]
+STREAM_FMTS = ["csv", "jsonl"]
+
+
+PARTS = ["pre", "main", "post"]
+
+
+def _to_json_value(value):
+    """Replace values which are not valid in JSON, e.g. missing (NaN) cells, recursively."""
+    if isinstance(value, dict):
+        return {key: _to_json_value(val) for key, val in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_json_value(val) for val in value]
+    if isinstance(value, float) and not math.isfinite(value):
+        return None if math.isnan(value) else str(value)
+    if value is pd.NA or value is pd.NaT:
+        return None
+    return value
+
+
+def _to_records(data):
+    """Convert the supported report data (list of dicts, dict of lists or dataframe) to a list of row dicts."""
+    if isinstance(data, pd.DataFrame):
+        return data.to_dict("records")
+    if isinstance(data, dict):
+        return pd.DataFrame(data).to_dict("records") if len(data) > 0 else []
+    return list(data)
 
 
 class Report:
-    """Report class wrapped around multiple pandas dataframes."""
+    """Report class wrapped around multiple pandas dataframes.
+
+    Rows are collected in an append-only store and only turned into dataframes on access. The materialized frames
+    are cached until the report is modified. Accessing pre_df, main_df or post_df allows in-place modifications of
+    the returned frame, hence the cached combined df is invalidated by every such access.
+    """
 
     def __init__(self):
-        self.pre_df = pd.DataFrame()
-        self.main_df = pd.DataFrame()
-        self.post_df = pd.DataFrame()
+        self._rows = {part: [] for part in PARTS}  # Pending rows of the parts which are not materialized yet
+        self._frames = {part: None for part in PARTS}
+        self._df = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_df"] = None
+        return state
+
+    def _get_frame(self, part):
+        """Materialize the given part of the report (once) and return the dataframe."""
+        self._df = None  # The returned frame might be modified in-place
+        if self._frames[part] is None:
+            self._frames[part] = pd.DataFrame.from_records(self._rows[part]).reset_index(drop=True)
+            self._rows[part] = None
+        return self._frames[part]
+
+    def _set_frame(self, part, df):
+        self._df = None
+        self._frames[part] = df
+        self._rows[part] = None
+
+    def _get_rows(self, part):
+        """Return the rows of the given part, converting a materialized dataframe back if required."""
+        if self._frames[part] is not None:
+            return self._frames[part].to_dict("records")
+        return self._rows[part]
+
+    @property
+    def pre_df(self):
+        """Get the left third of the dataframe."""
+        return self._get_frame("pre")
+
+    @pre_df.setter
+    def pre_df(self, df):
+        self._set_frame("pre", df)
+
+    @property
+    def main_df(self):
+        """Get the center part of the dataframe."""
+        return self._get_frame("main")
+
+    @main_df.setter
+    def main_df(self, df):
+        self._set_frame("main", df)
+
+    @property
+    def post_df(self):
+        """Get the right third of the dataframe."""
+        return self._get_frame("post")
+
+    @post_df.setter
+    def post_df(self, df):
+        self._set_frame("post", df)
 
     @property
     def df(self):
         """Combine the three internal dataframes to a large one and return in."""
         # TODO: handle this properly by either adding NAN or use a single set(pre=, post=, main=) method
-        return pd.concat([self.pre_df, self.main_df, self.post_df], axis=1)
+        if self._df is None:
+            frames = [self._get_frame(part) for part in PARTS]
+            self._df = pd.concat(frames, axis=1)
+        return self._df
+
+    def to_records(self):
+        """Return the rows of the combined report as list of dicts.
+
+        The rows are merged directly if no part was materialized yet, which avoids creating dataframes.
+        """
+        if all(self._frames[part] is None for part in PARTS):
+            parts = [self._rows[part] for part in PARTS if len(self._rows[part]) > 0]
+            sizes = {len(rows) for rows in parts}
+            if len(sizes) <= 1:
+                return [dict(item for row in rows for item in row.items()) for rows in zip(*parts)]
+        return self.df.to_dict("records")
 
     def export(self, path):
         """Export the report to  a file.
@@ -66,17 +168,22 @@ class Report:
     # def append(self, *args, **kwargs):
     #     self.df = self.df.append(*args, **kwargs, ignore_index=True)
 
+    def _set_rows(self, part, data):
+        self._df = None
+        self._frames[part] = None
+        self._rows[part] = _to_records(data)
+
     def set_pre(self, data):
         """Setter for the left third of the dataframe."""
-        self.pre_df = pd.DataFrame.from_records(data).reset_index(drop=True)
+        self._set_rows("pre", data)
 
     def set_post(self, data):
         """Setter for the right third of the dataframe."""
-        self.post_df = pd.DataFrame.from_records(data).reset_index(drop=True)
+        self._set_rows("post", data)
 
     def set_main(self, data):
         """Setter for the center part of the dataframe."""
-        self.main_df = pd.DataFrame.from_records(data).reset_index(drop=True)
+        self._set_rows("main", data)
 
     def set(self, pre=None, main=None, post=None):
         """Setter for the dataframe."""
@@ -93,7 +200,71 @@ class Report:
         """Helper function to append a line to an existing report."""
         if not isinstance(reports, list):
             reports = [reports]
-        for report in reports:
-            self.pre_df = pd.concat([self.pre_df, report.pre_df], axis=0).reset_index(drop=True)
-            self.main_df = pd.concat([self.main_df, report.main_df], axis=0).reset_index(drop=True)
-            self.post_df = pd.concat([self.post_df, report.post_df], axis=0).reset_index(drop=True)
+        self._df = None
+        for part in PARTS:
+            rows = self._get_rows(part)
+            self._frames[part] = None
+            self._rows[part] = rows
+            for report in reports:
+                rows.extend(report._get_rows(part))
+
+
+class ReportSink:
+    """Writer appending the rows of reports to a file as soon as they are available.
+
+    Only the column names are kept in memory. If a row introduces new columns, the CSV header is extended by
+    rewriting the file line by line.
+
+    Attributes
+    ----------
+    path : Path
+        Destination file. The extension (csv or jsonl) determines the format.
+    columns : list
+        Names of the columns written so far.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.fmt = self.path.suffix[1:]
+        assert self.fmt in STREAM_FMTS, f"Unsupported report format for streaming: {self.fmt}"
+        self.columns = []
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "w", encoding="utf-8"):
+            pass  # Start with an empty file
+
+    def __repr__(self):
+        return f"ReportSink({self.path})"
+
+    def _rewrite_header(self):
+        """Write the CSV file again using the current list of columns (missing values are left empty)."""
+        fd, tmp_file = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as dest:
+                writer = csv.DictWriter(dest, fieldnames=self.columns, restval="")
+                writer.writeheader()
+                with open(self.path, "r", encoding="utf-8", newline="") as src:
+                    for row in csv.DictReader(src):
+                        writer.writerow(row)
+            os.replace(tmp_file, self.path)
+        except BaseException:
+            os.remove(tmp_file)
+            raise
+
+    def write_row(self, row):
+        """Append a single row (dict mapping column names to values) to the file."""
+        if self.fmt == "jsonl":
+            with open(self.path, "a", encoding="utf-8") as handle:
+                handle.write(json.dumps(_to_json_value(row), default=str, allow_nan=False) + "\n")
+            return
+        new_columns = [column for column in row if column not in self.columns]
+        if len(new_columns) > 0:
+            self.columns = self.columns + new_columns
+            self._rewrite_header()
+        with open(self.path, "a", encoding="utf-8", newline="") as handle:
+            writer = csv.DictWriter(handle, fieldnames=self.columns, restval="")
+            writer.writerow(row)
+
+    def write(self, report):
+        """Append all rows of the given report."""
+        for row in report.to_records():
+            self.write_row(row)
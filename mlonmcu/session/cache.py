@@ -0,0 +1,244 @@
+#
+# Copyright (c) 2022 TUM Department of Electrical and Computer Engineering.
+#
+# This file is part of MLonMCU.
+# See https://github.com/tum-ei-eda/mlonmcu.git for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Definition of a content-addressed cache for the results of run stages."""
+import os
+import json
+import pickle
+import hashlib
+import tempfile
+from pathlib import Path
+from collections.abc import Mapping
+
+from mlonmcu.artifact import ArtifactFormat
+from mlonmcu.logging import get_logger
+
+logger = get_logger()
+
+
+def _to_json(value):
+    """Fallback for values which are not json-serializable, e.g. config layers and views."""
+    if isinstance(value, Mapping):
+        return dict(value)
+    return str(value)
+
+
+def hash_data(*values):
+    """Return a stable hash for a set of (json-serializable) values.
+
+    Parameters
+    ----------
+    values : list
+        Values like names, configs or definitions which should be hashed.
+
+    Returns
+    -------
+    str
+        The hexadecimal SHA-256 digest.
+    """
+    data = json.dumps(values, sort_keys=True, default=_to_json)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def hash_artifacts(artifacts, skip_fmts=None):
+    """Return a stable hash over the names, formats and contents of a list of artifacts.
+
+    Parameters
+    ----------
+    artifacts : list
+        The artifacts to hash.
+    skip_fmts : list
+        Optional list of artifact formats which should be ignored.
+
+    Returns
+    -------
+    str
+        The hexadecimal SHA-256 digest.
+    """
+    skip_fmts = skip_fmts if skip_fmts is not None else []
+    hasher = hashlib.sha256()
+    for artifact in artifacts:
+        if artifact.fmt in skip_fmts:
+            continue
+        hasher.update(artifact.name.encode("utf-8"))
+        hasher.update(str(artifact.fmt.value).encode("utf-8"))
+        if artifact.fmt in [ArtifactFormat.TEXT, ArtifactFormat.SOURCE]:
+            hasher.update(artifact.content.encode("utf-8"))
+        elif artifact.fmt in [ArtifactFormat.PATH]:
+            with open(artifact.path, "rb") as handle:
+                hasher.update(handle.read())
+        else:
+            hasher.update(artifact.raw)
+    return hasher.hexdigest()
+
+
+def hash_files(paths):
+    """Return a hash identifying the current state of the given files.
+
+    Only the file metadata (size and modification time) is used, which is sufficient to detect a rebuilt or updated
+    simulator without reading large binaries. Directories are not scanned, hence the executables and a file which is
+    replaced by every installation (e.g. the main library) should be passed instead of installation directories.
+
+    Parameters
+    ----------
+    paths : list
+        The files.
+
+    Returns
+    -------
+    str
+        The hexadecimal SHA-256 digest.
+    """
+    hasher = hashlib.sha256()
+    for path in paths:
+        path = Path(path)
+        hasher.update(str(path).encode("utf-8"))
+        try:
+            stat = path.stat()
+        except OSError:  # For example missing files or broken symlinks
+            continue
+        hasher.update(f":{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+    return hasher.hexdigest()
+
+
+class StageCache:
+    """On-disk cache holding the artifacts produced by run stages, addressed by a hash of the stage inputs.
+
+    Attributes
+    ----------
+    directory : Path
+        The root directory of the cache. Every stage gets its own subdirectory.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    def __repr__(self):
+        return f"StageCache({self.directory})"
+
+    def _get_entry_file(self, stage, key):
+        return self.directory / str(stage).lower() / key[:2] / f"{key}.pkl"
+
+    def _get_signature_file(self, stage, signature):
+        return self.directory / str(stage).lower() / "signatures" / f"{signature}.txt"
+
+    def lookup(self, stage, key):
+        """Lookup the artifacts stored for the given stage and key.
+
+        Parameters
+        ----------
+        stage : str
+            Name of the stage.
+        key : str
+            Hash of the stage inputs.
+
+        Returns
+        -------
+        list or None
+            The cached artifacts or None if the cache does not hold a (valid) entry.
+        """
+        entry_file = self._get_entry_file(stage, key)
+        if not entry_file.is_file():
+            return None
+        try:
+            with open(entry_file, "rb") as handle:
+                artifacts = pickle.load(handle)
+        except Exception as err:  # A corrupted entry should never fail a run
+            logger.warning("Ignoring invalid stage cache entry %s: %s", entry_file, err)
+            return None
+        return artifacts
+
+    def lookup_signature(self, stage, signature):
+        """Check if the cache holds an entry which was stored by a run with the given stage signature.
+
+        Unlike the key, the signature only depends on the configuration of the run and is available before any stage
+        was processed. A match hence only predicts a cache hit.
+
+        Parameters
+        ----------
+        stage : str
+            Name of the stage.
+        signature : str
+            Signature of the stage (see Run.get_stage_signature).
+
+        Returns
+        -------
+        bool
+            True if a matching entry exists.
+        """
+        try:
+            key = self._get_signature_file(stage, signature).read_text().strip()
+        except OSError:
+            return False
+        return len(key) > 0 and self._get_entry_file(stage, key).is_file()
+
+    def add_signature(self, stage, signature, key):
+        """Remember that a run with the given stage signature uses the entry with the given key."""
+        signature_file = self._get_signature_file(stage, signature)
+        signature_file.parent.mkdir(parents=True, exist_ok=True)
+        # Replace the file atomically, parallel lookups could otherwise read a partial key
+        fd, tmp_file = tempfile.mkstemp(dir=signature_file.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as handle:
+                handle.write(key)
+            os.replace(tmp_file, signature_file)
+        except BaseException:
+            os.remove(tmp_file)
+            raise
+
+    def store(self, stage, key, artifacts, signature=None):
+        """Store the artifacts of a stage in the cache.
+
+        Artifacts referring to files outside of the cache (ArtifactFormat.PATH) can not be stored safely, hence such
+        stages are ignored.
+
+        Parameters
+        ----------
+        stage : str
+            Name of the stage.
+        key : str
+            Hash of the stage inputs.
+        artifacts : list
+            The artifacts to store.
+        signature : str
+            Optional signature of the stage used to predict cache hits (see lookup_signature).
+
+        Returns
+        -------
+        bool
+            True if the artifacts have been written to the cache.
+        """
+        if any(artifact.fmt == ArtifactFormat.PATH for artifact in artifacts):
+            logger.debug("Artifacts of stage %s can not be cached", stage)
+            return False
+        # The data is copied into the entry because the location is specific to the run which produced the artifact
+        entries = [artifact.detach() for artifact in artifacts]
+        entry_file = self._get_entry_file(stage, key)
+        entry_file.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first to never expose partial entries to parallel runs or sessions
+        fd, tmp_file = tempfile.mkstemp(dir=entry_file.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                pickle.dump(entries, handle)
+            os.replace(tmp_file, entry_file)
+        except BaseException:
+            os.remove(tmp_file)
+            raise
+        if signature is not None:
+            self.add_signature(stage, signature, key)
+        return True
@@ -0,0 +1,162 @@
+#
+# Copyright (c) 2022 TUM Department of Electrical and Computer Engineering.
+#
+# This file is part of MLonMCU.
+# See https://github.com/tum-ei-eda/mlonmcu.git for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Database of previous stage durations used to estimate the duration of runs."""
+import time
+import sqlite3
+from pathlib import Path
+
+from mlonmcu.logging import get_logger
+
+logger = get_logger()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS durations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    model TEXT NOT NULL,
+    backend TEXT NOT NULL,
+    target TEXT NOT NULL,
+    features TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    duration REAL NOT NULL,
+    timestamp REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS durations_key ON durations (model, backend, target, features, stage);
+"""
+
+
+def get_history_key(run):
+    """Return the (model, backend, target, features) tuple identifying a run in the history."""
+    return (
+        run.model.name if run.model else "",
+        run.backend.name if run.backend else "",
+        run.target.name if run.target else "",
+        ",".join(sorted(run.get_all_feature_names())),
+    )
+
+
+class StageHistory:
+    """SQLite database holding the durations of previously processed stages.
+
+    Only the most recent samples for every combination of model, backend, target, feature set and stage are kept.
+    Estimates for combinations without samples fall back to the average over all feature sets.
+
+    Attributes
+    ----------
+    path : Path
+        The database file.
+    num_samples : int
+        The number of recent samples kept and averaged for every combination.
+    """
+
+    def __init__(self, path, num_samples=5):
+        self.path = Path(path)
+        self.num_samples = num_samples
+        self.means = None  # (model, backend, target, features, stage) -> average duration
+        self.coarse_means = None  # (model, backend, target, stage) -> average duration
+
+    def __repr__(self):
+        return f"StageHistory({self.path})"
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["means"] = None
+        state["coarse_means"] = None
+        return state
+
+    def _connect(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.executescript(_SCHEMA)
+        return connection
+
+    def record(self, entries):
+        """Add the durations of processed stages to the database.
+
+        Parameters
+        ----------
+        entries : list
+            Tuples of history key (see get_history_key), stage name and duration in seconds.
+        """
+        if len(entries) == 0:
+            return
+        now = time.time()
+        try:
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.executemany(
+                        "INSERT INTO durations (model, backend, target, features, stage, duration, timestamp)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        [(*key, stage, duration, now) for key, stage, duration in entries],
+                    )
+                    # Drop everything but the most recent samples of the updated combinations
+                    for combination in {(*key, stage) for key, stage, _ in entries}:
+                        connection.execute(
+                            "DELETE FROM durations WHERE model=? AND backend=? AND target=? AND features=? AND stage=?"
+                            " AND id NOT IN (SELECT id FROM durations WHERE model=? AND backend=? AND target=?"
+                            " AND features=? AND stage=? ORDER BY id DESC LIMIT ?)",
+                            (*combination, *combination, self.num_samples),
+                        )
+            finally:
+                connection.close()
+        except sqlite3.Error as err:  # The history is only used for estimates and should never fail a session
+            logger.warning("Unable to update stage history %s: %s", self.path, err)
+        self.means = None
+
+    def load(self):
+        """Read the average durations of all combinations from the database."""
+        self.means = {}
+        self.coarse_means = {}
+        if not self.path.is_file():
+            return
+        try:
+            connection = self._connect()
+            try:
+                rows = connection.execute(
+                    "SELECT model, backend, target, features, stage, AVG(duration), COUNT(*) FROM durations"
+                    " GROUP BY model, backend, target, features, stage"
+                ).fetchall()
+            finally:
+                connection.close()
+        except sqlite3.Error as err:
+            logger.warning("Unable to read stage history %s: %s", self.path, err)
+            return
+        totals = {}
+        for model, backend, target, features, stage, mean, count in rows:
+            self.means[(model, backend, target, features, stage)] = mean
+            total, num = totals.get((model, backend, target, stage), (0.0, 0))
+            totals[(model, backend, target, stage)] = (total + mean * count, num + count)
+        self.coarse_means = {combination: total / num for combination, (total, num) in totals.items()}
+
+    def estimate(self, key, stage):
+        """Return the expected duration of a stage in seconds or None if it was never processed before.
+
+        Parameters
+        ----------
+        key : tuple
+            The history key of the run (see get_history_key).
+        stage : str
+            Name of the stage.
+        """
+        if self.means is None:
+            self.load()
+        ret = self.means.get((*key, stage))
+        if ret is None:
+            ret = self.coarse_means.get((*key[:3], stage))
+        return ret
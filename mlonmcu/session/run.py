@@ -20,7 +20,9 @@
 import itertools
 import os
 import copy
+import pickle
 import tempfile
+import subprocess
 from pathlib import Path
 from enum import IntEnum
 
@@ -28,7 +30,7 @@ from mlonmcu.logging import get_logger
 from mlonmcu.artifact import ArtifactFormat, lookup_artifacts
 from mlonmcu.platform.platform import CompilePlatform, TargetPlatform
 from mlonmcu.report import Report  # TODO: move to mlonmcu.session.report
-from mlonmcu.config import resolve_required_config, filter_config
+from mlonmcu.config import ConfigLayer, resolve_required_config, filter_config, str2bool
 from mlonmcu.models.lookup import lookup_models
 from mlonmcu.feature.type import FeatureType
 from mlonmcu.feature.features import get_matching_features, get_available_features
@@ -36,12 +38,18 @@ from mlonmcu.target.metrics import Metrics
 from mlonmcu.models import SUPPORTED_FRONTENDS
 from mlonmcu.platform import get_platforms
 from mlonmcu.flow import SUPPORTED_FRAMEWORKS, SUPPORTED_BACKENDS
+from mlonmcu.setup.usage import measure_usage
+from mlonmcu.setup.trace import trace_span
 
+from .cache import hash_data, hash_artifacts, hash_files
 from .postprocess import SUPPORTED_POSTPROCESSES
 from .postprocess.postprocess import RunPostprocess
 
 logger = get_logger()
 
+# Metrics which are expected to differ between two simulations of the same program
+VOLATILE_METRICS = ["MIPS", "Runtime [s]"]
+
 
 class RunStage(IntEnum):
     """Type describing the stages a run can have."""
@@ -56,6 +64,13 @@ class RunStage(IntEnum):
     DONE = 7
 
 
+# Stages which may be shared between runs with equal stage inputs
+SHARED_STAGES = [RunStage.LOAD, RunStage.TUNE, RunStage.BUILD, RunStage.COMPILE]
+
+# Stages which may be restored from the stage cache
+CACHED_STAGES = [RunStage.BUILD, RunStage.COMPILE, RunStage.RUN]
+
+
 class Run:
     """A run is single model/backend/framework/target combination with a given set of features and configs."""
 
@@ -65,14 +80,37 @@ class Run:
         "export_optional": False,
         "tune_enabled": False,
         "target_to_backend": False,
+        "use_cache": False,
+        "cache_verify": 0.0,  # Fraction of RUN stage cache hits which should be re-simulated to detect drift
+        "checkpoint": True,  # Write the state of the run to its directory after every stage to allow resuming
+        "evict_artifacts": True,  # Drop the data of exported artifacts from memory and read it from disk on access
     }
 
     REQUIRED = []
 
     @classmethod
-    def from_file(cls, path):
-        """Restore a run object which was written to the disk."""
-        raise NotImplementedError
+    def from_file(cls, path, session=None):
+        """Restore a run object from a checkpoint file written by Run.write_checkpoint.
+
+        Parameters
+        ----------
+        path : Path
+            The checkpoint file.
+        session : Session
+            The session which should own the restored run.
+
+        Returns
+        -------
+        Run
+            The restored run which continues at its next not yet completed stage.
+        """
+        with open(path, "rb") as handle:
+            state = pickle.load(handle)
+        run = cls.__new__(cls)
+        run.__dict__.update(state)
+        run.session = session
+        run.archived = True  # Keep the index and directory of the restored run
+        return run
 
     def __init__(
         self,
@@ -105,20 +143,27 @@ class Run:
         self.comment = comment
         # self.stage = RunStage.NOP  # max executed stage
         self.completed = {stage: stage == RunStage.NOP for stage in RunStage}
+        self._shared_config = None  # Config the components are bound to while they are shared with copies of the run
 
         self.init_directory()
         self.target = target
         self.cache_hints = []
-        self.config = config if config else {}
+        # Only the entries differing from the session config are stored per run
+        self.config = session.global_config.derive(config) if session else ConfigLayer(config)
         self.features = features if features else []
-        self.run_config = config if config else {}
         self.run_features = self.process_features(features)
-        self.run_config = filter_config(self.run_config, "run", self.DEFAULTS, self.REQUIRED)
+        self.run_config = filter_config(self.config, "run", self.DEFAULTS, self.REQUIRED)
         self.result = None
         self.failing = False  # -> RunStatus
+        self.failure = None  # Description of the error which let the run fail
+        self.failure_origin = None  # Index of the run with equal stage inputs which failed first
         # self.lock = threading.Lock()  # FIXME: use mutex instead of boolean
         self.locked = False
         self.report = None
+        self.metadata_config = {}
+        self.stage_usage = {}  # Time and resources consumed by every processed stage
+        self.cached_stages = set()  # Stages restored from the stage cache
+        self.plan_signatures = None  # Signatures of the cached stages before processing the run
 
     def process_features(self, features):
         """Utility which handles postprocess_features."""
@@ -127,7 +172,7 @@ class Run:
         features = get_matching_features(features, FeatureType.RUN)
         for feature in features:
             assert feature.name in self.FEATURES, f"Incompatible feature: {feature.name}"
-            feature.add_run_config(self.run_config)
+            feature.add_run_config(self.config)
         return features
 
     @property
@@ -140,6 +185,36 @@ class Run:
         """Get target_to_backend property."""
         return bool(self.run_config["target_to_backend"])
 
+    @property
+    def use_cache(self):
+        """Get use_cache property."""
+        value = self.run_config["use_cache"]
+        return str2bool(value) if not isinstance(value, (bool, int)) else value
+
+    @property
+    def cache_verify(self):
+        """Get cache_verify property."""
+        return float(self.run_config["cache_verify"])
+
+    @property
+    def checkpoint(self):
+        """Get checkpoint property."""
+        value = self.run_config["checkpoint"]
+        return str2bool(value) if not isinstance(value, (bool, int)) else value
+
+    @property
+    def evict_artifacts(self):
+        """Get evict_artifacts property."""
+        value = self.run_config["evict_artifacts"]
+        return str2bool(value) if not isinstance(value, (bool, int)) else value
+
+    @property
+    def stage_cache(self):
+        """Get the stage cache of the session if enabled for this run."""
+        if not self.use_cache or self.session is None:
+            return None
+        return self.session.stage_cache
+
     @property
     def compile_platform(self):
         """Get platform for compile stage."""
@@ -191,6 +266,7 @@ class Run:
 
     def lock(self):
         """Aquire a mutex to lock the current run."""
+        self._own_state()  # The run is about to be modified
         # ret = self.lock.acquire(timeout=0)
         ret = not self.locked
         self.locked = True
@@ -202,8 +278,20 @@ class Run:
         # self.lock.release()
         self.locked = False
 
+    @property
+    def dir(self):
+        """Get the directory of the run, which is created on first use."""
+        if self._dir is None:
+            self.init_directory()
+        return self._dir
+
+    @dir.setter
+    def dir(self, value):
+        self._dir = value
+
     def init_directory(self):
         """Initialize the temporary directory for this run."""
+        self._own_state()  # The platforms are updated
         if self.session is None:
             assert not self.archived
             self.tempdir = tempfile.TemporaryDirectory()
@@ -219,16 +307,53 @@ class Run:
                 platform.init_directory(path=Path(self.dir) / platform.name)
 
     def copy(self):
-        """Create a new run based on this instance."""
-        new = copy.deepcopy(self)
+        """Create a new run based on this instance.
+
+        The session, the model, the features and the frontends are always shared. The components and artifacts are
+        shared with this run until one of both runs modifies them, i.e. by adding further components, processing or
+        exporting the run (see Run._own_state). Until then, the components resolve their config via this run. The
+        directory of the new run is only created once it is used.
+        """
+        new = copy.copy(self)
+        new.config = copy.deepcopy(self.config)  # Only the overrides of this run are copied
+        new.run_config = copy.deepcopy(self.run_config, {id(self.config): new.config})
+        new.completed = dict(self.completed)
+        new.stage_usage = dict(self.stage_usage)
+        new.cached_stages = set(self.cached_stages)
+        new.metadata_config = dict(self.metadata_config)
+        new.cache_hints = list(self.cache_hints)
+        new.locked = False
+        new.report = None
+        if self._shared_config is None:
+            self._shared_config = self.config
+        new._shared_config = self._shared_config
+        new.tempdir = None
+        new.dir = None
         if self.session:
             new_idx = self.session.request_run_idx()
             new.idx = new_idx
-            self.init_directory()
         return new
 
-    def init_component(self, component_cls, context=None):
-        """Helper function to create and configure a MLonMCU component instance for this run."""
+    def _own_state(self):
+        """Copy the components and artifacts shared with other runs (see Run.copy) before modifying them.
+
+        The copied components are bound to the config of this run.
+        """
+        if self._shared_config is None:
+            return
+        shared = [self.session, self.model, *self.features, *self.frontends]
+        memo = {id(obj): obj for obj in shared if obj is not None}
+        memo[id(self._shared_config)] = self.config
+        for name in ["backend", "framework", "target", "platforms", "postprocesses", "artifacts_per_stage"]:
+            setattr(self, name, copy.deepcopy(getattr(self, name), memo))
+        self._shared_config = None
+
+    def init_component(self, component_cls, context=None, shared=False):
+        """Helper function to create and configure a MLonMCU component instance for this run.
+
+        Stateless components (shared=True) are only instantiated once per session for every combination of class,
+        features and config.
+        """
         required_keys = component_cls.REQUIRED
         self.config.update(
             resolve_required_config(
@@ -239,8 +364,16 @@ class Run:
                 hints=self.cache_hints,
             )
         )
-        component_config = self.config.copy()  # TODOL get rid of this
-        return component_cls(features=self.features, config=component_config)
+        # Components resolve their config lazily via a view on the config of the run
+        if shared and self.session is not None:
+            key = hash_data(
+                component_cls.__module__,
+                component_cls.__qualname__,
+                [(feature.name, feature.config) for feature in self.features],
+                self.config.data,  # The remaining layers are shared by all runs of the session
+            )
+            return self.session.lookup_component(key, lambda: component_cls(features=self.features, config=self.config))
+        return component_cls(features=self.features, config=self.config)
 
     def add_model(self, model):
         """Setter for the model instance."""
@@ -256,6 +389,7 @@ class Run:
 
     def add_backend(self, backend):
         """Setter for the backend instance."""
+        self._own_state()
         self.backend = backend
         # assert len(self.platforms) > 0, "Add at least a platform before adding a backend."
         if self.model is not None:
@@ -268,6 +402,7 @@ class Run:
 
     def add_framework(self, framework):
         """Setter for the framework instance."""
+        self._own_state()
         self.framework = framework
         # assert len(self.platforms) > 0, "Add at least a platform before adding a framework."
         for platform in self.platforms:
@@ -275,6 +410,7 @@ class Run:
 
     def add_target(self, target):
         """Setter for the target instance."""
+        self._own_state()
         self.target = target
         assert self.platforms is not None, "Add at least a platform before adding a target."
         for platform in self.platforms:
@@ -284,6 +420,7 @@ class Run:
 
     def add_platform(self, platform):
         """Setter for the platform instance."""
+        self._own_state()
         self.platforms = [platform]
         if self.backend:
             self.backend.add_platform_defs(platform.name, platform.definitions)
@@ -292,6 +429,7 @@ class Run:
 
     def add_platforms(self, platforms):
         """Setter for the list of platforms."""
+        self._own_state()
         self.platforms = platforms
         for platform in platforms:
             if self.backend:
@@ -301,6 +439,7 @@ class Run:
 
     def add_postprocess(self, postprocess, append=False):
         """Setter for a postprocess instance."""
+        self._own_state()
         if append:
             self.postprocesses.append(postprocess)
         else:
@@ -308,6 +447,7 @@ class Run:
 
     def add_postprocesses(self, postprocesses, append=False):
         """Setter for the list of postprocesses."""
+        self._own_state()
         if append:
             self.postprocesses.extend(postprocesses)
         else:
@@ -317,13 +457,13 @@ class Run:
         """Setter for a feature instance."""
         self.features = [feature]
         self.run_features = self.process_features(self.features)
-        self.run_config = filter_config(self.run_config, "run", self.DEFAULTS, self.REQUIRED)
+        self.run_config = filter_config(self.config, "run", self.DEFAULTS, self.REQUIRED)
 
     def add_features(self, features, append=False):
         """Setter for the list of features."""
         self.features = features if not append else self.features + features
         self.run_features = self.process_features(self.features)
-        self.run_config = filter_config(self.run_config, "run", self.DEFAULTS, self.REQUIRED)
+        self.run_config = filter_config(self.config, "run", self.DEFAULTS, self.REQUIRED)
 
     def pick_model_frontend(self, model_hints, backend=None):
         assert len(model_hints) > 0
@@ -362,7 +502,8 @@ class Run:
             assert context is not None and context.environment.has_frontend(
                 name
             ), f"The frontend '{name}' is not enabled for this environment"
-            frontends.append(self.init_component(SUPPORTED_FRONTENDS[name], context=context))
+            # Frontends do not hold any state of the processed model, hence they can be shared between runs
+            frontends.append(self.init_component(SUPPORTED_FRONTENDS[name], context=context, shared=True))
         self.add_frontends(frontends)
 
     def add_backend_by_name(self, backend_name, context=None):
@@ -464,6 +605,7 @@ class Run:
 
     def export_stage(self, stage, optional=False, subdir=False):
         """Export stage artifacts of this run to its directory."""
+        self._own_state()  # The artifacts keep track of their exports
         # TODO: per stage subdirs?
         if stage in self.artifacts_per_stage:
             artifacts = self.artifacts_per_stage[stage]
@@ -473,12 +615,38 @@ class Run:
                     if subdir:
                         stage_idx = int(stage)
                         dest = dest / f"stage_{stage_idx}"
+                        dest.mkdir(parents=True, exist_ok=True)
                     extract = artifact.fmt == ArtifactFormat.MLF
                     # extract = artifact.fmt == ArtifactFormat.MLF and not isinstance(self.platform, MicroTvmPlatform)
-                    artifact.export(self.dir)
+                    artifact.export(dest)
                     # Keep the tar as well as the extracted files
                     if extract:
-                        artifact.export(self.dir, extract=True)
+                        artifact.export(dest, extract=True)
+
+    def get_executable_artifact(self):
+        """Return the artifact which is executed by the target in the RUN stage."""
+        if self.has_stage(RunStage.COMPILE):
+            return self.artifacts_per_stage[RunStage.COMPILE][0]
+        return self.artifacts_per_stage[RunStage.BUILD][0]  # Used for tvm platform
+
+    def verify_cached_metrics(self, cached_artifacts, artifacts):
+        """Compare the metrics of a RUN stage cache hit against the ones of the current simulation."""
+        cached_metrics = Metrics.from_csv(lookup_artifacts(cached_artifacts, name="metrics.csv")[0].content)
+        metrics = Metrics.from_csv(lookup_artifacts(artifacts, name="metrics.csv")[0].content)
+        cached_data = cached_metrics.get_data(include_optional=True)
+        data = metrics.get_data(include_optional=True)
+        drift = {
+            key: (cached_data.get(key), data.get(key))
+            for key in set(cached_data) | set(data)
+            if key not in VOLATILE_METRICS and cached_data.get(key) != data.get(key)
+        }
+        if len(drift) > 0:
+            logger.warning(
+                "%s Cached results of stage RUN differ from simulation (cached, actual): %s", self.prefix, drift
+            )
+            return False
+        logger.debug("%s Verified cached results of stage RUN", self.prefix)
+        return True
 
     def postprocess(self):
         """Postprocess the 'run'."""
@@ -504,27 +672,128 @@ class Run:
         logger.debug("%s Processing stage RUN", self.prefix)
         self.lock()
         # Alternative: drop artifacts of higher stages when re-triggering a lower one?
+        hit, key = False, None
+        if self.target.deterministic:
+            hit, key = self.lookup_stage_cache(RunStage.RUN)
+            if hit:
+                if not self.sample_cache_verify(key):
+                    self.completed[RunStage.RUN] = True
+                    self.unlock()
+                    return
+                cached_artifacts = self.artifacts_per_stage[RunStage.RUN]
         if self.has_stage(RunStage.COMPILE):
             assert self.completed[RunStage.COMPILE]
             self.export_stage(RunStage.COMPILE, optional=self.export_optional)
             elf_artifact = self.artifacts_per_stage[RunStage.COMPILE][0]
-            self.target.generate_metrics(elf_artifact.path)
+            artifacts = self.target.generate_metrics(elf_artifact.path)
         else:
             assert self.completed[RunStage.BUILD]  # Used for tvm platform
             self.export_stage(RunStage.BUILD, optional=self.export_optional)
             shared_object_artifact = self.artifacts_per_stage[RunStage.BUILD][0]
-            self.target.generate_metrics(shared_object_artifact.path, num=self.num)
-        self.artifacts_per_stage[RunStage.RUN] = self.target.artifacts
+            artifacts = self.target.generate_metrics(shared_object_artifact.path, num=self.num)
+        if hit and self.verify_cached_metrics(cached_artifacts, artifacts):
+            key = None  # Nothing to update
+        self.artifacts_per_stage[RunStage.RUN] = artifacts
+        self.update_stage_cache(RunStage.RUN, key)
 
         self.completed[RunStage.RUN] = True
         self.unlock()
 
+    def get_stage_key(self, stage):
+        """Returns a hash of all inputs of the given stage which is used to lookup its results in the stage cache."""
+        if stage == RunStage.BUILD:
+            model_artifact = self.artifacts_per_stage[RunStage.LOAD][0]
+            return hash_data(
+                RunStage.BUILD.name,
+                hash_artifacts([model_artifact]),
+                hash_artifacts(self.artifacts_per_stage.get(RunStage.TUNE, [])),
+                self.framework.name,
+                self.framework.config,
+                self.backend.name,
+                self.backend.config,
+                self.get_all_feature_names(),
+            )
+        if stage == RunStage.COMPILE:
+            platform = self.compile_platform
+            return hash_data(
+                RunStage.COMPILE.name,
+                # Logs and metrics are not used by the compile stage
+                hash_artifacts(self.artifacts_per_stage[RunStage.BUILD], skip_fmts=[ArtifactFormat.TEXT]),
+                hash_artifacts(lookup_artifacts(self.artifacts_per_stage[RunStage.LOAD], name="data.c")),
+                platform.name,
+                platform.config,
+                platform.definitions,
+                self.target.name,
+                self.target.config,
+                self.num,
+                self.get_all_feature_names(),
+            )
+        if stage == RunStage.RUN:
+            files = self.target.get_simulator_files()
+            return hash_data(
+                RunStage.RUN.name,
+                hash_artifacts([self.get_executable_artifact()]),
+                self.target.name,
+                self.target.config,
+                self.session.hash_files(files) if self.session is not None else hash_files(files),
+                self.num,
+                self.get_all_feature_names(),
+            )
+        raise NotImplementedError(f"Stage {RunStage(stage).name} does not support caching")
+
+    def sample_cache_verify(self, key):
+        """Decide if a RUN stage cache hit should be verified by simulating again.
+
+        The decision is derived from the cache key, hence it is reproducible while a fraction of cache_verify of all
+        keys is verified.
+        """
+        return int(key[:16], 16) / 16**16 < self.cache_verify
+
+    def lookup_stage_cache(self, stage):
+        """Try to restore the artifacts of the given stage from the stage cache.
+
+        Returns
+        -------
+        tuple
+            Wether the lookup was successful and the key used for the lookup (None if caching is disabled).
+        """
+        cache = self.stage_cache
+        if cache is None:
+            return False, None
+        key = self.get_stage_key(stage)
+        artifacts = cache.lookup(RunStage(stage).name, key)
+        if artifacts is None:
+            logger.debug("%s Stage cache miss for stage %s", self.prefix, RunStage(stage).name)
+            return False, key
+        logger.debug("%s Restored stage %s from stage cache", self.prefix, RunStage(stage).name)
+        self.artifacts_per_stage[stage] = artifacts
+        self.cached_stages.add(stage)
+        if self.plan_signatures and stage in self.plan_signatures:
+            cache.add_signature(RunStage(stage).name, self.plan_signatures[stage], key)
+        return True, key
+
+    def update_stage_cache(self, stage, key):
+        """Write the artifacts of the given stage to the stage cache."""
+        cache = self.stage_cache
+        if cache is None or key is None:
+            return
+        signature = self.plan_signatures.get(stage) if self.plan_signatures else None
+        cache.store(RunStage(stage).name, key, self.artifacts_per_stage[stage], signature=signature)
+
     def compile(self):
         """Compile the target software for the run."""
         logger.debug("%s Processing stage COMPILE", self.prefix)
         self.lock()
         assert self.completed[RunStage.BUILD]
 
+        key = None
+        if self.compile_platform.supports_stage_cache:
+            hit, key = self.lookup_stage_cache(RunStage.COMPILE)
+            if hit:
+                self.completed[RunStage.COMPILE] = True
+                self.unlock()
+                return
+
         self.export_stage(RunStage.BUILD, optional=self.export_optional)
         codegen_dir = self.dir
         data_file = None
@@ -532,8 +801,9 @@ class Run:
             if artifact.name == "data.c":
                 artifact.export(self.dir)
                 data_file = Path(self.dir) / "data.c"
-        self.compile_platform.generate_elf(codegen_dir, self.target, num=self.num, data_file=data_file)
-        self.artifacts_per_stage[RunStage.COMPILE] = self.compile_platform.artifacts
+        artifacts = self.compile_platform.generate_elf(codegen_dir, self.target, num=self.num, data_file=data_file)
+        self.artifacts_per_stage[RunStage.COMPILE] = artifacts
+        self.update_stage_cache(RunStage.COMPILE, key)
 
         self.completed[RunStage.COMPILE] = True
         self.unlock()
@@ -544,12 +814,13 @@ class Run:
         self.lock()
         assert (not self.has_stage(RunStage.TUNE)) or self.completed[RunStage.TUNE]
 
-        if self.target_to_backend:
-            assert self.target is not None, "Config target_to_backend can only be used if a target was provided"
-            cfg = self.target.get_backend_config(self.backend.name)  # Do not expect a backend prefix here
-            if len(cfg) > 0:
-                logger.debug("Updating backend config based on given target.")
-                self.backend.config.update(cfg)
+        self.update_backend_config()
+
+        hit, key = self.lookup_stage_cache(RunStage.BUILD)
+        if hit:
+            self.completed[RunStage.BUILD] = True
+            self.unlock()
+            return
 
         self.export_stage(RunStage.LOAD, optional=self.export_optional)  # Not required anymore?
         model_artifact = self.artifacts_per_stage[RunStage.LOAD][0]
@@ -566,8 +837,8 @@ class Run:
                 self.backend.tuning_records = tuning_artifact.path
 
         # TODO: allow raw data as well as filepath in backends
-        self.backend.generate_code()
-        self.artifacts_per_stage[RunStage.BUILD] = self.backend.artifacts
+        self.artifacts_per_stage[RunStage.BUILD] = self.backend.generate_code()
+        self.update_stage_cache(RunStage.BUILD, key)
 
         self.completed[RunStage.BUILD] = True
         self.unlock()
@@ -585,55 +856,207 @@ class Run:
 
         # TODO: allow raw data as well as filepath in backends
         self.backend.load_model(model=model_artifact.path)
-        self.backend.tune_model()
-        if self.backend.tuner is not None:
-            res = self.backend.tuner.get_results()
-            if res:
-                self.artifacts_per_stage[RunStage.TUNE] = res
-            else:
-                self.artifacts_per_stage[RunStage.TUNE] = []
-        else:
-            self.artifacts_per_stage[RunStage.TUNE] = []
+        res = self.backend.tune_model()
+        self.artifacts_per_stage[RunStage.TUNE] = res if res else []
 
         self.completed[RunStage.TUNE] = True
         self.unlock()
 
+    def update_backend_config(self):
+        """Apply the target-specific backend configuration if enabled."""
+        self._own_state()
+        if self.target_to_backend:
+            assert self.target is not None, "Config target_to_backend can only be used if a target was provided"
+            cfg = self.target.get_backend_config(self.backend.name)  # Do not expect a backend prefix here
+            if len(cfg) > 0:
+                logger.debug("Updating backend config based on given target.")
+                self.backend.config.update(cfg)
+
+    def apply_metadata_config(self, cfg):
+        """Update the configuration of the run components based on the config derived from the model metadata."""
+        self._own_state()
+        for key, value in cfg.items():
+            component, name = key.split(".")[:2]
+            if self.backend is not None and component == self.backend.name:
+                self.backend.config[name] = value
+            else:
+                for platform in self.platforms:
+                    if platform is not None and component == platform.name:
+                        platform.config[name] = value
+            self.config[key] = value
+
     def load(self):
         """Load the model using the given frontend."""
         logger.debug("%s Processing stage LOAD", self.prefix)
         self.lock()
         # assert self.completed[RunStage.NOP]
 
-        self.frontend.generate_models(self.model)
+        artifacts = self.frontend.generate_models(self.model)
         # The following is very very dirty but required to update arena sizes via model metadata...
         cfg_new = {}
         data_artifact = self.frontend.process_metadata(self.model, cfg=cfg_new)
-        if len(cfg_new) > 0:
-            for key, value in cfg_new.items():
-                component, name = key.split(".")[:2]
-                if self.backend is not None and component == self.backend.name:
-                    self.backend.config[name] = value
-                else:
-                    for platform in self.platforms:
-                        if platform is not None and component == platform.name:
-                            platform.config[name] = value
-                self.config[key] = value
-        self.artifacts_per_stage[RunStage.LOAD] = self.frontend.artifacts
+        self.apply_metadata_config(cfg_new)
+        self.metadata_config = cfg_new
+        self.artifacts_per_stage[RunStage.LOAD] = artifacts
         if data_artifact:
             self.artifacts_per_stage[RunStage.LOAD].append(data_artifact)
 
         self.completed[RunStage.LOAD] = True
         self.unlock()
 
-    def process(self, until=RunStage.RUN, skip=None, export=False):
-        """Process the run until a given stage."""
+    def get_stage_signature(self, stage):
+        """Returns a hash of the configuration of all components involved until the given stage.
+
+        Runs with equal signatures for a stage are expected to produce the same results in this stage.
+        """
+
+        def component_data(component):
+            return [component.name, component.config] if component is not None else None
+
+        data = [
+            self.run_config,
+            self.get_all_feature_names(),
+            [self.model.name, self.model.paths, self.model.config] if self.model else None,
+            [component_data(frontend) for frontend in self.frontends],
+        ]
+        if stage >= RunStage.TUNE:
+            data.append(component_data(self.backend))
+        if stage == RunStage.TUNE:
+            data.append(component_data(self.target))  # Tuning measures on the target
+        if stage >= RunStage.BUILD:
+            data.append(component_data(self.framework))
+            # Untuned builds without target-specific backend options are shared between targets
+            if self.target_to_backend or self.has_stage(RunStage.TUNE):
+                data.append(component_data(self.target))
+        if stage >= RunStage.COMPILE:
+            data.append([component_data(platform) + [platform.definitions] for platform in self.platforms])
+            data.append(component_data(self.target))
+            data.append(self.num)
+        return hash_data(RunStage(stage).name, *data)
+
+    def adopt_stage(self, stage, other):
+        """Take over the results of a stage which was processed by another run with equal stage inputs."""
+        logger.debug("%s Sharing results of stage %s with %s", self.prefix, RunStage(stage).name, other.prefix)
+        self.lock()
+        artifacts = []
+        for artifact in other.artifacts_per_stage.get(stage, []):
+            artifact = copy.copy(artifact)
+            if artifact.fmt != ArtifactFormat.PATH:
+                artifact.path = None  # Needs to be exported to the directory of this run
+            artifacts.append(artifact)
+        self.artifacts_per_stage[stage] = artifacts
+        if stage == RunStage.LOAD:
+            self.apply_metadata_config(other.metadata_config)
+            self.metadata_config = other.metadata_config
+        elif stage == RunStage.BUILD:
+            self.update_backend_config()
+        self.completed[stage] = True
+        self.unlock()
+
+    def get_stage_results(self, stages):
+        """Collect the results of the given stages and the status of the run to pass them to another process.
+
+        Parameters
+        ----------
+        stages : list
+            The stages whose artifacts and usage should be included.
+
+        Returns
+        -------
+        dict
+            The results which can be merged into a copy of this run via Run.apply_stage_results.
+        """
+        return {
+            "artifacts_per_stage": {
+                stage: self.artifacts_per_stage[stage] for stage in stages if stage in self.artifacts_per_stage
+            },
+            "completed": {stage: self.completed[stage] for stage in stages},
+            "stage_usage": {stage: self.stage_usage[stage] for stage in stages if stage in self.stage_usage},
+            "cached_stages": [stage for stage in stages if stage in self.cached_stages],
+            "metadata_config": self.metadata_config,
+            "plan_signatures": self.plan_signatures,
+            "failing": self.failing,
+            "failure": self.failure,
+            "failure_origin": self.failure_origin,
+            "report": self.report,
+        }
+
+    def apply_stage_results(self, results):
+        """Merge the results of stages which were processed by a copy of this run in another process.
+
+        The components of the run are kept and only updated like after processing the stages locally.
+        """
+        self.lock()
+        self.artifacts_per_stage.update(results["artifacts_per_stage"])
+        self.completed.update(results["completed"])
+        self.stage_usage.update(results["stage_usage"])
+        self.cached_stages.update(results["cached_stages"])
+        if results["completed"].get(RunStage.LOAD):
+            self.apply_metadata_config(results["metadata_config"])
+        self.metadata_config = results["metadata_config"]
+        if results["completed"].get(RunStage.BUILD):
+            self.update_backend_config()
+        self.plan_signatures = results["plan_signatures"]
+        self.failing = results["failing"]
+        self.failure = results["failure"]
+        self.failure_origin = results["failure_origin"]
+        self.report = results["report"]
+        self.unlock()
+
+    @property
+    def timed_out(self):
+        """Returns true if the run failed because a command exceeded its timeout."""
+        return self.failing and self.failure is not None and self.failure.startswith("Timeout:")
+
+    def propagate_failure(self, stage, origin, error):
+        """Mark the run as failed because another run with equal inputs already failed in the given stage.
+
+        Parameters
+        ----------
+        stage : RunStage
+            The failed stage.
+        origin : int
+            Index of the failed run.
+        error : str
+            Description of the error of the failed run.
+        """
+        self.failing = True
+        self.failure = error
+        self.failure_origin = origin
+        logger.error(
+            "%s Skipping stage '%s' because run %s failed with equal inputs: %s",
+            self.prefix,
+            RunStage(stage).name,
+            origin,
+            error,
+        )
+
+    def process(self, until=RunStage.RUN, skip=None, export=False, shared=None):
+        """Process the run until a given stage.
+
+        Parameters
+        ----------
+        until : RunStage
+            The last stage to process.
+        skip : list
+            Stages which should not be processed.
+        export : bool
+            Write the artifacts and report of the run to its directory.
+        shared : SharedStageRegistry
+            Optional registry used to share stages with other runs instead of processing them again.
+
+        Returns
+        -------
+        Report or None
+            The report of the run if it was exported.
+        """
         skip = skip if skip is not None else []
         if until == RunStage.DONE:
             until = RunStage.DONE - 1
         start = self.next_stage  # self.stage hold the max finished stage
         if until < start:
             logger.debug("%s Nothing to do", self.prefix)
-            return self.get_report()
+            return self.export_results() if export else None
 
         if start > RunStage.NOP:
             logger.debug(
@@ -652,6 +1075,9 @@ class Run:
                 str(RunStage(until).name),
                 # str(self),
             )
+        if self.stage_cache is not None and self.plan_signatures is None and start <= RunStage.LOAD:
+            # The metadata applied in the LOAD stage changes the signatures, keep the ones known to Session.plan_runs
+            self.plan_signatures = {stage: self.get_stage_signature(stage) for stage in CACHED_STAGES}
         for stage in range(start, until + 1):
             if not self.has_stage(stage):
                 continue
@@ -672,24 +1098,91 @@ class Run:
             func = stage_funcs[stage]
             if func:
                 self.failing = False
+                self.failure = None
+                self.failure_origin = None
+                entry = None
+                if shared is not None and stage in SHARED_STAGES:
+                    leader, entry = shared.claim(self.get_stage_signature(stage), self)
+                    if not leader:
+                        other = entry.wait()
+                        if other is not None:
+                            self.adopt_stage(stage, other)
+                            self.write_checkpoint()
+                            continue
+                        if shared.fail_fast and entry.error is not None:
+                            self.propagate_failure(stage, entry.leader.idx, entry.error)
+                            self.write_checkpoint()
+                            break
+                        entry = None  # The leader failed, try to process the stage on our own
+                usage = None
                 try:
-                    func()
+                    with trace_span(f"{RunStage(stage).name} (run {self.idx})", cat="stage", args={"run": self.idx}):
+                        with measure_usage() as usage:
+                            func()
                 except Exception as e:
                     self.failing = True
+                    kind = "Timeout" if isinstance(e, subprocess.TimeoutExpired) else type(e).__name__
+                    self.failure = f"{kind}: {e}"
                     if self.locked:
                         self.unlock()
                     logger.exception(e)
                     run_stage = RunStage(stage).name
                     logger.error("%s Run failed at stage '%s', aborting...", self.prefix, run_stage)
                     break
+                finally:
+                    if usage is not None:
+                        self.stage_usage[stage] = usage
+                    if entry is not None:
+                        entry.publish(None if self.failing else self, error=self.failure if self.failing else None)
+                self.write_checkpoint()
             # self.stage = stage  # FIXME: The stage_func should update the stage intead?
-        report = self.get_report()
         if export:
-            self.export(optional=self.export_optional)  # TODO: set to flase?
-            report_file = Path(self.dir) / "report.csv"
-            report.export(report_file)
+            return self.export_results()
+        return None
+
+    def export_results(self):
+        """Write the artifacts and the report of the run to its directory and return the report."""
+        report = self.get_report()
+        self.export(optional=self.export_optional)  # TODO: set to flase?
+        report_file = Path(self.dir) / "report.csv"
+        report.export(report_file)
         return report
 
+    def write_checkpoint(self):
+        """Write the state of the run to a run.pkl file in its directory which can be restored via Run.from_file.
+
+        The data of the artifacts is stored in the checkpoint directory of the run once and only referenced by the
+        state, which keeps the cost of checkpointing after every stage low.
+        """
+        if not self.checkpoint or self.session is None:
+            return  # Temporary run directories do not outlive the process
+        self._own_state()  # The restored components have to be bound to the restored config
+        state = self.__dict__.copy()
+        state["session"] = None
+        state["tempdir"] = None
+        state["locked"] = False
+        filename = Path(self.dir) / "run.pkl"
+        try:
+            directory = Path(self.dir) / "checkpoint"
+            state["artifacts_per_stage"] = {
+                stage: [
+                    artifact.reference(directory / RunStage(stage).name.lower() / f"{i}-{Path(artifact.name).name}")
+                    for i, artifact in enumerate(artifacts)
+                ]
+                for stage, artifacts in self.artifacts_per_stage.items()
+            }
+            # Write to a temporary file first to never leave a partial checkpoint behind
+            fd, tmp_file = tempfile.mkstemp(dir=self.dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as handle:
+                    pickle.dump(state, handle)
+                os.replace(tmp_file, filename)
+            except BaseException:
+                os.remove(tmp_file)
+                raise
+        except Exception as err:  # A failing checkpoint should never fail the run itself
+            logger.warning("%s Unable to write checkpoint: %s", self.prefix, err)
+
     def write_run_file(self):
         """Create a run.txt file which contains information used to reconstruct the run based
         on its properties at a later point in time."""
@@ -777,15 +1270,8 @@ class Run:
             ret.update(config_helper(postprocess))
         return ret
 
-    def get_report(self):
-        """Returns teh complete report of this run."""
-        if self.completed[RunStage.POSTPROCESS]:
-            if self.report is not None:
-                return (
-                    self.report
-                )  # Use postprocessed report instead of generating a new one (TODO: find a better approach)
-        # TODO: config or args for stuff like (session id) and run id as well as detailed features and configs
-        report = Report()
+    def get_report_pre(self):
+        """Returns the report columns identifying this run."""
         pre = {}
         if self.session is not None:
             pre["Session"] = self.session.idx
@@ -804,6 +1290,10 @@ class Run:
         if self.target:
             pre["Target"] = self.target.name
         pre["Num"] = self.num
+        return pre
+
+    def get_report_post(self):
+        """Returns the report columns describing the configuration and status of this run."""
         post = {}
         post["Features"] = self.get_all_feature_names()
         post["Config"] = self.get_all_configs(omit_paths=True, omit_defaults=True, omit_globals=True)
@@ -811,6 +1301,20 @@ class Run:
         post["Comment"] = self.comment if len(self.comment) > 0 else "-"
         if self.failing:
             post["Failing"] = True
+            post["Status"] = "Timeout" if self.timed_out else "Failed"
+        return post
+
+    def get_report(self):
+        """Returns teh complete report of this run."""
+        if self.completed[RunStage.POSTPROCESS]:
+            if self.report is not None:
+                return (
+                    self.report
+                )  # Use postprocessed report instead of generating a new one (TODO: find a better approach)
+        # TODO: config or args for stuff like (session id) and run id as well as detailed features and configs
+        report = Report()
+        pre = self.get_report_pre()
+        post = self.get_report_post()
 
         self.export_stage(RunStage.RUN, optional=self.export_optional)
 
@@ -835,9 +1339,24 @@ class Run:
             metrics = run_metrics
 
         main = metrics.get_data(include_optional=self.export_optional)
-        report.set(pre=[pre], main=[main] if len(main) > 0 else {"Incomplete": [True]}, post=[post])
+        if len(main) == 0:
+            main = {"Incomplete": True}
+        if self.export_optional:
+            main.update(self.get_usage_data())
+        report.set(pre=[pre], main=[main], post=[post])
         return report
 
+    def get_usage_data(self):
+        """Return the time and resources consumed by the processed stages as report columns."""
+        data = {}
+        for stage, usage in sorted(self.stage_usage.items()):
+            name = RunStage(stage).name.capitalize()
+            data[f"{name} Time [s]"] = round(usage.wall_time, 3)
+            data[f"{name} CPU Time [s]"] = round(usage.cpu_time + usage.child_cpu_time, 3)
+            if usage.num_processes > 0:
+                data[f"{name} Peak Memory [MB]"] = round(usage.max_rss / 1024, 1)
+        return data
+
     def export(self, path=None, optional=False):
         """Write a run configuration to a disk."""
         logger.debug("%s Exporting run to disk", self.prefix)
@@ -848,6 +1367,9 @@ class Run:
             if not self.has_stage(stage):
                 continue
             self.export_stage(stage, optional=optional)
+            if self.evict_artifacts:
+                for artifact in self.artifacts_per_stage.get(stage, []):
+                    artifact.evict(directory=self.session.spill_dir if self.session else None)
 
         self.write_run_file()
 
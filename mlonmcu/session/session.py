@@ -18,6 +18,7 @@
 #
 """Definition of a MLonMCU Run which represents a set of benchmarks in a session."""
 import os
+import heapq
 import shutil
 import tempfile
 import multiprocessing
@@ -30,11 +31,17 @@ from tqdm import tqdm
 
 from mlonmcu.session.run import Run
 from mlonmcu.logging import get_logger
-from mlonmcu.report import Report
-from mlonmcu.config import filter_config
+from mlonmcu.report import Report, ReportSink
+from mlonmcu.config import ConfigLayer, filter_config, str2bool
+from mlonmcu.artifact import set_extract_dir
+from mlonmcu.setup.jobserver import Jobserver, set_jobserver
+from mlonmcu.setup.trace import Tracer, set_tracer
 
 from .postprocess.postprocess import SessionPostprocess
-from .run import RunStage
+from .shared import SharedStageRegistry
+from .history import get_history_key
+from .cache import hash_files
+from .run import RunStage, SHARED_STAGES, CACHED_STAGES
 
 logger = get_logger()  # TODO: rename to get_mlonmcu_logger
 
@@ -48,21 +55,59 @@ class SessionStatus(Enum):  # TODO: remove?
     ERROR = 3
 
 
+_WORKER_RUNS = None  # Runs of the session in a worker process, inherited from the main process when forking
+
+
+def _init_worker(runs):
+    """Initialize a worker process with the runs of the session."""
+    global _WORKER_RUNS
+    _WORKER_RUNS = runs
+
+
+def _process_run(run_index, results, until, skip, export):
+    """Process a run in a worker process and send the results of the processed stages back to the main process.
+
+    The copy of the run in the worker is brought up to date with the results of the main process first.
+    """
+    run = _WORKER_RUNS[run_index]
+    run.apply_stage_results(results)
+    start = run.next_stage
+    run.process(until=until, skip=skip, export=export)
+    # Exporting evicts the artifacts of all stages, the main process should only read them from disk from now on
+    stages = [stage for stage in RunStage if export or start <= stage <= until]
+    return run.get_stage_results(stages)
+
+
 class Session:
     """A session which wraps around multiple runs in a context."""
 
     DEFAULTS = {
         "report_fmt": "csv",
+        "stream_report": True,  # Append the row of every finished run to the session and results report immediately
+        "stream_fmt": "jsonl",
+        "share_stages": True,  # Process stages with equal inputs only once for all runs
+        # Maximum number of runs processing a stage at the same time (0: unlimited)
+        "load_workers": 0,
+        "tune_workers": 0,
+        "build_workers": 0,
+        "compile_workers": 0,
+        "run_workers": 0,
+        "postprocess_workers": 0,
+        "use_jobserver": True,  # Share a pool of job tokens between all build tools invoked by the runs
+        "jobserver_tokens": 0,  # 0: number of CPUs
+        "trace": False,  # Write a timeline of all stages and commands to trace.json (Chrome trace event format)
+        "use_history": True,  # Record stage durations in the environment to process the longest runs first
+        "fail_fast": True,  # Fail runs right away if a run with equal stage inputs already failed in this stage
     }
 
-    def __init__(self, label="", idx=None, archived=False, dir=None, config=None):
+    def __init__(self, label="", idx=None, archived=False, dir=None, config=None, stage_cache=None, history=None):
         self.timestamp = datetime.now().strftime("%Y%m%dT%H%M%S")
         self.label = (
             label if len(label) > 0 else ("unnamed" + "_" + self.timestamp)
         )  # TODO: decide if named sessions should also get a timestamp?
         self.idx = idx
-        self.config = config if config else {}
-        self.config = filter_config(self.config, "session", self.DEFAULTS, [])
+        self.global_config = ConfigLayer(config)  # Base layer of the configs of all runs in this session
+        self.config = filter_config(self.global_config, "session", self.DEFAULTS, [])
         self.status = SessionStatus.CREATED
         self.opened_at = None
         self.closed_at = None
@@ -70,6 +115,10 @@ class Session:
         self.report = None
         self.next_run_idx = 0
         self.archived = archived
+        self.stage_cache = stage_cache
+        self.history = history
+        self.components = {}  # Component instances shared between runs (see Run.init_component)
+        self.file_hashes = {}  # States of simulator files (see Session.hash_files)
         if dir is None:
             assert not self.archived
             self.tempdir = tempfile.TemporaryDirectory()
@@ -80,6 +129,8 @@ class Session:
             if not self.dir.is_dir():
                 self.dir.mkdir(parents=True)
         self.runs_dir = self.dir / "runs"
+        self.mlf_dir = self.dir / "mlf"  # Shared extractions of MLF archives (removed when closing the session)
+        self.spill_dir = self.dir / "evicted"  # Data of evicted artifacts, next to the exports to link them
         if not os.path.exists(self.runs_dir):
             os.mkdir(self.runs_dir)
         if not self.archived:
@@ -95,6 +146,57 @@ class Session:
         """get report_fmt property."""
         return str(self.config["report_fmt"])
 
+    @property
+    def stream_report(self):
+        """get stream_report property."""
+        value = self.config["stream_report"]
+        return str2bool(value) if not isinstance(value, (bool, int)) else value
+
+    @property
+    def stream_fmt(self):
+        """get stream_fmt property."""
+        return str(self.config["stream_fmt"])
+
+    @property
+    def trace(self):
+        """get trace property."""
+        value = self.config["trace"]
+        return str2bool(value) if not isinstance(value, (bool, int)) else value
+
+    @property
+    def share_stages(self):
+        """get share_stages property."""
+        value = self.config["share_stages"]
+        return str2bool(value) if not isinstance(value, (bool, int)) else value
+
+    @property
+    def use_jobserver(self):
+        """get use_jobserver property."""
+        value = self.config["use_jobserver"]
+        return str2bool(value) if not isinstance(value, (bool, int)) else value
+
+    @property
+    def jobserver_tokens(self):
+        """get jobserver_tokens property."""
+        value = int(self.config["jobserver_tokens"])
+        return value if value > 0 else multiprocessing.cpu_count()
+
+    @property
+    def fail_fast(self):
+        """get fail_fast property."""
+        value = self.config["fail_fast"]
+        return str2bool(value) if not isinstance(value, (bool, int)) else value
+
+    @property
+    def use_history(self):
+        """get use_history property."""
+        value = self.config["use_history"]
+        return str2bool(value) if not isinstance(value, (bool, int)) else value
+
+    def get_stage_workers(self, stage):
+        """Return the maximum number of runs processing the given stage at the same time (0: unlimited)."""
+        return int(self.config[f"{RunStage(stage).name.lower()}_workers"])
+
     def create_run(self, *args, **kwargs):
         """Factory method to create a run and add it to this session."""
         idx = len(self.runs)
@@ -108,6 +210,31 @@ class Session:
         os.symlink(run.dir, run_link)
         return run
 
+    def resume(self, config=None, stage_cache=None, history=None):
+        """Reopen an archived session and restore its runs from the checkpoints in their directories.
+
+        Runs without a checkpoint are dropped because their state is unknown.
+        """
+        if config is not None:
+            self.global_config = ConfigLayer(config)
+            self.config = filter_config(self.global_config, "session", self.DEFAULTS, [])
+        if stage_cache is not None:
+            self.stage_cache = stage_cache
+        if history is not None:
+            self.history = history
+        runs = []
+        for run in self.runs:
+            checkpoint_file = Path(run.dir) / "run.pkl"
+            if not checkpoint_file.is_file():
+                logger.warning("%sSkipping run without checkpoint: %s", self.prefix, run.dir)
+                continue
+            runs.append(Run.from_file(checkpoint_file, session=self))
+        self.runs = runs
+        self.next_run_idx = max([run.idx for run in runs], default=-1) + 1
+        self.archived = False
+        self.open()
+        logger.info("%sResuming %d runs", self.prefix, len(runs))
+
     #  def update_run(self): # TODO TODO
     #      pass
 
@@ -136,6 +263,23 @@ class Session:
                 run_idx += 1
         self.next_run_idx = run_idx
 
+    def lookup_component(self, key, factory):
+        """Return the component instance stored under the given key, created via factory on the first request."""
+        component = self.components.get(key)
+        if component is None:
+            component = factory()
+            self.components[key] = component
+        return component
+
+    def hash_files(self, paths):
+        """Return the hash of the given files (see mlonmcu.session.cache.hash_files), computed once per session."""
+        key = tuple(str(path) for path in paths)
+        value = self.file_hashes.get(key)
+        if value is None:
+            value = hash_files(paths)
+            self.file_hashes[key] = value
+        return value
+
     def request_run_idx(self):
         """Return next free run index."""
         ret = self.next_run_idx
@@ -143,6 +287,98 @@ class Session:
         # TODO: find a better approach for this
         return ret
 
+    def plan_runs(self, until=RunStage.DONE, num_workers=1):
+        """Determine the work required to process the runs in this session without processing anything.
+
+        Parameters
+        ----------
+        until : RunStage
+            The last stage to process.
+        num_workers : int
+            The number of parallel workers used to estimate the total duration.
+
+        Returns
+        -------
+        Report
+            One row per run listing the stages to process, the stages which would be restored from the stage cache or
+            shared with an earlier run and the estimated duration based on the stage history.
+        """
+        self.enumerate_runs()
+        until = min(until, RunStage.DONE - 1)
+        history = self.history if self.use_history else None
+        stages = [stage for stage in RunStage if RunStage.NOP < stage <= until or stage == RunStage.POSTPROCESS]
+        claimed = set()
+        counts = {}  # Number of stages to process, restored from the cache and shared per stage
+        durations = []
+        num_unknown = 0
+        pres, mains, posts = [], [], []
+        for run in self.runs:
+            key = get_history_key(run) if history is not None else None
+            todo, cached, shared = [], [], []
+            duration = 0.0
+            complete = history is not None
+            for stage in stages:
+                if not run.has_stage(stage) or run.completed[stage]:
+                    continue
+                signature = run.get_stage_signature(stage) if stage in SHARED_STAGES + CACHED_STAGES else None
+                name = RunStage(stage).name
+                todo.append(name)
+                count = counts.setdefault(name, [0, 0, 0])
+                count[0] += 1
+                if self.share_stages and stage in SHARED_STAGES:
+                    if signature in claimed:
+                        shared.append(name)
+                        count[2] += 1
+                        continue
+                    claimed.add(signature)
+                cache = run.stage_cache
+                if cache is not None and stage in CACHED_STAGES and cache.lookup_signature(name, signature):
+                    cached.append(name)
+                    count[1] += 1
+                    continue
+                if history is not None:
+                    estimate = history.estimate(key, name)
+                    if estimate is None:
+                        num_unknown += 1
+                        complete = False
+                    else:
+                        duration += estimate
+            durations.append(duration)
+            # The full report is not needed, it would export the run and parse its metrics
+            pres.append(run.get_report_pre())
+            mains.append(
+                {
+                    "Stages": ",".join(todo) if len(todo) > 0 else "-",
+                    "Cached": ",".join(cached) if len(cached) > 0 else "-",
+                    "Shared": ",".join(shared) if len(shared) > 0 else "-",
+                    # Unknown if any stage lacks history
+                    "Estimated Time [s]": round(duration, 3) if complete else None,
+                }
+            )
+            posts.append(run.get_report_post())
+        # Estimate the makespan by assigning the longest runs first to the next free worker
+        workers = [0.0] * max(num_workers, 1)
+        for duration in sorted(durations, reverse=True):
+            heapq.heapreplace(workers, workers[0] + duration)
+        summary = "\n".join(
+            f"\t{name}: \t{total} run(s), {num_cached} cached, {num_shared} shared"
+            for name, (total, num_cached, num_shared) in counts.items()
+        )
+        logger.info("%sPlan for %d runs:\n%s", self.prefix, len(self.runs), summary)
+        if history is not None:
+            logger.info(
+                "%sEstimated duration: %s (%s of work on %d workers)",
+                self.prefix,
+                tqdm.format_interval(max(workers)),
+                tqdm.format_interval(sum(durations)),
+                len(workers),
+            )
+            if num_unknown > 0:
+                logger.warning("%sThe estimate excludes %d stages without history", self.prefix, num_unknown)
+        report = Report()
+        report.set(pre=pres, main=mains, post=posts)
+        return report
+
     def process_runs(
         self,
         until=RunStage.DONE,
@@ -152,8 +388,14 @@ class Session:
         progress=False,
         export=False,
         context=None,
+        executor="thread",
     ):
-        """Process a runs in this session until a given stage."""
+        """Process a runs in this session until a given stage.
+
+        Using executor="process", the runs are processed in worker processes instead of threads. Only the results of
+        the processed stages are exchanged with the workers. Stages with equal inputs are not shared between runs in
+        this mode.
+        """
 
         # TODO: Add configurable callbacks for stage/run complete
 
@@ -169,6 +411,24 @@ class Session:
         num_failures = 0
         stage_failures = {}
         worker_run_idx = []
+        assert executor in ["thread", "process"], f"Unsupported executor: {executor}"
+        use_processes = executor == "process"
+        shared = SharedStageRegistry(fail_fast=self.fail_fast) if self.share_stages and not use_processes else None
+        failed_signatures = {}  # Signatures of failed stages with the index and error of the run which failed first
+        sinks = []
+        streamed = set()
+        if self.stream_report:
+            sinks.append(ReportSink(Path(self.dir) / f"report.{self.stream_fmt}"))
+            if context is not None:
+                results_dir = context.environment.paths["results"].path
+                sinks.append(ReportSink(results_dir / f"{self.label}.{self.stream_fmt}"))
+        history = self.history if self.use_history else None
+        history_entries = []
+        estimates = {}  # Expected durations of the remaining stages of every run
+        final_stages = {}  # Stage after which each run is exported
+        forked = {}  # Completed stages of every run when forking the worker processes
+        exported = set()
+        remaining = {"time": 0.0, "runs": 0}  # Sum of all estimates and number of runs with estimated stages
 
         def _init_progress(total, msg="Processing..."):
             """Helper function to initialize a progress bar for the session."""
@@ -176,46 +436,160 @@ class Session:
                 total=total,
                 desc=msg,
                 ncols=100,
-                bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}s]",
+                bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}s{postfix}]",
                 leave=None,
             )
 
         def _update_progress(pbar, count=1):
             """Helper function to update the progress bar for the session."""
             pbar.update(count)
+            if remaining["runs"] > 0:
+                eta = remaining["time"] / min(num_workers, remaining["runs"])
+                pbar.set_postfix_str(f"ETA {tqdm.format_interval(eta)}")
+
+        def _estimate_durations(stages):
+            """Helper function to lookup the expected durations of the remaining stages of every run.
+
+            Runs without history for a stage are assumed to take as long as the average run with history.
+            """
+            keys = {i: get_history_key(run) for i, run in enumerate(self.runs)} if history is not None else {}
+            for i in range(len(self.runs)):
+                estimates[i] = {}
+            for stage in stages if history is not None else []:
+                pending = [i for i, run in enumerate(self.runs) if run.has_stage(stage) and not run.completed[stage]]
+                known = {i: history.estimate(keys[i], RunStage(stage).name) for i in pending}
+                values = [value for value in known.values() if value is not None]
+                if len(values) == 0:
+                    continue
+                default = sum(values) / len(values)
+                for i, value in known.items():
+                    estimates[i][stage] = value if value is not None else default
+            remaining["time"] = sum(sum(values.values()) for values in estimates.values())
+            remaining["runs"] = sum(1 for values in estimates.values() if len(values) > 0)
+
+        def _priority(run_index, stage=None):
+            """Helper function returning the expected duration of a run (or one of its stages) to sort runs."""
+            if stage is not None:
+                return estimates[run_index].get(stage, 0.0)
+            return sum(estimates[run_index].values())
+
+        def _finish_stage(run_index, stage):
+            """Helper function to record the duration of a processed stage and update the remaining time."""
+            run = self.runs[run_index]
+            usage = run.stage_usage.get(stage)
+            if history is not None and usage is not None and run.completed[stage] and stage not in run.cached_stages:
+                history_entries.append((get_history_key(run), RunStage(stage).name, usage.wall_time))
+            values = estimates[run_index]
+            if len(values) == 0:
+                return
+            if run.failing:
+                remaining["time"] -= sum(values.values())
+                values.clear()
+            else:
+                remaining["time"] -= values.pop(stage, 0.0)
+            if len(values) == 0:
+                remaining["runs"] -= 1
 
         def _close_progress(pbar):
             """Helper function to close the session progressbar, if available."""
             if pbar:
                 pbar.close()
 
-        def _process(pbar, run, until, skip):
-            """Helper function to invoke the run."""
-            run.process(until=until, skip=skip, export=export)
-            if progress:
-                _update_progress(pbar)
-
-        def _join_workers(workers):
-            """Helper function to collect all worker threads."""
+        def _final_stage(run, stages):
+            """Helper function returning the last of the given stages which still has to be processed for a run."""
+            pending = [stage for stage in stages if run.has_stage(stage) and not run.completed[stage]]
+            return max(pending) if len(pending) > 0 else None
+
+        def _submit(executor, run_index, until, skip):
+            """Helper function to invoke the run in a worker thread or process.
+
+            The artifacts and report of the run are only exported after its final stage.
+            """
+            run = self.runs[run_index]
+            export_ = export and until == final_stages[run_index]
+            if export_:
+                exported.add(run_index)
+            if use_processes:
+                # Only the stages completed since forking the workers are passed to them
+                stages = [stage for stage in RunStage if run.completed[stage] and not forked[run_index][stage]]
+                return executor.submit(_process_run, run_index, run.get_stage_results(stages), until, skip, export_)
+            return executor.submit(run.process, until=until, skip=skip, export=export_, shared=shared)
+
+        def _export_run(run_index):
+            """Helper function to export a run which finished without reaching its final stage."""
+            if not export or run_index in exported:
+                return
+            exported.add(run_index)
+            try:
+                self.runs[run_index].export_results()
+            except Exception as e:
+                logger.exception(e)
+                logger.error("Unable to export run %d", run_index)
+
+        def _shared_signature(run, stage):
+            """Helper function returning the signature of a stage which may be shared with other runs (else None)."""
+            if shared is None or stage not in SHARED_STAGES:
+                return None
+            return run.get_stage_signature(stage)
+
+        def _collect(run_index, future):
+            """Helper function to wait for a worker and take over the run if it was processed in another process."""
+            result = future.result()
+            if use_processes:
+                self.runs[run_index].apply_stage_results(result)
+
+        def _stream_run(run_index):
+            """Helper function to append the row of a finished run to the streamed reports."""
+            if len(sinks) == 0 or run_index in streamed:
+                return
+            streamed.add(run_index)
+            try:
+                report = self.runs[run_index].get_report()
+                for sink in sinks:
+                    sink.write(report)
+            except Exception as e:  # Streaming is best-effort, the full report is written at the end anyway
+                logger.warning("Unable to stream report of run %d: %s", run_index, e)
+
+        def _record_failure(run_index):
+            """Helper function to keep track of failed runs."""
             nonlocal num_failures
+            run = self.runs[run_index]
+            num_failures += 1
+            failed_stage = RunStage(run.next_stage).name
+            if failed_stage in stage_failures:
+                stage_failures[failed_stage].append(run_index)
+            else:
+                stage_failures[failed_stage] = [run_index]
+            if self.fail_fast and run.next_stage in SHARED_STAGES:
+                origin = run.failure_origin if run.failure_origin is not None else run.idx
+                failed_signatures.setdefault(run.get_stage_signature(run.next_stage), (origin, run.failure))
+
+        def _propagate_failure(run_index, stage):
+            """Helper function to fail a run right away if a run with equal stage inputs already failed the stage."""
+            if len(failed_signatures) == 0 or stage not in SHARED_STAGES:
+                return False
+            run = self.runs[run_index]
+            failure = failed_signatures.get(run.get_stage_signature(stage))
+            if failure is None:
+                return False
+            run.propagate_failure(stage, *failure)
+            run.write_checkpoint()
+            return True
+
+        def _join_workers(workers, stage):
+            """Helper function to collect all worker threads."""
             results = []
             for i, w in enumerate(workers):
                 try:
-                    results.append(w.result())
+                    results.append(_collect(worker_run_idx[i], w))
                 except Exception as e:
                     logger.exception(e)
                     logger.error("An exception was thrown by a worker during simulation")
                 run_index = worker_run_idx[i]
                 run = self.runs[run_index]
+                _finish_stage(run_index, stage)
                 if run.failing:
-                    num_failures += 1
-                    failed_stage = RunStage(run.next_stage).name
-                    if failed_stage in stage_failures:
-                        stage_failures[failed_stage].append(run_index)
-                    else:
-                        stage_failures[failed_stage] = [run_index]
-            if progress:
-                _close_progress(pbar)
+                    _record_failure(run_index)
             return results
 
         def _used_stages(runs, until):
@@ -227,11 +601,113 @@ class Session:
                     used.append(stage)
             return used
 
+        def _next_stage(run, until):
+            """Determines the next stage to process for a run or None if it is finished."""
+            if run.failing:
+                return None
+            stage = run.next_stage
+            if stage > min(until, RunStage.DONE - 1):
+                return None
+            return stage
+
+        def _schedule_runs(executor, until, skip):
+            """Helper function which lets each run advance through its stages independently.
+
+            The number of runs processing a stage at the same time is limited via the session config. Runs waiting
+            for another run to process a shared stage are only dispatched after it has finished the stage, hence they
+            do not occupy a worker in the meantime.
+            """
+            limits = {stage: self.get_stage_workers(stage) for stage in used_stages}
+            ready = {stage: [] for stage in used_stages}
+            active = {stage: 0 for stage in used_stages}
+            futures = {}
+            inflight = set()  # Signatures of the shared stages which are processed right now
+            parked = {}  # Runs waiting for one of the inflight stages
+
+            def _enqueue(run_index):
+                run = self.runs[run_index]
+                stage = _next_stage(run, until)
+                if stage is not None and _propagate_failure(run_index, stage):
+                    stage = None
+                if stage is None:
+                    if run.failing:
+                        _record_failure(run_index)
+                        _finish_stage(run_index, run.next_stage)
+                    _export_run(run_index)
+                    _stream_run(run_index)
+                    if progress:
+                        _update_progress(pbar)
+                    return
+                heapq.heappush(ready[stage], (-_priority(run_index), run_index))  # Longest remaining run first
+
+            def _dispatch():
+                # Prefer later stages to finish runs as early as possible
+                for stage in reversed(used_stages):
+                    while len(ready[stage]) > 0 and len(futures) < num_workers:
+                        if limits[stage] > 0 and active[stage] >= limits[stage]:
+                            break
+                        _, run_index = heapq.heappop(ready[stage])
+                        signature = _shared_signature(self.runs[run_index], stage)
+                        if signature is not None:
+                            if signature in inflight:
+                                parked.setdefault(signature, []).append(run_index)
+                                continue
+                            inflight.add(signature)
+                        future = _submit(executor, run_index, stage, skip)
+                        futures[future] = (run_index, stage, signature)
+                        active[stage] += 1
+
+            stages = [stage for stage in used_stages if stage <= min(until, RunStage.DONE - 1)]
+            for i in range(len(self.runs)):
+                final_stages[i] = _final_stage(self.runs[i], stages)
+                _enqueue(i)
+            _dispatch()
+            while len(futures) > 0:
+                done, _ = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    run_index, stage, signature = futures.pop(future)
+                    active[stage] -= 1
+                    try:
+                        _collect(run_index, future)
+                    except Exception as e:
+                        logger.exception(e)
+                        logger.error("An exception was thrown by a worker during simulation")
+                        self.runs[run_index].failing = True
+                    _finish_stage(run_index, stage)
+                    _enqueue(run_index)
+                    if signature is not None:
+                        # The results of the stage are published now, the waiting runs can adopt them right away
+                        inflight.discard(signature)
+                        for other_index in parked.pop(signature, []):
+                            _enqueue(other_index)
+                _dispatch()
+            if progress:
+                _close_progress(pbar)
+
         used_stages = _used_stages(self.runs, until)
         skipped_stages = [stage for stage in RunStage if stage not in used_stages]
-
-        with concurrent.futures.ThreadPoolExecutor(num_workers) as executor:
+        _estimate_durations(used_stages)
+
+        jobserver = Jobserver(self.jobserver_tokens) if self.use_jobserver else None
+        set_jobserver(jobserver)
+        # MLF archives are extracted once next to the runs, hence exporting them only requires hardlinks
+        set_extract_dir(self.mlf_dir)
+        tracer = Tracer(Path(self.dir) / "trace") if self.trace else None
+        set_tracer(tracer)
+        if use_processes:
+            forked.update({i: dict(run.completed) for i, run in enumerate(self.runs)})
+            pool = concurrent.futures.ProcessPoolExecutor(
+                num_workers,
+                mp_context=multiprocessing.get_context("fork"),
+                initializer=_init_worker,
+                initargs=(self.runs,),
+            )
+        else:
+            pool = concurrent.futures.ThreadPoolExecutor(num_workers)
+        with pool as executor:
             if per_stage:
+                for i, run in enumerate(self.runs):
+                    final_stages[i] = _final_stage(run, used_stages)
                 if progress:
                     pbar2 = _init_progress(len(used_stages), msg="Processing stages")
                 for stage in used_stages:
@@ -240,13 +716,18 @@ class Session:
                         pbar = _init_progress(len(self.runs), msg=f"Processing stage {run_stage}")
                     else:
                         logger.info("%s Processing stage %s", self.prefix, run_stage)
-                    for i, run in enumerate(self.runs):
-                        if i == 0:
+                    # Start the longest runs first to avoid stragglers at the end of the stage
+                    order = sorted(range(len(self.runs)), key=lambda i: -_priority(i, stage))
+                    signatures = set()
+                    deferred = []  # Runs sharing the stage with an earlier run are only started after it finished
+                    for position, i in enumerate(order):
+                        run = self.runs[i]
+                        if position == 0:
                             total_threads = min(len(self.runs), num_workers)
                             cpu_count = multiprocessing.cpu_count()
                             if (stage == RunStage.COMPILE) and run.compile_platform:
                                 total_threads *= run.compile_platform.num_threads
-                            if total_threads > 2 * cpu_count:
+                            if total_threads > 2 * cpu_count and jobserver is None:
                                 if pbar2:
                                     print()
                                 logger.warning(
@@ -258,42 +739,88 @@ class Session:
                                 )
                         if run.failing:
                             logger.warning("Skiping stage '%s' for failed run", run_stage)
+                        elif run.has_stage(stage) and _propagate_failure(i, stage):
+                            _record_failure(i)
+                            _finish_stage(i, stage)
                         else:
+                            signature = _shared_signature(run, stage) if run.has_stage(stage) else None
+                            if signature is not None:
+                                if signature in signatures:
+                                    deferred.append(i)
+                                    continue
+                                signatures.add(signature)
                             worker_run_idx.append(i)
-                            workers.append(executor.submit(_process, pbar, run, until=stage, skip=skipped_stages))
-                    _join_workers(workers)
+                            future = _submit(executor, i, stage, skipped_stages)
+                            if progress:
+                                future.add_done_callback(lambda _, pbar=pbar: _update_progress(pbar))
+                            workers.append(future)
+                    _join_workers(workers, stage)
+                    workers = []
+                    worker_run_idx = []
+                    for i in deferred:
+                        if _propagate_failure(i, stage):
+                            _record_failure(i)
+                            _finish_stage(i, stage)
+                            continue
+                        worker_run_idx.append(i)
+                        future = _submit(executor, i, stage, skipped_stages)
+                        if progress:
+                            future.add_done_callback(lambda _, pbar=pbar: _update_progress(pbar))
+                        workers.append(future)
+                    _join_workers(workers, stage)
                     workers = []
                     worker_run_idx = []
+                    if progress:
+                        _close_progress(pbar)
+                    for i, run in enumerate(self.runs):
+                        if run.failing:
+                            _export_run(i)
+                            _stream_run(i)
                     if progress:
                         _update_progress(pbar2)
                 if progress:
                     _close_progress(pbar2)
+                for i in range(len(self.runs)):
+                    _export_run(i)
+                    _stream_run(i)
             else:
                 if progress:
                     pbar = _init_progress(len(self.runs), msg="Processing all runs")
                 else:
                     logger.info(self.prefix + "Processing all stages")
-                for i, run in enumerate(self.runs):
-                    if i == 0:
-                        total_threads = min(len(self.runs), num_workers)
-                        cpu_count = multiprocessing.cpu_count()
-                        if (until >= RunStage.COMPILE) and run.compile_platform.name == "mlif":
-                            total_threads *= (
-                                run.compile_platform.num_threads
-                            )  # TODO: This should also be used for non-mlif platforms
-                        if total_threads > 2 * cpu_count:
-                            if pbar2:
-                                print()
-                            logger.warning(
-                                "The chosen configuration leads to a maximum of %d being processed which"
-                                + " heavily exceeds the available CPU resources (%d)."
-                                + " It is recommended to lower the value of 'mlif.num_threads'!",
-                                total_threads,
-                                cpu_count,
-                            )
-                    worker_run_idx.append(i)
-                    workers.append(executor.submit(_process, pbar, run, until=until, skip=skipped_stages))
-                _join_workers(workers)
+                if len(self.runs) > 0:
+                    run = self.runs[0]
+                    total_threads = min(len(self.runs), num_workers)
+                    cpu_count = multiprocessing.cpu_count()
+                    if (until >= RunStage.COMPILE) and run.compile_platform and run.compile_platform.name == "mlif":
+                        compile_workers = self.get_stage_workers(RunStage.COMPILE)
+                        if compile_workers > 0:
+                            total_threads = min(total_threads, compile_workers)
+                        total_threads *= (
+                            run.compile_platform.num_threads
+                        )  # TODO: This should also be used for non-mlif platforms
+                    if total_threads > 2 * cpu_count and jobserver is None:
+                        if pbar2:
+                            print()
+                        logger.warning(
+                            "The chosen configuration leads to a maximum of %d being processed which"
+                            + " heavily exceeds the available CPU resources (%d)."
+                            + " It is recommended to lower the value of 'mlif.num_threads'!",
+                            total_threads,
+                            cpu_count,
+                        )
+                _schedule_runs(executor, until, skipped_stages)
+        if shared is not None and shared.num_shared > 0:
+            logger.info("%d stages have been shared between runs", shared.num_shared)
+        set_jobserver(None)
+        if jobserver is not None:
+            jobserver.close()
+        set_extract_dir(None)
+        set_tracer(None)
+        if tracer is not None:
+            tracer.write(Path(self.dir) / "trace.json")
+        if history is not None:
+            history.record(history_entries)
         if num_failures == 0:
             logger.info("All runs completed successfuly!")
         elif num_failures == num_runs:
@@ -367,6 +894,8 @@ class Session:
         else:
             self.status = SessionStatus.CLOSED
         self.closed_at = datetime.now()
+        shutil.rmtree(self.mlf_dir, ignore_errors=True)  # The exported runs hold hardlinks of the files
+        shutil.rmtree(self.spill_dir, ignore_errors=True)
         if self.tempdir:
             self.tempdir.cleanup()
 
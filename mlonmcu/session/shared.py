@@ -0,0 +1,84 @@
+#
+# Copyright (c) 2022 TUM Department of Electrical and Computer Engineering.
+#
+# This file is part of MLonMCU.
+# See https://github.com/tum-ei-eda/mlonmcu.git for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Utilities to share the execution of stages between runs with equal stage inputs."""
+import threading
+
+
+class SharedStage:
+    """A single stage execution which is shared by all runs with the same stage signature.
+
+    Attributes
+    ----------
+    leader : Run
+        The run which claimed the stage first and is responsible for processing it.
+    run : Run
+        The leader after it processed the stage successfully, else None.
+    error : str
+        Description of the error if the leader failed to process the stage, else None.
+    """
+
+    def __init__(self, leader):
+        self.leader = leader
+        self.run = None
+        self.error = None
+        self.event = threading.Event()
+
+    def publish(self, run, error=None):
+        """Make the results of the leader available to all waiting runs (None and the error if the stage failed)."""
+        self.run = run
+        self.error = error
+        self.event.set()
+
+    def wait(self):
+        """Block until the leader has processed the stage and return it (None if it failed)."""
+        self.event.wait()
+        return self.run
+
+
+class SharedStageRegistry:
+    """Thread-safe registry for shared stage executions, indexed by stage signatures.
+
+    Attributes
+    ----------
+    fail_fast : bool
+        Let runs fail immediately if the leader of their stage failed instead of processing the stage on their own.
+    """
+
+    def __init__(self, fail_fast=True):
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.num_shared = 0
+        self.fail_fast = fail_fast
+
+    def claim(self, signature, run):
+        """Register a run for the stage with the given signature.
+
+        Returns
+        -------
+        tuple
+            Wether the run is the leader of the stage and the SharedStage entry.
+        """
+        with self.lock:
+            entry = self.entries.get(signature)
+            if entry is None:
+                entry = SharedStage(run)
+                self.entries[signature] = entry
+                return True, entry
+            self.num_shared += 1
+            return False, entry
@@ -19,9 +19,12 @@
 """Definition of Taks Cache"""
 
 import os
+import threading
 import configparser
 from typing import Any
 
+import filelock
+
 
 def convert_key(name):
     if not isinstance(name, tuple):
@@ -33,22 +36,49 @@ def convert_key(name):
     return name
 
 
+def get_sublists(in_list):
+    """Return all contiguous sublists of a list (including the empty one), longest first."""
+    ret = [[]]
+    for i in range(len(in_list) + 1):
+        for j in range(i + 1, len(in_list) + 1):
+            ret.append(in_list[i:j])
+    return sorted(ret, key=len, reverse=True)
+
+
 class TaskCache:
     """Task cache used to store dependency paths for the current and furture sessions.
 
     This can be interpreted as a "modded" dictionary which takes a key + some flags.
+
+    The entries are additionally indexed by name and lookups via `resolve` are memoized, as the same keys are resolved
+    for every component of every run. All accesses are guarded by a lock.
     """
 
     def __init__(self):
         self._vars = {}
+        self._index = {}  # name -> {flags: value}
+        self._resolved = {}  # (name, flags, hints) -> value
+        self._lock = threading.RLock()
 
     def __repr__(self):
         return str(self._vars)
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+
     def __setitem__(self, name, value):
         name = convert_key(name)
-        self._vars[name[0]] = value  # Holds latest value
-        self._vars[name] = value
+        with self._lock:
+            self._vars[name[0]] = value  # Holds latest value
+            self._vars[name] = value
+            self._index.setdefault(name[0], {})[name[1]] = value
+            self._resolved = {}
 
     def __getitem__(self, name):
         name = convert_key(name)
@@ -59,11 +89,21 @@ class TaskCache:
 
     def __contains__(self, name):
         name = convert_key(name)
-        return name in self._vars.keys()
+        return name in self._vars
+
+    def reset(self):
+        """Remove all entries."""
+        with self._lock:
+            self._vars = {}
+            self._index = {}
+            self._resolved = {}
 
     def find_best_match(self, name: str, flags=[]) -> Any:
         """Utility whih tries to resolve the cache entry with the beste match.
 
+        Only the entries with the given name are considered. The best match is the entry with the largest set of flags
+        which are all part of the given flags.
+
         Parameters
         ----------
         name : str
@@ -71,42 +111,57 @@ class TaskCache:
         flags : list
             Optional flags used for the lookup.
         """
-        # print("find_best_match", name, flags)
-        keys = self._vars.keys()
-        # print("keys", keys)
-        matches = []
-        counts = []
-        for key in keys:
-            if not isinstance(key, tuple):
-                continue
-            assert len(key) == 2
-            name_, flags_ = key[0], key[1]
-            if name == name_:
-                count = 0
-                for flag in flags_:
-                    if flag not in flags:
-                        count = -1  # incompatible
-                        break
-                    count = count + 1
-                if count >= 0:
-                    matches.append(flags_)
-                    counts.append(count)
-        if len(counts) == 0:
+        flags = frozenset(flags)
+        with self._lock:
+            variants = self._index.get(name, {})
+            if flags in variants:  # Exact match
+                return variants[flags]
+            matches = [flags_ for flags_ in variants if flags_ <= flags]
+        if len(matches) == 0:
             raise RuntimeError("Unable to find a match in the cache")
-        m = max(counts)
-        assert counts.count(m) == 1, f"For the given set of flags, there are multiple cache matches for the name {name}"
-        idx = counts.index(m)
-        flag = matches[idx]
-        ret = self._vars[name, flag]
-        return ret
+        m = max(len(flags_) for flags_ in matches)
+        best = [flags_ for flags_ in matches if len(flags_) == m]
+        assert len(best) == 1, f"For the given set of flags, there are multiple cache matches for the name {name}"
+        return variants[best[0]]
+
+    def resolve(self, name: str, flags=(), hints=()) -> Any:
+        """Lookup the value for the given name and flags, extended by the most specific combination of hints.
+
+        Parameters
+        ----------
+        name : str
+            The cache-key.
+        flags : tuple
+            Flags which have to match exactly.
+        hints : tuple
+            Additional flags (e.g. the target architecture) tried as contiguous sublists, longest first.
+
+        Returns
+        -------
+        Any
+            The cached value or None if there is no match.
+        """
+        signature = (name, tuple(flags), tuple(hints))
+        with self._lock:
+            if signature in self._resolved:
+                return self._resolved[signature]
+            variants = self._index.get(name, {})
+            value = None
+            for hint_combination in get_sublists(list(hints)):
+                value = variants.get(frozenset(list(flags) + hint_combination))
+                if value is not None:
+                    break
+            self._resolved[signature] = value
+        return value
 
     def read_from_file(self, filename, reset=True):
         if reset:
-            self._vars = {}
+            self.reset()
         if not os.path.isfile(filename):
             raise RuntimeError(f"File not found: {filename}")
         cfg = configparser.ConfigParser()
-        cfg.read(filename)
+        with filelock.FileLock(f"{filename}.lock"):
+            cfg.read(filename)
         sections = cfg.sections()
         for section in sections:
             if section == "default":
@@ -118,30 +173,33 @@ class TaskCache:
                 self[name, flags] = value
 
     def write_to_file(self, filename):
-        # d = self._vars
+        """Write the cache to an ini file.
 
+        The file is replaced atomically while holding a lock, hence concurrent invocations never observe a partially
+        written file.
+        """
         out = {}  # This will be a dict of dicts
-        for key in self._vars:
-            # print(key, type(key))
-            if isinstance(key, str):
+        with self._lock:
+            for name, variants in self._index.items():
+                for flags, value in variants.items():
+                    if len(flags) == 0:
+                        section_name = "default"
+                    else:
+                        section_name = ",".join(sorted(flags))
+                    if section_name in out:
+                        out[section_name][name] = value
+                    else:
+                        out[section_name] = {name: value}
+
+        cfg = configparser.ConfigParser()
+        if "default" in out:  # Default section should be first
+            cfg["default"] = out["default"]
+        for x in out:
+            if x == "default":
                 continue
-            name, flags = key[0], key[1]
-            value = self._vars[key]
-            if len(flags) == 0:
-                section_name = "default"
-            else:
-                section_name = ",".join(sorted(flags))
-            if section_name in out:
-                out[section_name][name] = value
-            else:
-                out[section_name] = {name: value}
-
-        with open(filename, "w") as cachefile:
-            cfg = configparser.ConfigParser()
-            if "default" in out:  # Default section should be first
-                cfg["default"] = out["default"]
-            for x in out:
-                if x == "default":
-                    continue
-                cfg[x] = out[x]
-            cfg.write(cachefile)
+            cfg[x] = out[x]
+        tmp_file = f"{filename}.tmp"  # Only written while holding the lock
+        with filelock.FileLock(f"{filename}.lock"):
+            with open(tmp_file, "w") as cachefile:
+                cfg.write(cachefile)
+            os.replace(tmp_file, filename)
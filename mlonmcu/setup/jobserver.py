@@ -0,0 +1,112 @@
+#
+# Copyright (c) 2022 TUM Department of Electrical and Computer Engineering.
+#
+# This file is part of MLonMCU.
+# See https://github.com/tum-ei-eda/mlonmcu.git for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Token pool compatible with the GNU make jobserver protocol used to limit the number of parallel build jobs."""
+import os
+import select
+import contextlib
+
+from mlonmcu.logging import get_logger
+
+logger = get_logger()
+
+_JOBSERVER = None
+
+
+class Jobserver:
+    """A pool of job tokens shared by all build tools invoked in a session.
+
+    Every build tool holds one token while running. Tools implementing the GNU make jobserver protocol (make) can
+    draw additional tokens from the same pipe for their parallel jobs, which bounds the total number of jobs.
+
+    Attributes
+    ----------
+    num_tokens : int
+        The maximum number of parallel jobs.
+    """
+
+    def __init__(self, num_tokens):
+        assert num_tokens > 0, "A jobserver needs at least one token"
+        self.num_tokens = num_tokens
+        self.read_fd, self.write_fd = os.pipe()
+        os.write(self.write_fd, b"+" * num_tokens)
+
+    def __repr__(self):
+        return f"Jobserver(num_tokens={self.num_tokens})"
+
+    def acquire(self):
+        """Take a token from the pool (blocking)."""
+        while True:
+            try:
+                token = os.read(self.read_fd, 1)
+            except InterruptedError:
+                continue
+            except BlockingIOError:  # make switches the shared pipe to non-blocking mode
+                select.select([self.read_fd], [], [])
+                continue
+            assert len(token) == 1, "The jobserver pipe was closed unexpectedly"
+            return token
+
+    def release(self, token=b"+"):
+        """Return a token to the pool."""
+        os.write(self.write_fd, token)
+
+    @contextlib.contextmanager
+    def token(self):
+        """Context manager holding a single token."""
+        token = self.acquire()
+        try:
+            yield
+        finally:
+            self.release(token)
+
+    def update_kwargs(self, kwargs):
+        """Return a copy of the given Popen arguments which makes the jobserver available to the subprocess."""
+        kwargs = dict(kwargs)
+        env = dict(kwargs.get("env") or os.environ)
+        env["MAKEFLAGS"] = f"-j{self.num_tokens} --jobserver-auth={self.read_fd},{self.write_fd}"
+        kwargs["env"] = env
+        kwargs["pass_fds"] = tuple(kwargs.get("pass_fds", ())) + (self.read_fd, self.write_fd)
+        return kwargs
+
+    def close(self):
+        """Close the underlying pipe."""
+        os.close(self.read_fd)
+        os.close(self.write_fd)
+
+
+def get_jobserver():
+    """Return the active jobserver or None."""
+    return _JOBSERVER
+
+
+def set_jobserver(jobserver):
+    """Activate the given jobserver for all following build invocations (None to deactivate)."""
+    global _JOBSERVER
+    _JOBSERVER = jobserver
+
+
+@contextlib.contextmanager
+def hold_token():
+    """Context manager holding a token of the active jobserver (if any)."""
+    jobserver = get_jobserver()
+    if jobserver is None:
+        yield
+    else:
+        with jobserver.token():
+            yield
@@ -0,0 +1,231 @@
+#
+# Copyright (c) 2022 TUM Department of Electrical and Computer Engineering.
+#
+# This file is part of MLonMCU.
+# See https://github.com/tum-ei-eda/mlonmcu.git for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Subprocess engine streaming the output of commands without busy waiting."""
+import os
+import sys
+import time
+import signal
+import tempfile
+import selectors
+import subprocess
+
+from mlonmcu.logging import get_logger
+
+from .usage import Popen
+
+logger = get_logger()
+
+CHUNK_SIZE = 2**20  # Maximum number of bytes read at once
+COALESCE_DELAY = 0.005  # Seconds to wait for further output after reading a small chunk
+CANCEL_INTERVAL = 0.1  # Seconds between checks of the cancel event
+KILL_TIMEOUT = 5  # Seconds to wait for a terminated process before killing it
+SPILL_LIMIT = 2**26  # Output beyond this number of bytes is moved to a temporary file
+
+
+class ProcessCancelled(subprocess.SubprocessError):
+    """Raised if a command was cancelled before it exited."""
+
+    def __init__(self, cmd, output=None):
+        super().__init__()
+        self.cmd = cmd
+        self.output = output
+
+    def __str__(self):
+        return f"Command '{self.cmd}' was cancelled"
+
+
+class OutputBuffer:
+    """Chunked buffer for the output of a subprocess.
+
+    Chunks are only joined once when the output is requested. If a spill limit is given, the output is moved to a
+    temporary file as soon as it grows beyond the limit to bound the memory used while the command is running.
+
+    Attributes
+    ----------
+    spill_limit : int
+        Number of bytes kept in memory (None for no limit).
+    size : int
+        The total number of bytes written.
+    """
+
+    def __init__(self, spill_limit=SPILL_LIMIT):
+        self.spill_limit = spill_limit
+        self.size = 0
+        self.chunks = []
+        self.file = None
+
+    def write(self, data):
+        """Append raw bytes."""
+        self.size += len(data)
+        if self.file is not None:
+            self.file.write(data)
+            return
+        self.chunks.append(data)
+        if self.spill_limit is not None and self.size > self.spill_limit:
+            self.file = tempfile.TemporaryFile()
+            self.file.write(b"".join(self.chunks))
+            self.chunks = []
+
+    def getvalue(self):
+        """Return the decoded output."""
+        if self.file is not None:
+            self.file.seek(0)
+            data = self.file.read()
+            self.file.seek(0, os.SEEK_END)
+        else:
+            data = b"".join(self.chunks)
+        return data.decode(errors="replace")
+
+    def close(self):
+        """Remove the spill file (if any)."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        self.chunks = []
+
+
+def _signal(process, sig, group):
+    """Send a signal to the process or (if it was started in a new session) to its whole process group."""
+    if group:
+        try:
+            os.killpg(process.pid, sig)
+            return
+        except ProcessLookupError:
+            pass  # Group leader already reaped
+    process.send_signal(sig)
+
+
+def _terminate(process, group=False):
+    _signal(process, signal.SIGTERM, group)
+    try:
+        process.wait(timeout=KILL_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        _signal(process, signal.SIGKILL, group)
+        process.wait()
+    if group:
+        try:  # Children which did not exit with their parent
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+def stream_process(args, output=None, line_func=None, timeout=None, cancel_event=None, **kwargs):
+    """Run a command and stream its combined stdout and stderr.
+
+    The output is read in chunks via a selector, hence waiting for output does not consume any CPU time. Lines are
+    only split if a line_func is given.
+
+    Parameters
+    ----------
+    args : list
+        The command to be executed.
+    output : OutputBuffer
+        Optional buffer receiving the output. It stays valid if an exception is raised.
+    line_func : Callable
+        Optional function called for every line of output (without the newline). If it returns True, the command is
+        terminated and its exit code is returned.
+    timeout : float
+        Maximum runtime of the command in seconds. On POSIX systems, the command is started in a new session and its
+        whole process group is killed if the timeout expires or the command is cancelled.
+    cancel_event : threading.Event
+        Optional event to cancel the command from another thread.
+    kwargs : dict
+        Arbitrary keyword arguments passed through to the subprocess.
+
+    Returns
+    -------
+    exit_code : int
+        The exit code of the command.
+
+    Raises
+    ------
+    subprocess.TimeoutExpired
+        If the command did not exit within the timeout.
+    ProcessCancelled
+        If the cancel event was set before the command exited.
+    """
+    deadline = time.monotonic() + timeout if timeout else None
+    reason = None
+    group = False
+    if (deadline is not None or cancel_event is not None) and os.name == "posix":
+        # Wrapper scripts may spawn the actual simulator, hence the whole process group is killed on a timeout
+        group = kwargs.setdefault("start_new_session", True)
+    with Popen(args, **kwargs, stdout=subprocess.PIPE, stderr=subprocess.STDOUT) as process:
+        fd = process.stdout.fileno()
+        os.set_blocking(fd, False)
+        if sys.platform == "linux":
+            try:
+                import fcntl
+
+                fcntl.fcntl(fd, fcntl.F_SETPIPE_SZ, CHUNK_SIZE)
+            except (ImportError, AttributeError, OSError):
+                pass  # Keep the default pipe size
+        pending = b""
+        try:
+            with selectors.DefaultSelector() as selector:
+                selector.register(fd, selectors.EVENT_READ)
+                while reason is None:
+                    wait = None
+                    if deadline is not None:
+                        wait = deadline - time.monotonic()
+                        if wait <= 0:
+                            reason = "timeout"
+                            break
+                    if cancel_event is not None:
+                        if cancel_event.is_set():
+                            reason = "cancel"
+                            break
+                        wait = CANCEL_INTERVAL if wait is None else min(wait, CANCEL_INTERVAL)
+                    if not selector.select(wait):
+                        continue
+                    try:
+                        data = os.read(fd, CHUNK_SIZE)
+                    except BlockingIOError:
+                        continue
+                    if not data:  # EOF
+                        break
+                    if output is not None:
+                        output.write(data)
+                    if line_func is not None:
+                        lines = (pending + data).split(b"\n")
+                        pending = lines.pop()
+                        for line in lines:
+                            if line_func(line.decode(errors="replace")):
+                                reason = "stop"
+                                break
+                    if len(data) < CHUNK_SIZE // 16:
+                        # Let chatty commands fill the pipe instead of waking up for every single line
+                        time.sleep(COALESCE_DELAY)
+            if reason is None and pending and line_func is not None:
+                line_func(pending.decode(errors="replace"))
+        except KeyboardInterrupt:
+            logger.debug("Interrupted subprocess. Sending SIGINT signal...")
+            _signal(process, signal.SIGINT, group)
+            raise
+        except BaseException:
+            _terminate(process, group)
+            raise
+        if reason is not None:
+            _terminate(process, group)
+        exit_code = process.wait()
+    if reason == "timeout":
+        raise subprocess.TimeoutExpired(args, timeout, output=output.getvalue() if output is not None else None)
+    if reason == "cancel":
+        raise ProcessCancelled(args, output=output.getvalue() if output is not None else None)
+    return exit_code
@@ -0,0 +1,152 @@
+#
+# Copyright (c) 2022 TUM Department of Electrical and Computer Engineering.
+#
+# This file is part of MLonMCU.
+# See https://github.com/tum-ei-eda/mlonmcu.git for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Recorder for a timeline of stages and external commands in the Chrome trace event format."""
+import os
+import json
+import time
+import shutil
+import threading
+import contextlib
+from pathlib import Path
+
+_TRACER = None
+
+
+class Tracer:
+    """Collects trace events of all threads and (forked) processes of a session.
+
+    Every thread appends its events to an own file which is kept open, which allows to record events in worker
+    threads and processes without any synchronization or sending them back to the main process. Tracer.write merges
+    all of them into a single trace file which can be loaded in Perfetto or chrome://tracing.
+
+    Attributes
+    ----------
+    directory : Path
+        Directory holding the event files of all threads.
+    known_threads : set
+        The (pid, tid) pairs which were already named in the trace.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.start = time.perf_counter_ns()  # The monotonic clock is shared between processes
+        self.known_threads = set()
+        self.lock = threading.Lock()  # Guards known_threads and files
+        self.files = []  # Event files opened by the threads of the current process
+        self.pid = os.getpid()
+        self.local = threading.local()
+
+    def __repr__(self):
+        return f"Tracer({self.directory})"
+
+    def now(self):
+        """Return the current timestamp in microseconds."""
+        return (time.perf_counter_ns() - self.start) / 1000
+
+    def _check_fork(self):
+        pid = os.getpid()
+        if self.pid != pid:
+            # In a forked child, the lock might have been held by another thread of the parent
+            self.pid = pid
+            self.lock = threading.Lock()
+            self.files = []
+
+    def _get_file(self):
+        """Return the event file of the current thread."""
+        handle = getattr(self.local, "file", None)
+        if handle is None or handle.closed or self.local.pid != self.pid:
+            # Unbuffered, hence all events are on disk when merging the files
+            handle = open(self.directory / f"{self.pid}-{threading.get_native_id()}.jsonl", "ab", buffering=0)
+            self.local.file = handle
+            self.local.pid = self.pid
+            with self.lock:
+                self.files.append(handle)
+        return handle
+
+    def _append(self, events):
+        data = "".join(json.dumps(event, default=str) + "\n" for event in events)
+        self._get_file().write(data.encode("utf-8"))
+
+    def add_span(self, name, start, end, cat="", args=None, tid=None, thread_name=None):
+        """Record a span (complete event) between two timestamps given in microseconds."""
+        self._check_fork()
+        pid = self.pid
+        tid = tid if tid is not None else threading.get_native_id()
+        events = []
+        with self.lock:
+            known = (pid, tid) in self.known_threads
+            self.known_threads.add((pid, tid))
+        if not known:
+            name_ = thread_name if thread_name is not None else threading.current_thread().name
+            events.append({"ph": "M", "name": "thread_name", "pid": pid, "tid": tid, "args": {"name": name_}})
+        event = {"ph": "X", "name": name, "cat": cat, "ts": start, "dur": end - start, "pid": pid, "tid": tid}
+        if args:
+            event["args"] = args
+        events.append(event)
+        self._append(events)
+
+    @contextlib.contextmanager
+    def span(self, name, cat="", args=None):
+        """Context manager recording a span for the enclosed code."""
+        start = self.now()
+        try:
+            yield
+        finally:
+            self.add_span(name, start, self.now(), cat=cat, args=args)
+
+    def write(self, filename):
+        """Merge the events of all threads into a single trace file and remove the intermediate files.
+
+        Events of worker processes must have been recorded completely before.
+        """
+        self._check_fork()
+        with self.lock:
+            files, self.files = self.files, []
+        for handle in files:
+            handle.close()
+        events = []
+        for path in sorted(self.directory.glob("*.jsonl")):
+            with open(path, "r", encoding="utf-8") as handle:
+                events.extend(json.loads(line) for line in handle if len(line.strip()) > 0)
+        with open(filename, "w", encoding="utf-8") as handle:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, handle)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def get_tracer():
+    """Return the active tracer or None."""
+    return _TRACER
+
+
+def set_tracer(tracer):
+    """Activate the given tracer for all following stages and commands (None to deactivate)."""
+    global _TRACER
+    _TRACER = tracer
+
+
+@contextlib.contextmanager
+def trace_span(name, cat="", args=None):
+    """Context manager recording a span with the active tracer (if any)."""
+    tracer = get_tracer()
+    if tracer is None:
+        yield
+    else:
+        with tracer.span(name, cat=cat, args=args):
+            yield
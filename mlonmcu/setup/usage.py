@@ -0,0 +1,208 @@
+#
+# Copyright (c) 2022 TUM Department of Electrical and Computer Engineering.
+#
+# This file is part of MLonMCU.
+# See https://github.com/tum-ei-eda/mlonmcu.git for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Utilities to measure the time and resources consumed by the stages of a run including their subprocesses."""
+import os
+import time
+import threading
+import contextlib
+import subprocess
+
+from .trace import get_tracer
+
+_LOCAL = threading.local()
+
+
+class ResourceUsage:
+    """Resources consumed while processing a stage.
+
+    Attributes
+    ----------
+    wall_time : float
+        Elapsed time in seconds.
+    cpu_time : float
+        CPU time (user + system) in seconds spent by the current thread itself.
+    child_cpu_time : float
+        CPU time (user + system) in seconds spent by the subprocesses started by the current thread.
+    max_rss : int
+        Peak resident set size in kilobytes of the largest subprocess.
+    num_processes : int
+        Number of subprocesses.
+    """
+
+    def __init__(self):
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.child_cpu_time = 0.0
+        self.max_rss = 0
+        self.num_processes = 0
+
+    def __repr__(self):
+        return (
+            f"ResourceUsage(wall_time={self.wall_time:.3f}, cpu_time={self.cpu_time:.3f}, "
+            f"child_cpu_time={self.child_cpu_time:.3f}, max_rss={self.max_rss}, num_processes={self.num_processes})"
+        )
+
+    def add_process(self, rusage):
+        """Account for a finished subprocess given its resource usage (see os.wait4)."""
+        self.add_process_usage(rusage.ru_utime + rusage.ru_stime, rusage.ru_maxrss)
+
+    def add_process_usage(self, cpu_time, max_rss):
+        """Account for work done in another process given its CPU time in seconds and peak RSS in kilobytes."""
+        self.child_cpu_time += cpu_time
+        self.max_rss = max(self.max_rss, max_rss)
+        self.num_processes += 1
+
+
+@contextlib.contextmanager
+def measure_usage():
+    """Context manager measuring the resources consumed by the current thread and its subprocesses.
+
+    Yields
+    ------
+    ResourceUsage
+        The usage which is completed when leaving the context.
+    """
+    usage = ResourceUsage()
+    parent = get_usage()
+    _LOCAL.usage = usage
+    start = time.perf_counter()
+    start_cpu = time.thread_time()
+    try:
+        yield usage
+    finally:
+        usage.wall_time = time.perf_counter() - start
+        usage.cpu_time = time.thread_time() - start_cpu
+        _LOCAL.usage = parent
+        if parent is not None:  # The thread time of the parent already covers the nested measurement
+            parent.child_cpu_time += usage.child_cpu_time
+            parent.max_rss = max(parent.max_rss, usage.max_rss)
+            parent.num_processes += usage.num_processes
+
+
+def get_usage():
+    """Return the usage measured for the current thread (or None)."""
+    return getattr(_LOCAL, "usage", None)
+
+
+def _exit_code(status):
+    """Convert a wait status (see os.wait4) to a returncode like subprocess.Popen."""
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    if os.WIFSTOPPED(status):
+        return -os.WSTOPSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+class Popen(subprocess.Popen):
+    """Drop-in replacement for subprocess.Popen which reports the resource usage of the child on termination.
+
+    The child is reaped via os.wait4 by wait() and poll(), which also covers the waits within communicate() and the
+    context manager. If a tracer is active, the lifetime of the child is recorded as a span on the track of the calling
+    thread.
+    """
+
+    WAIT_INTERVAL = 0.05  # Maximum seconds between checks while waiting with a timeout
+
+    def __init__(self, *args, **kwargs):
+        self.rusage = None
+        # The process might be waited for from another thread
+        self._usage = get_usage()
+        self._tracer = get_tracer()
+        self._reap_lock = threading.Lock()
+        if self._tracer is not None:
+            self._thread = (threading.get_native_id(), threading.current_thread().name)
+            self._start = self._tracer.now()
+        super().__init__(*args, **kwargs)
+
+    def _trace(self, rusage):
+        cmd = self.args if isinstance(self.args, (list, tuple)) else [self.args]
+        name = os.path.basename(str(cmd[0])) if len(cmd) > 0 else "?"
+        args = {"cmd": " ".join(map(str, cmd)), "pid": self.pid}
+        if rusage is not None:
+            args["cpu_time"] = rusage.ru_utime + rusage.ru_stime
+            args["max_rss"] = rusage.ru_maxrss
+        tid, thread_name = self._thread
+        self._tracer.add_span(
+            name, self._start, self._tracer.now(), cat="command", args=args, tid=tid, thread_name=thread_name
+        )
+
+    def _reap(self, block):
+        """Collect the exit status and resource usage of the child if it exited (or wait for it if block is set).
+
+        Returns
+        -------
+        bool
+            True if the returncode is known.
+        """
+        if not self._reap_lock.acquire(blocking=block):
+            return self.returncode is not None  # Another thread is reaping the child right now
+        try:
+            if self.returncode is not None:
+                return True
+            try:
+                pid, status, rusage = os.wait4(self.pid, 0 if block else os.WNOHANG)
+            except ChildProcessError:
+                # The child was reaped elsewhere (i.e. SIGCHLD is ignored), the exit status is lost like in Popen
+                self.returncode = 0
+                return True
+            if pid != self.pid:
+                return False
+            self.returncode = _exit_code(status)
+        finally:
+            self._reap_lock.release()
+        self.rusage = rusage
+        if self._usage is not None:
+            self._usage.add_process(rusage)
+        if self._tracer is not None:
+            self._trace(rusage)
+        return True
+
+    def poll(self):
+        if not hasattr(os, "wait4"):
+            return super().poll()
+        self._reap(block=False)
+        return self.returncode
+
+    def wait(self, timeout=None):
+        if not hasattr(os, "wait4"):
+            return super().wait(timeout=timeout)
+        if timeout is None:
+            self._reap(block=True)
+            return self.returncode
+        deadline = time.monotonic() + timeout
+        delay = 0.0005
+        while not self._reap(block=False):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(self.args, timeout)
+            delay = min(delay * 2, remaining, self.WAIT_INTERVAL)
+            time.sleep(delay)
+        return self.returncode
+
+
+def run_checked(args, **kwargs):
+    """Equivalent of subprocess.run(args, check=True, **kwargs) using the measuring Popen."""
+    with Popen(args, **kwargs) as process:
+        try:
+            exit_code = process.wait()
+        except BaseException:
+            process.kill()
+            raise
+    if exit_code != 0:
+        raise subprocess.CalledProcessError(exit_code, args)
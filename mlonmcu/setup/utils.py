@@ -17,10 +17,8 @@
 # limitations under the License.
 #
 import os
-import signal
 import sys
 import multiprocessing
-import subprocess
 
 # import logging
 import tarfile
@@ -33,6 +31,9 @@ from typing import Union
 from git import Repo
 
 from mlonmcu import logging
+from mlonmcu.setup.jobserver import get_jobserver, hold_token
+from mlonmcu.setup.usage import run_checked
+from mlonmcu.setup.process import OutputBuffer, stream_process
 
 logger = logging.get_logger()
 
@@ -97,10 +98,18 @@ def exec(*args, **kwargs):
         The command to be executed.
     """
     logger.debug("- Executing: " + str(args))
-    subprocess.run([i for i in args], **kwargs, check=True)
-
-
-def exec_getout(*args, live: bool = False, print_output: bool = True, handle_exit=None, **kwargs) -> str:
+    run_checked([i for i in args], **kwargs)
+
+
+def exec_getout(
+    *args,
+    live: bool = False,
+    print_output: bool = True,
+    handle_exit=None,
+    timeout=None,
+    cancel_event=None,
+    **kwargs,
+) -> str:
     """Execute a process with the given args and using the given kwards as Popen arguments and return the output.
 
     Parameters
@@ -111,6 +120,10 @@ def exec_getout(*args, live: bool = False, print_output: bool = True, handle_exi
         If the stdout should be updated in real time.
     print_output : bool
         Print the output at the end on non-live mode.
+    timeout : float
+        Optional maximum runtime of the process in seconds.
+    cancel_event : threading.Event
+        Optional event to cancel the process from another thread.
 
     Returns
     -------
@@ -118,50 +131,30 @@ def exec_getout(*args, live: bool = False, print_output: bool = True, handle_exi
         The text printed to the command line.
     """
     logger.debug("- Executing: " + str(args))
-    outStr = ""
-    if live:
-        process = subprocess.Popen([i for i in args], **kwargs, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-        try:
-            for line in process.stdout:
-                new_line = line.decode(errors="replace")
-                outStr = outStr + new_line
-                print(new_line.replace("\n", ""))
-            exit_code = None
-            while exit_code is None:
-                exit_code = process.poll()
-            if handle_exit is not None:
-                exit_code = handle_exit(exit_code)
-            assert exit_code == 0, "The process returned an non-zero exit code {}! (CMD: `{}`)".format(
-                exit_code, " ".join(list(map(str, args)))
-            )
-        except KeyboardInterrupt:
-            logger.debug("Interrupted subprocess. Sending SIGINT signal...")
-            pid = process.pid
-            os.kill(pid, signal.SIGINT)
-
-    else:
-        try:
-            p = subprocess.Popen([i for i in args], **kwargs, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-            outStr = p.communicate()[0].decode(errors="replace")
-            exit_code = p.poll()
-            # outStr = p.stdout.decode(errors="replace")
-            if print_output:
-                logger.debug(outStr)
-            if handle_exit is not None:
-                exit_code = handle_exit(exit_code)
-            if exit_code != 0:
-                logger.error(outStr)
-            assert exit_code == 0, "The process returned an non-zero exit code {}! (CMD: `{}`)".format(
-                exit_code, " ".join(list(map(str, args)))
-            )
-        except KeyboardInterrupt:
-            logger.debug("Interrupted subprocess. Sending SIGINT signal...")
-            pid = p.pid
-            os.kill(pid, signal.SIGINT)
-        except subprocess.CalledProcessError as e:
-            outStr = e.output.decode(errors="replace")
+    output = OutputBuffer()
+    try:
+        exit_code = stream_process(
+            [i for i in args],
+            output=output,
+            line_func=(lambda line: print(line)) if live else None,
+            timeout=timeout,
+            cancel_event=cancel_event,
+            **kwargs,
+        )
+        outStr = output.getvalue()
+        if not live and print_output:
+            logger.debug(outStr)
+        if handle_exit is not None:
+            exit_code = handle_exit(exit_code)
+        if not live and exit_code != 0:
             logger.error(outStr)
-            raise e
+        assert exit_code == 0, "The process returned an non-zero exit code {}! (CMD: `{}`)".format(
+            exit_code, " ".join(list(map(str, args)))
+        )
+    except KeyboardInterrupt:
+        outStr = output.getvalue()
+    finally:
+        output.close()
 
     return outStr
 
@@ -248,9 +241,16 @@ def make(*args, threads=multiprocessing.cpu_count(), use_ninja=False, cwd=None,
     # TODO: make sure that ninja is installed?
     extraArgs = []
     tool = "ninja" if use_ninja else "make"
-    extraArgs.append("-j" + str(threads))
+    jobserver = get_jobserver()
+    if jobserver is None or use_ninja:
+        extraArgs.append("-j" + str(threads))
     cmd = [tool] + extraArgs + list(args)
-    return exec_getout(*cmd, cwd=cwd, print_output=False, **kwargs)
+    if jobserver is None:
+        return exec_getout(*cmd, cwd=cwd, print_output=False, **kwargs)
+    # The parallel jobs of make are limited by the jobserver tokens instead of -j
+    kwargs = jobserver.update_kwargs(kwargs)
+    with jobserver.token():
+        return exec_getout(*cmd, cwd=cwd, print_output=False, **kwargs)
 
 
 def cmake(src, *args, debug=False, use_ninja=False, cwd=None, **kwargs):
@@ -264,7 +264,8 @@ def cmake(src, *args, debug=False, use_ninja=False, cwd=None, **kwargs):
     if use_ninja:
         extraArgs.append("-GNinja")
     cmd = ["cmake", str(src)] + extraArgs + list(args)
-    return exec_getout(*cmd, cwd=cwd, print_output=False, **kwargs)
+    with hold_token():
+        return exec_getout(*cmd, cwd=cwd, print_output=False, **kwargs)
 
 
 # def move(a, b):  # TODO: make every utility compatible with Paths!
@@ -18,19 +18,38 @@
 #
 """Helper functions used by MLonMCU targets"""
 
-import subprocess
 import argparse
+import subprocess
 from typing import List, Callable
 
 from mlonmcu.cli.helper.parse import extract_feature_names, extract_config
 from mlonmcu.feature.type import FeatureType
 from mlonmcu.feature.features import get_available_features
 from mlonmcu.logging import get_logger
+from mlonmcu.setup.usage import run_checked
+from mlonmcu.setup.process import OutputBuffer, stream_process
 
 logger = get_logger()
 
 
-# TODO: merge together with mlonmcu.setup.utils.exec_getout
+class SimulationLimitExceeded(subprocess.TimeoutExpired):
+    """Raised if a simulation was stopped at its instruction or cycle limit.
+
+    Like a wall-clock timeout, the limit bounds the duration of a simulation, hence it is a TimeoutExpired and the run
+    gets the Timeout status.
+    """
+
+    def __init__(self, cmd, limit, unit="instructions"):
+        super().__init__(cmd, limit)
+        self.unit = unit
+
+    def __reduce__(self):
+        return (type(self), (self.cmd, self.timeout, self.unit))
+
+    def __str__(self):
+        return f"simulation did not finish within {self.timeout} {self.unit}"
+
+
 def execute(
     *args: List[str],
     ignore_output: bool = False,
@@ -38,6 +57,8 @@ def execute(
     print_func: Callable = print,
     handle_exit=None,
     err_func: Callable = logger.error,
+    timeout=None,
+    cancel_event=None,
     **kwargs,
 ) -> str:
     """Wrapper for running a program in a subprocess.
@@ -54,6 +75,10 @@ def execute(
         Function which should be used to print sysout messages.
     err_func : Callable
         Function which should be used to print errors.
+    timeout : float
+        Optional maximum runtime of the program in seconds.
+    cancel_event : threading.Event
+        Optional event to cancel the program from another thread.
     kwargs: dict
         Arbitrary keyword arguments passed through to the subprocess.
 
@@ -65,41 +90,31 @@ def execute(
     logger.debug("- Executing: %s", str(args))
     if ignore_output:
         assert not live
-        subprocess.run(args, **kwargs, check=True)
+        run_checked(args, **kwargs)
         return None
 
-    out_str = ""
-    if live:
-        with subprocess.Popen(
-            args,
+    output = OutputBuffer()
+    try:
+        exit_code = stream_process(
+            list(args),
+            output=output,
+            line_func=(lambda line: print_func(line)) if live else None,
+            timeout=timeout,
+            cancel_event=cancel_event,
             **kwargs,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-        ) as process:
-            for line in process.stdout:
-                new_line = line.decode(errors="replace")
-                out_str = out_str + new_line
-                print_func(new_line.replace("\n", ""))
-            exit_code = None
-            while exit_code is None:
-                exit_code = process.poll()
-            if handle_exit is not None:
-                exit_code = handle_exit(exit_code)
-            assert exit_code == 0, "The process returned an non-zero exit code {}! (CMD: `{}`)".format(
-                exit_code, " ".join(list(map(str, args)))
-            )
-    else:
-        p = subprocess.Popen([i for i in args], **kwargs, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-        out_str = p.communicate()[0].decode(errors="replace")
-        exit_code = p.poll()
-        print_func(out_str)
-        if handle_exit is not None:
-            exit_code = handle_exit(exit_code)
-        if exit_code != 0:
-            err_func(out_str)
-        assert exit_code == 0, "The process returned an non-zero exit code {}! (CMD: `{}`)".format(
-            exit_code, " ".join(list(map(str, args)))
         )
+        out_str = output.getvalue()
+    finally:
+        output.close()
+    if not live:
+        print_func(out_str)
+    if handle_exit is not None:
+        exit_code = handle_exit(exit_code)
+    if not live and exit_code != 0:
+        err_func(out_str)
+    assert exit_code == 0, "The process returned an non-zero exit code {}! (CMD: `{}`)".format(
+        exit_code, " ".join(list(map(str, args)))
+    )
 
     return out_str
 
@@ -24,7 +24,7 @@ from pathlib import Path
 
 from mlonmcu.logging import get_logger
 from mlonmcu.feature.features import SUPPORTED_TVM_BACKENDS
-from .common import cli, execute
+from .common import cli, execute, SimulationLimitExceeded
 from .target import Target
 from .metrics import Metrics
 
@@ -41,13 +41,13 @@ class Corstone300Target(Target):
         # "model": "cortex-m55",  # Options: cortex-m4, cortex-m7, cortex-m55 (Frequency is fixed at 25MHz)
         "model": None,  # Options: cortex-m4, cortex-m7, cortex-m55 (Frequency is fixed at 25MHz)
         # Warning: FVP is still M55 based!
-        "timeout_sec": 0,  # disabled
         "enable_ethosu": False,
         "enable_mvei": False,  # unused
         "enable_dsp": False,  # unused
         "ethosu_num_macs": 256,
         "extra_args": "",
         "enable_vext": False,
+        "max_cycles": 0,  # disabled (the FVP can not limit the number of instructions)
     }
     REQUIRED = [
         "corstone300.exe",
@@ -84,10 +84,29 @@ class Corstone300Target(Target):
     def ethosu_num_macs(self):
         return int(self.config["ethosu_num_macs"])
 
+    @property
+    def max_cycles(self):
+        return int(self.config["max_cycles"])
+
+    @property
+    def cycle_limit(self):
+        """The limit passed to the FVP, which can only count cycles."""
+        if self.max_cycles > 0:
+            return self.max_cycles
+        # The FVP is not cycle-accurate and executes one instruction per cycle
+        return self.max_instructions
+
     @property
     def fvp_exe(self):
         return Path(self.config["corstone300.exe"])
 
+    @property
+    def deterministic(self):
+        return True
+
+    def get_simulator_files(self):
+        return [self.fvp_exe]
+
     @property
     def gcc_prefix(self):
         return str(self.config["arm_gcc.install_dir"])
@@ -100,11 +119,6 @@ class Corstone300Target(Target):
     def extra_args(self):
         return str(self.config["extra_args"])
 
-    @property
-    def timeout_sec(self):
-        # 0 = off
-        return int(self.config["timeout_sec"])
-
     def get_default_fvp_args(self):
         return [
             "-C",
@@ -137,8 +151,10 @@ class Corstone300Target(Target):
         fvp_args.extend(self.get_default_fvp_args())
         if self.enable_ethosu:
             fvp_args.extend(self.get_ethosu_fvp_args())
-        if self.timeout_sec > 0:
-            fvp_args.extend(["--timelimit", str(self.timeout_sec)])
+        if self.max_instructions > 0 and self.max_cycles == 0:
+            logger.warning("corstone300 can not count instructions, using max_instructions as cycle limit")
+        if self.cycle_limit > 0:
+            fvp_args.extend(["--cyclelimit", str(self.cycle_limit)])
         if len(self.extra_args) > 0:
             fvp_args.extend(self.extra_args.split(" "))
 
@@ -150,6 +166,7 @@ class Corstone300Target(Target):
             *fvp_args,
             program,
             *args,
+            timeout=self.get_exec_timeout(),
             **kwargs,
         )
         return ret
@@ -163,6 +180,9 @@ class Corstone300Target(Target):
             if exit_code != 0:
                 logger.error("Execution failed - " + out)
                 raise RuntimeError(f"unexpected exit code: {exit_code}")
+        elif self.cycle_limit > 0:
+            # The FVP exits cleanly when reaching the cycle limit, the results of the truncated run are invalid
+            raise SimulationLimitExceeded(self.name, self.cycle_limit, unit="cycles")
         cpu_cycles = re.search(r"Total Cycles: (.*)", out)
 
         if not cpu_cycles:
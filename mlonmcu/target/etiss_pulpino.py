@@ -26,7 +26,7 @@ from pathlib import Path
 from mlonmcu.logging import get_logger
 from mlonmcu.artifact import Artifact, ArtifactFormat
 from mlonmcu.feature.features import SUPPORTED_TVM_BACKENDS
-from .common import cli, execute
+from .common import cli, execute, SimulationLimitExceeded
 from .riscv import RISCVTarget
 from .metrics import Metrics
 
@@ -124,6 +124,21 @@ class EtissPulpinoTarget(RISCVTarget):
     def cpu_arch(self):
         return self.config["cpu_arch"]
 
+    @property
+    def deterministic(self):
+        # Interactive debugging sessions can not be replayed
+        return not (self.debug_etiss or self.gdbserver_enable)
+
+    def get_simulator_files(self):
+        # The library is replaced by every installation of ETISS, scanning the whole installation is not required
+        etiss_dir = Path(self.etiss_dir)
+        return [
+            etiss_dir / "bin" / "bare_etiss_processor",
+            etiss_dir / "lib" / "libETISS.so",
+            Path(self.etiss_script),
+            self.metrics_script,
+        ]
+
     # TODO: other properties
 
     def write_ini(self, path):
@@ -139,6 +154,8 @@ class EtissPulpinoTarget(RISCVTarget):
             f.write(f"simple_mem_system.memseg_length_01={hex(self.ram_size)}\n")
             f.write("\n")
             f.write(f"arch.cpu_cycle_time_ps={self.cycle_time_ps}\n")
+            if self.max_instructions > 0:
+                f.write(f"simple_mem_system.max_instructions={self.max_instructions}\n")
 
             if self.gdbserver_enable:
                 f.write("[Plugin gdbserver]\n")
@@ -174,17 +191,15 @@ class EtissPulpinoTarget(RISCVTarget):
             plugins_str = " ".join(self.plugins)  # TODO: find out separator
             etiss_script_args.extend(["-p", plugins_str])
 
-        if self.timeout_sec > 0:
-            raise NotImplementedError
-        else:
-            ret = execute(
-                Path(self.etiss_script).resolve(),
-                program,
-                *etiss_script_args,
-                *args,
-                cwd=cwd,
-                **kwargs,
-            )
+        ret = execute(
+            Path(self.etiss_script).resolve(),
+            program,
+            *etiss_script_args,
+            *args,
+            cwd=cwd,
+            timeout=self.get_exec_timeout(),
+            **kwargs,
+        )
         return ret
 
     def parse_stdout(self, out, handle_exit=None):
@@ -196,6 +211,8 @@ class EtissPulpinoTarget(RISCVTarget):
             if exit_code != 0:
                 logger.error("Execution failed - " + out)
                 raise RuntimeError(f"unexpected exit code: {exit_code}")
+        elif self.max_instructions > 0:
+            raise SimulationLimitExceeded(self.name, self.max_instructions)
         error_match = re.search(r"ETISS: Error: (.*)", out)
         if error_match:
             error_msg = error_match.group(1)
@@ -71,7 +71,7 @@ class HostX86Target(Target):
                 comm = f"127.0.0.1:{self.gdbserver_port}"
                 return execute(self.gdb_server_path, comm, program, *args, **kwargs)
 
-        return execute(program, *args, **kwargs)
+        return execute(program, *args, timeout=self.get_exec_timeout(), **kwargs)
 
     def get_arch(self):
         return "x86"
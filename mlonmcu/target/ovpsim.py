@@ -23,7 +23,7 @@ import re
 from pathlib import Path
 
 from mlonmcu.logging import get_logger
-from .common import cli, execute
+from .common import cli, execute, SimulationLimitExceeded
 from .riscv import RISCVTarget
 from .metrics import Metrics
 
@@ -54,6 +54,13 @@ class OVPSimTarget(RISCVTarget):
     def ovpsim_exe(self):
         return Path(self.config["ovpsim.exe"])
 
+    @property
+    def deterministic(self):
+        return True
+
+    def get_simulator_files(self):
+        return [self.ovpsim_exe]
+
     @property
     def variant(self):
         return str(self.config["variant"])
@@ -149,13 +156,14 @@ class OVPSimTarget(RISCVTarget):
         if len(self.extra_args) > 0:
             ovpsim_args.extend(self.extra_args.split(" "))
 
-        if self.timeout_sec > 0:
-            raise NotImplementedError
+        if self.max_instructions > 0:
+            ovpsim_args.extend(["--finishafter", str(self.max_instructions)])
 
         ret = execute(
             self.ovpsim_exe.resolve(),
             *ovpsim_args,
             *args,  # Does this work?
+            timeout=self.get_exec_timeout(),
             **kwargs,
         )
         return ret
@@ -168,6 +176,9 @@ class OVPSimTarget(RISCVTarget):
             cycles = None
         else:
             cycles = int(cpu_cycles.group(1).replace(",", ""))
+            # OVPsim reports the statistics as usual when stopping at the limit, the truncated run is invalid
+            if self.max_instructions > 0 and cycles >= self.max_instructions:
+                raise SimulationLimitExceeded(self.name, self.max_instructions)
         mips = None  # TODO: parse mips?
         mips_match = re.search(r"  Simulated MIPS:(.*)", out)
         if mips_match:
@@ -72,7 +72,6 @@ class RISCVTarget(Target):
 
     DEFAULTS = {
         **Target.DEFAULTS,
-        "timeout_sec": 0,  # disabled
         "extra_args": "",
         "arch": "rv32gc",
         "abi": "ilp32d",
@@ -105,10 +104,6 @@ class RISCVTarget(Target):
                 ret = [ret]  # TODO: properly split quoted args
         return ret
 
-    @property
-    def timeout_sec(self):
-        return int(self.config["timeout_sec"])
-
     def get_target_system(self):
         return "generic_riscv"
 
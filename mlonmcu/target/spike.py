@@ -25,7 +25,7 @@ from pathlib import Path
 from mlonmcu.logging import get_logger
 from mlonmcu.config import str2bool
 from mlonmcu.feature.features import SUPPORTED_TVM_BACKENDS
-from .common import cli, execute
+from .common import cli, execute, SimulationLimitExceeded
 from .riscv import RISCVTarget
 from .metrics import Metrics
 
@@ -58,6 +58,13 @@ class SpikeTarget(RISCVTarget):
     def spike_pk(self):
         return Path(self.config["spike.pk"])
 
+    @property
+    def deterministic(self):
+        return True
+
+    def get_simulator_files(self):
+        return [self.spike_exe, self.spike_pk]
+
     @property
     def enable_vext(self):
         return bool(self.config["enable_vext"])
@@ -113,8 +120,8 @@ class SpikeTarget(RISCVTarget):
         else:
             assert self.vlen == 0
 
-        if self.timeout_sec > 0:
-            raise NotImplementedError
+        if self.max_instructions > 0:
+            spike_args.append(f"--instructions={self.max_instructions}")
 
         ret = execute(
             self.spike_exe.resolve(),
@@ -123,6 +130,7 @@ class SpikeTarget(RISCVTarget):
             *spikepk_args,
             program,
             *args,
+            timeout=self.get_exec_timeout(),
             **kwargs,
         )
         return ret
@@ -133,6 +141,8 @@ class SpikeTarget(RISCVTarget):
         else:
             cpu_cycles = re.search(r"Total Cycles: (.*)", out)
         if not cpu_cycles:
+            if self.max_instructions > 0:
+                raise SimulationLimitExceeded(self.name, self.max_instructions)
             logger.warning("unexpected script output (cycles)")
             cycles = None
         else:
@@ -38,6 +38,14 @@ from .common import execute
 from .metrics import Metrics
 
 
+def restore_target(factory, args, state):
+    """Recreate an instance of a target class which was generated by a factory function (used for pickling)."""
+    cls = factory(*args)
+    target = cls.__new__(cls)
+    target.__setstate__(state)
+    return target
+
+
 class Target:
     """Base target class
 
@@ -60,6 +68,8 @@ class Target:
     FEATURES = []
     DEFAULTS = {
         "print_outputs": False,
+        "timeout_sec": 0,  # disabled
+        "max_instructions": 0,  # disabled
     }
 
     REQUIRED = []
@@ -78,16 +88,49 @@ class Target:
         self.inspect_program = "readelf"
         self.inspect_program_args = ["--all"]
         self.env = os.environ
-        self.artifacts = []
 
     @property
     def print_outputs(self):
         value = self.config["print_outputs"]
         return str2bool(value) if not isinstance(value, (bool, int)) else value
 
+    @property
+    def timeout_sec(self):
+        """Maximum wall-clock time of a simulation in seconds (0 = off)."""
+        return int(self.config["timeout_sec"])
+
+    @property
+    def max_instructions(self):
+        """Maximum number of simulated instructions (0 = off)."""
+        return int(self.config["max_instructions"])
+
+    @property
+    def deterministic(self):
+        """Returns true if simulating the same executable with the same configuration always yields equal results."""
+        return False
+
+    def get_simulator_files(self):
+        """Return the files (executables, scripts,...) the results of this target depend on.
+
+        Directories are not scanned, hence installations should be represented by a file which changes with every
+        installation instead.
+        """
+        return []
+
     def __repr__(self):
         return f"Target({self.name})"
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if state["env"] is os.environ:
+            state["env"] = None  # The environment of the current process can not be pickled
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.env is None:
+            self.env = os.environ
+
     def process_features(self, features):
         if features is None:
             return []
@@ -98,6 +141,10 @@ class Target:
             feature.add_target_callback(self.name, self.callbacks)
         return features
 
+    def get_exec_timeout(self):
+        """Return the timeout in seconds enforced on simulations by the subprocess layer (None if disabled)."""
+        return self.timeout_sec if self.timeout_sec > 0 else None
+
     def exec(self, program: Path, *args, cwd=os.getcwd(), **kwargs):
         """Use target to execute a executable with given arguments"""
         raise NotImplementedError
@@ -140,10 +187,10 @@ class Target:
             f"{self.name}_out.log", content=out, fmt=ArtifactFormat.TEXT
         )  # TODO: rename to tvmaot_out.log?
         artifacts.append(stdout_artifact)
-        self.artifacts = artifacts
+        return artifacts
 
-    def export_metrics(self, path):
-        assert len(self.artifacts) > 0, "No artifacts found, please run generate_metrics() first"
+    def export_metrics(self, path, artifacts):
+        assert len(artifacts) > 0, "No artifacts found, please run generate_metrics() first"
 
         if not isinstance(path, Path):
             path = Path(path)
@@ -153,7 +200,7 @@ class Target:
             assert (
                 path.is_dir()
             ), "The supplied path does not exists."  # Make sure it actually exists (we do not create it by default)
-            for artifact in self.artifacts:
+            for artifact in artifacts:
                 artifact.export(path)
         else:
             raise NotImplementedError
@@ -0,0 +1,70 @@
+"""Benchmark for the assembly of session reports with a large number of runs.
+
+Example: python scripts/bench_report.py --runs 1000 2000 5000 10000 --legacy
+"""
+import io
+import time
+import argparse
+
+import pandas as pd
+
+from mlonmcu.report import Report
+
+
+def generate_reports(num_runs):
+    """Create one single-row report per run similar to Run.get_report."""
+    reports = []
+    for i in range(num_runs):
+        report = Report()
+        pre = {"Session": 0, "Run": i, "Model": "model", "Backend": "backend", "Target": "target", "Num": 1}
+        main = {"Total Cycles": 1000 + i, "Total ROM": 200, "Total RAM": 100}
+        post = {"Features": ["feature"], "Config": {"key": i}, "Postprocesses": [], "Comment": "-"}
+        report.set(pre=[pre], main=[main], post=[post])
+        reports.append(report)
+    return reports
+
+
+def assemble(reports):
+    """Merge the per-run reports like Session.get_reports and export the result twice."""
+    merged = Report()
+    merged.add(reports)
+    for _ in range(2):  # session directory and results directory
+        merged.df.to_csv(io.StringIO(), index=False)
+    return merged
+
+
+def assemble_legacy(reports):
+    """Repeated pd.concat as done by the previous Report implementation."""
+    pre_df, main_df, post_df = pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+    for report in reports:
+        pre_df = pd.concat([pre_df, report.pre_df], axis=0).reset_index(drop=True)
+        main_df = pd.concat([main_df, report.main_df], axis=0).reset_index(drop=True)
+        post_df = pd.concat([post_df, report.post_df], axis=0).reset_index(drop=True)
+    for _ in range(2):  # The combined dataframe was rebuilt on every access
+        df = pd.concat([pre_df, main_df, post_df], axis=1)
+        df.to_csv(io.StringIO(), index=False)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the time required to assemble session reports")
+    parser.add_argument("--runs", type=int, nargs="+", default=[1000, 2000, 5000, 10000], help="Number of runs")
+    parser.add_argument("--legacy", action="store_true", help="Also measure the previous pd.concat approach")
+    args = parser.parse_args()
+    print(f"{'Runs':>8} {'Report [s]':>12}" + (f" {'Legacy [s]':>12}" if args.legacy else ""))
+    for num_runs in args.runs:
+        reports = generate_reports(num_runs)
+        start = time.perf_counter()
+        assemble(reports)
+        duration = time.perf_counter() - start
+        line = f"{num_runs:>8} {duration:>12.3f}"
+        if args.legacy:
+            reports = generate_reports(num_runs)
+            start = time.perf_counter()
+            assemble_legacy(reports)
+            line += f" {time.perf_counter() - start:>12.3f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Benchmark for the orchestration overhead of sessions using stand-in components.
+
+The frontend, backend, platform and target used here do not invoke any external tools. They produce synthetic
+artifacts instantly or after a configurable sleep/CPU load, hence the measured time and memory is mostly spent in the
+session, run, report and artifact code of MLonMCU.
+
+Example: python scripts/bench_session.py --runs 10 100 1000 --parallel 1 4 16 --mode per-stage per-run
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import resource
+import tempfile
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+from mlonmcu.artifact import Artifact, ArtifactFormat
+from mlonmcu.flow.backend import Backend
+from mlonmcu.flow.framework import Framework
+from mlonmcu.logging import set_log_level
+from mlonmcu.models.frontend import Frontend
+from mlonmcu.platform.platform import CompilePlatform, TargetPlatform
+from mlonmcu.session.session import Session
+from mlonmcu.target.metrics import Metrics
+from mlonmcu.target.target import Target
+
+LOAD = {"sleep": 0.0, "cpu": 0.0, "size": 0}  # Synthetic load of every stage, updated via the command line
+
+
+def _work(sleep, cpu):
+    """Simulate the work of a stage by sleeping and/or spinning for the given durations in seconds."""
+    if sleep > 0:
+        time.sleep(sleep)
+    if cpu > 0:
+        end = time.thread_time() + cpu
+        while time.thread_time() < end:
+            pass
+
+
+class BenchFrontend(Frontend):
+    def __init__(self, features=None, config=None):
+        super().__init__("benchfe", input_formats=[], output_formats=[], features=features, config=config)
+
+    def produce_artifacts(self, model):
+        pass
+
+    def generate_models(self, model):
+        _work(LOAD["sleep"], LOAD["cpu"])
+        return [Artifact("model.bin", raw=os.urandom(LOAD["size"]), fmt=ArtifactFormat.RAW)]
+
+    def process_metadata(self, model, cfg=None):
+        return None
+
+
+class BenchFramework(Framework):
+    name = "benchfw"
+    REQUIRED = []
+
+
+class BenchBackend(Backend):
+    name = "benchbackend"
+
+    def __init__(self, features=None, config=None):
+        super().__init__(framework="benchfw", features=features, config=config)
+
+    def load_model(self, model):
+        self.model = model
+
+    def generate_code(self):
+        _work(LOAD["sleep"], LOAD["cpu"])
+        return [
+            Artifact("default.c", content="int main() { return 0; }\n" * 16, fmt=ArtifactFormat.SOURCE),
+            Artifact("default.tar", raw=os.urandom(LOAD["size"]), fmt=ArtifactFormat.RAW),
+        ]
+
+
+class BenchPlatform(CompilePlatform, TargetPlatform):
+    def __init__(self, features=None, config=None):
+        super().__init__("benchplatform", features=features, config=config)
+
+    def init_directory(self, path=None, context=None):
+        pass
+
+    def generate_elf(self, src, target, model=None, num=1, data_file=None):
+        _work(LOAD["sleep"], LOAD["cpu"])
+        metrics = Metrics()
+        metrics.add("Total ROM", 1024)
+        metrics.add("Total RAM", 512)
+        return [
+            Artifact("generic_mlif", raw=os.urandom(max(LOAD["size"], 1)), fmt=ArtifactFormat.RAW),
+            Artifact("metrics.csv", content=metrics.to_csv(), fmt=ArtifactFormat.TEXT),
+        ]
+
+
+class BenchTarget(Target):
+    def __init__(self, platform, features=None, config=None):
+        super().__init__("benchtarget", features=features, config=config)
+        self.platform = platform
+
+    def get_metrics(self, elf, directory, handle_exit=None, num=None):
+        _work(LOAD["sleep"], LOAD["cpu"])
+        metrics = Metrics()
+        metrics.add("Total Cycles", 100000)
+        return metrics, "Program exited with code 0\n" * 8, []
+
+    def get_arch(self):
+        return "bench"
+
+
+def create_runs(session, num_runs, config):
+    """Add runs using a set of distinct models, hence stages can not be shared between runs."""
+    for i in range(num_runs):
+        run = session.create_run(config=config)
+        platform = BenchPlatform(config=config)
+        run.model = SimpleNamespace(name=f"model{i}", paths=[], config={})
+        run.frontends = [BenchFrontend(config=config)]
+        run.framework = BenchFramework(config=config)
+        run.backend = BenchBackend(config=config)
+        run.platforms = [platform]
+        run.target = BenchTarget(platform, config=config)
+
+
+def benchmark(num_runs, per_stage, parallel, executor, config, memory=False):
+    """Process a session with the given number of runs and return the measurements."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        results_dir = Path(tmp_dir) / "results"
+        results_dir.mkdir()
+        context = SimpleNamespace(environment=SimpleNamespace(paths={"results": SimpleNamespace(path=results_dir)}))
+        if memory:
+            tracemalloc.start()
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+        session = Session(label="bench", idx=0, dir=Path(tmp_dir) / "session", config=config)
+        create_runs(session, num_runs, config)
+        setup_time = time.perf_counter() - start
+        start_cpu = time.thread_time()
+        success = session.process_runs(
+            per_stage=per_stage,
+            num_workers=parallel,
+            context=context,
+            export=True,
+            executor=executor,
+        )
+        total_time = time.perf_counter() - start
+        main_cpu = time.thread_time() - start_cpu
+        stage_cpu = sum(usage.cpu_time for run in session.runs for usage in run.stage_usage.values())
+        result = {
+            "runs": num_runs,
+            "mode": "per-stage" if per_stage else "per-run",
+            "parallel": parallel,
+            "executor": executor,
+            "success": success,
+            "setup_time": setup_time,
+            "total_time": total_time,
+            "main_cpu_time": main_cpu,
+            "stage_cpu_time": stage_cpu,
+            "rss_growth_mb": (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024,
+        }
+        if memory:
+            result["peak_traced_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+            tracemalloc.stop()
+        session.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the orchestration overhead of MLonMCU sessions")
+    parser.add_argument("--runs", type=int, nargs="+", default=[10, 100, 1000, 10000], help="Number of runs")
+    parser.add_argument(
+        "--mode", nargs="+", choices=["per-stage", "per-run"], default=["per-stage", "per-run"], help="Scheduling"
+    )
+    parser.add_argument("--parallel", type=int, nargs="+", default=[1, 4, 16], help="Number of workers")
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread", help="Worker type")
+    parser.add_argument("--sleep", type=float, default=0.0, help="Synthetic sleep per stage in seconds")
+    parser.add_argument("--cpu", type=float, default=0.0, help="Synthetic CPU load per stage in seconds")
+    parser.add_argument("--size", type=int, default=1024, help="Size of the synthetic binary artifacts in bytes")
+    parser.add_argument("--memory", action="store_true", help="Trace python memory allocations (slow)")
+    parser.add_argument(
+        "-c", "--config", nargs="+", default=[], metavar="KEY=VALUE", help="Additional session/run configuration"
+    )
+    parser.add_argument("--output", type=str, default=None, help="Write the results to a JSON file")
+    args = parser.parse_args()
+    LOAD.update(sleep=args.sleep, cpu=args.cpu, size=args.size)
+    config = dict(item.split("=", 1) for item in args.config)
+    set_log_level(logging.WARNING)
+
+    results = []
+    header = ["Runs", "Mode", "Parallel", "Setup [s]", "Total [s]", "Per Run [ms]", "Main CPU [s]", "Stage CPU [s]"]
+    header += ["RSS Growth [MB]"] + (["Peak Traced [MB]"] if args.memory else [])
+    print(" ".join(f"{column:>16}" for column in header))
+    for num_runs in args.runs:
+        for mode in args.mode:
+            for parallel in args.parallel:
+                result = benchmark(num_runs, mode == "per-stage", parallel, args.executor, config, memory=args.memory)
+                results.append(result)
+                row = [num_runs, mode, parallel, f"{result['setup_time']:.3f}", f"{result['total_time']:.3f}"]
+                row += [f"{1000 * result['total_time'] / num_runs:.2f}", f"{result['main_cpu_time']:.3f}"]
+                row += [f"{result['stage_cpu_time']:.3f}", f"{result['rss_growth_mb']:.1f}"]
+                if args.memory:
+                    row.append(f"{result['peak_traced_mb']:.1f}")
+                print(" ".join(f"{value:>16}" for value in row))
+                sys.stdout.flush()
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark comparing the latency of cold (one tvmc process per build) and warm (tvmc server) compilations.
+
+Example: python scripts/bench_tvmc.py model.tflite --tvm-pythonpath tvm/python --tvm-build-dir tvm/build
+    --tvm-configs-dir tvm/configs --repeat 5 --parallel 1 4
+"""
+import sys
+import time
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+
+from mlonmcu.setup import utils
+from mlonmcu.flow.tvm.backend.python_utils import prepare_python_environment
+from mlonmcu.flow.tvm.backend.tvmc_server import TVMCServer
+
+DEFAULT_TVMC_ARGS = ["--target", "c", "--runtime", "crt", "--executor", "aot", "-f", "mlf"]
+
+
+def compile_cold(env, args, out_dir):
+    out = str(out_dir / "out.tar")
+    utils.python("-m", "tvm.driver.tvmc", "compile", *args, "--output", out, env=env, print_output=False, cwd=out_dir)
+
+
+def compile_warm(server, args, out_dir):
+    server.invoke("compile", *args, "--output", str(out_dir / "out.tar"), cwd=out_dir)
+
+
+def measure(func, repeat, parallel):
+    """Return the average latency of the given compile function in seconds and the total wall time."""
+    latencies = []
+
+    def _worker():
+        for _ in range(repeat):
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                start = time.perf_counter()
+                func(Path(tmp_dir))
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=_worker) for _ in range(parallel)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(latencies) / len(latencies), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the latency of tvmc compilations with and without server")
+    parser.add_argument("model", type=str, help="Model file passed to tvmc")
+    parser.add_argument("--tvm-pythonpath", type=str, required=True, help="Python directory of TVM")
+    parser.add_argument("--tvm-build-dir", type=str, required=True, help="Build directory of TVM")
+    parser.add_argument("--tvm-configs-dir", type=str, required=True, help="Configs directory of TVM")
+    parser.add_argument("--repeat", type=int, default=5, help="Compilations per thread")
+    parser.add_argument("--parallel", type=int, nargs="+", default=[1], help="Number of concurrent compilations")
+    parser.add_argument("--tvmc-args", nargs=argparse.REMAINDER, default=DEFAULT_TVMC_ARGS, help="Compile options")
+    args = parser.parse_args()
+    env = prepare_python_environment(args.tvm_pythonpath, args.tvm_build_dir, args.tvm_configs_dir)
+    tvmc_args = [str(Path(args.model).resolve()), *args.tvmc_args]
+
+    print(f"{'Parallel':>8} {'Mode':>8} {'Latency [s]':>12} {'Total [s]':>12}")
+    for parallel in args.parallel:
+        latency, total = measure(lambda out_dir: compile_cold(env, tvmc_args, out_dir), args.repeat, parallel)
+        print(f"{parallel:>8} {'cold':>8} {latency:>12.3f} {total:>12.3f}")
+        server = TVMCServer(env, max_workers=parallel)
+        start = time.perf_counter()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            compile_warm(server, tvmc_args, Path(tmp_dir))  # Includes the startup of the first worker
+        print(f"{parallel:>8} {'startup':>8} {time.perf_counter() - start:>12.3f} {'-':>12}")
+        latency, total = measure(lambda out_dir: compile_warm(server, tvmc_args, out_dir), args.repeat, parallel)
+        print(f"{parallel:>8} {'warm':>8} {latency:>12.3f} {total:>12.3f}")
+        server.close()
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -18,7 +18,14 @@
 #
 """Unit tests for the artifact submodule."""
 
-from mlonmcu.artifact import Artifact, ArtifactFormat, lookup_artifacts
+import io
+import json
+import stat
+import tarfile
+
+import pytest
+
+from mlonmcu.artifact import Artifact, ArtifactFormat, lookup_artifacts, set_extract_dir
 
 
 def test_lookup_artifacts():
@@ -36,3 +43,133 @@ def test_lookup_artifacts():
     assert lookup_artifacts(artifacts, fmt=ArtifactFormat.RAW) == [third]
     assert lookup_artifacts(artifacts, flags={"test"}) == [third, fourth]
     assert lookup_artifacts(artifacts, flags={"test", "sw"}) == [third]
+
+
+def test_artifact_evict(tmp_path):
+    text = Artifact("foo.txt", content="foo\r\nbar", fmt=ArtifactFormat.TEXT)
+    raw = Artifact("foo.bin", raw=b"\x00\x01", fmt=ArtifactFormat.RAW)
+    assert not text.evict()  # Not exported yet
+    for artifact in [text, raw]:
+        artifact.export(tmp_path)
+        assert artifact.evict()
+        assert artifact.evicted
+        artifact.export(tmp_path)  # Must not truncate the file holding the data
+    assert text.content == "foo\r\nbar"
+    assert raw.raw == b"\x00\x01"
+    other = tmp_path / "other"
+    other.mkdir()
+    raw.export(other)
+    assert (other / "foo.bin").read_bytes() == b"\x00\x01"
+    detached = raw.detach()
+    (tmp_path / "foo.bin").unlink()
+    assert detached.raw == b"\x00\x01"
+    assert detached.path is None
+
+
+def test_artifact_export_once(tmp_path):
+    artifact = Artifact("foo.bin", raw=b"foo", fmt=ArtifactFormat.RAW)
+    artifact.export(tmp_path)
+    filename = tmp_path / "foo.bin"
+    mtime = filename.stat().st_mtime_ns
+    artifact.export(tmp_path)
+    assert filename.stat().st_mtime_ns == mtime  # Not written again
+    other = tmp_path / "other"
+    other.mkdir()
+    artifact.export(other)
+    assert (other / "foo.bin").stat().st_ino == filename.stat().st_ino  # Hardlinked
+    artifact.raw = b"bar"  # Modified artifacts are exported again without touching linked files
+    artifact.export(other)
+    assert (other / "foo.bin").read_bytes() == b"bar"
+    assert filename.read_bytes() == b"foo"
+
+
+def test_artifact_evict_shared_filename(tmp_path):
+    # Two stages exporting the same filename to the same directory
+    compile_metrics = Artifact("metrics.csv", content="ROM\n100\n", fmt=ArtifactFormat.TEXT)
+    run_metrics = Artifact("metrics.csv", content="Cycles\n5\n", fmt=ArtifactFormat.TEXT)
+    compile_metrics.export(tmp_path)
+    assert compile_metrics.evict()
+    run_metrics.export(tmp_path)
+    assert run_metrics.evict()
+    assert compile_metrics.content == "ROM\n100\n"
+    assert run_metrics.content == "Cycles\n5\n"
+    # Modifications of the data on disk are detected instead of returning wrong data
+    with open(tmp_path / "metrics.csv", "a") as handle:
+        handle.write("6\n")
+    with pytest.raises(RuntimeError, match="modified"):
+        run_metrics.content
+
+
+def test_artifact_export_replaced(tmp_path):
+    first = Artifact("metrics.csv", content="ROM\n100\n", fmt=ArtifactFormat.TEXT)
+    second = Artifact("metrics.csv", content="Cycles\n5\n", fmt=ArtifactFormat.TEXT)
+    first.export(tmp_path)
+    second.export(tmp_path)
+    # The export of the first artifact was replaced and has to be written again
+    first.export(tmp_path)
+    assert (tmp_path / "metrics.csv").read_text() == "ROM\n100\n"
+    # Artifacts can not be evicted once their export was replaced by another artifact
+    second.export(tmp_path)
+    assert not first.evict()
+    assert first.content == "ROM\n100\n"
+    # Copied paths are exported again as well
+    source = tmp_path / "source.txt"
+    source.write_text("foo")
+    path = Artifact("source.txt", path=source, fmt=ArtifactFormat.PATH)
+    dest = tmp_path / "dest"
+    dest.mkdir()
+    path.export(dest)
+    (dest / "source.txt").unlink()
+    (dest / "source.txt").write_text("bar")
+    path.export(dest)
+    assert (dest / "source.txt").read_text() == "foo"
+
+
+def _create_mlf(files):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w") as tar:
+        for name, data in files.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buf.getvalue()
+
+
+def test_artifact_mlf_extract(tmp_path):
+    set_extract_dir(tmp_path / "mlf")
+    try:
+        metadata = {"modules": {"default": {"memory": {}}}}
+        raw = _create_mlf({"metadata.json": json.dumps(metadata).encode(), "codegen/host/src/lib0.c": b"int x;"})
+        first = Artifact("default.tar", raw=raw, fmt=ArtifactFormat.MLF, archive=True)
+        second = Artifact("default.tar", raw=raw, fmt=ArtifactFormat.MLF, archive=True)
+        extracted = first.extract()
+        assert extracted.parent == tmp_path / "mlf"
+        assert second.extract() == extracted  # Equal archives share the extraction
+        assert first.metadata == metadata
+        assert len(list((tmp_path / "mlf").iterdir())) == 1
+        run_dir = tmp_path / "run"
+        run_dir.mkdir()
+        first.export(run_dir, extract=True)
+        exported = run_dir / "codegen" / "host" / "src" / "lib0.c"
+        assert exported.stat().st_ino == (extracted / "codegen" / "host" / "src" / "lib0.c").stat().st_ino
+        # The shared files can not be modified via the exports
+        assert not exported.stat().st_mode & (stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH)
+        assert (run_dir / "default.tar").read_bytes() == raw
+        first.raw = _create_mlf({"metadata.json": b"{}"})  # Modified archives are extracted again
+        assert first.extract() != extracted
+        assert first.metadata == {}
+    finally:
+        set_extract_dir(None)
+
+
+@pytest.mark.skipif(not hasattr(tarfile, "data_filter"), reason="requires tarfile extraction filters")
+def test_artifact_mlf_extract_unsafe(tmp_path):
+    set_extract_dir(tmp_path / "mlf")
+    try:
+        artifact = Artifact("default.tar", raw=_create_mlf({"../evil.txt": b"evil"}), fmt=ArtifactFormat.MLF)
+        with pytest.raises(tarfile.TarError):
+            artifact.extract()
+        assert not (tmp_path / "evil.txt").exists()
+        assert list((tmp_path / "mlf").iterdir()) == []
+    finally:
+        set_extract_dir(None)
@@ -0,0 +1,31 @@
+#
+# Copyright (c) 2022 TUM Department of Electrical and Computer Engineering.
+#
+# This file is part of MLonMCU.
+# See https://github.com/tum-ei-eda/mlonmcu.git for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import mock
+
+from mlonmcu.platform.espidf_target import create_espidf_target
+
+
+def test_espidf_target_timeout():
+    platform = mock.Mock()
+    platform.run.return_value = ""
+    target_cls = create_espidf_target("esp32", platform)
+    target_cls().exec("program")
+    assert platform.run.call_args.kwargs["timeout"] is None  # Disabled by default
+    target_cls(config={"esp32.timeout_sec": 30}).exec("program")
+    assert platform.run.call_args.kwargs["timeout"] == 30
@@ -0,0 +1,36 @@
+#
+# Copyright (c) 2022 TUM Department of Electrical and Computer Engineering.
+#
+# This file is part of MLonMCU.
+# See https://github.com/tum-ei-eda/mlonmcu.git for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import pickle
+
+from mlonmcu.target.target import Target
+from mlonmcu.platform.mlif_target import create_mlif_target
+
+
+class DummyPlatform:
+    validate_outputs = False
+
+
+def test_mlif_target_pickle():
+    target_cls = create_mlif_target("dummy", DummyPlatform())
+    target = target_cls(config={"dummy.print_outputs": True})
+    restored = pickle.loads(pickle.dumps(target))
+    assert isinstance(restored, Target)
+    assert restored.name == "dummy"
+    assert restored.config == target.config
+    assert restored.env is not None
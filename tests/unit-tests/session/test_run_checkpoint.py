@@ -0,0 +1,122 @@
+#
+# Copyright (c) 2022 TUM Department of Electrical and Computer Engineering.
+#
+# This file is part of MLonMCU.
+# See https://github.com/tum-ei-eda/mlonmcu.git for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Unit tests for checkpointing and resuming runs."""
+
+from mlonmcu.session.session import Session
+from mlonmcu.session.run import Run, RunStage
+from mlonmcu.artifact import Artifact, ArtifactFormat
+
+
+def test_run_checkpoint(tmp_path):
+    session = Session(idx=0, dir=tmp_path / "session")
+    run = session.create_run(config={"run.export_optional": True})
+    run.artifacts_per_stage[RunStage.LOAD] = [Artifact("foo.txt", content="foo", fmt=ArtifactFormat.TEXT)]
+    run.completed[RunStage.LOAD] = True
+    run.write_checkpoint()
+    checkpoint_file = run.dir / "run.pkl"
+    assert checkpoint_file.is_file()
+
+    restored = Run.from_file(checkpoint_file, session=session)
+    assert restored.session is session
+    assert restored.idx == run.idx
+    assert restored.dir == run.dir
+    assert restored.completed[RunStage.LOAD]
+    assert restored.artifacts_per_stage[RunStage.LOAD][0].content == "foo"
+    assert restored.export_optional
+
+
+def test_run_checkpoint_artifact_references(tmp_path):
+    session = Session(idx=0, dir=tmp_path / "session")
+    run = session.create_run()
+    model = Artifact("model.tflite", raw=b"\x01" * 100000, fmt=ArtifactFormat.RAW)
+    run.artifacts_per_stage[RunStage.LOAD] = [model]
+    run.completed[RunStage.LOAD] = True
+    run.write_checkpoint()
+    checkpoint_file = run.dir / "run.pkl"
+    assert checkpoint_file.stat().st_size < 100000  # Only a reference to the data is pickled
+    data_file = run.dir / "checkpoint" / "load" / "0-model.tflite"
+    assert data_file.read_bytes() == model.raw
+    assert model._raw is not None  # The data is still held in memory
+    stamp = data_file.stat().st_mtime_ns
+    run.artifacts_per_stage[RunStage.BUILD] = [Artifact("default.c", content="int x;", fmt=ArtifactFormat.SOURCE)]
+    run.completed[RunStage.BUILD] = True
+    run.write_checkpoint()
+    assert data_file.stat().st_mtime_ns == stamp  # Written only once
+
+    restored = Run.from_file(checkpoint_file, session=session)
+    restored_model = restored.artifacts_per_stage[RunStage.LOAD][0]
+    assert restored_model.evicted
+    assert restored_model.raw == model.raw
+    assert restored.artifacts_per_stage[RunStage.BUILD][0].content == "int x;"
+
+
+def test_session_resume(tmp_path):
+    session = Session(idx=0, dir=tmp_path / "session")
+    first = session.create_run()
+    session.create_run()  # Never reached a checkpoint
+    session.enumerate_runs()
+    first.write_checkpoint()
+    session.close()
+
+    archived = Session(idx=0, archived=True, dir=tmp_path / "session")
+    placeholders = []
+    for run in session.runs:
+        placeholder = Run()
+        placeholder.archived = True
+        placeholder.dir = run.dir
+        placeholders.append(placeholder)
+    archived.runs = placeholders
+    archived.resume()
+    assert archived.active
+    assert len(archived.runs) == 1
+    assert archived.runs[0].idx == first.idx
+    assert archived.next_run_idx == first.idx + 1
+
+
+def test_run_checkpoint_disabled(tmp_path):
+    session = Session(idx=0, dir=tmp_path / "session")
+    run = session.create_run(config={"run.checkpoint": False})
+    run.write_checkpoint()
+    assert not (run.dir / "run.pkl").exists()
+
+
+def test_run_export_evict_same_filename(tmp_path):
+    session = Session(idx=0, dir=tmp_path / "session")
+    run = session.create_run()
+    run.has_stage = lambda stage: stage in [RunStage.COMPILE, RunStage.RUN]
+    run.artifacts_per_stage[RunStage.COMPILE] = [
+        Artifact("generic_mlif", raw=b"elf", fmt=ArtifactFormat.RAW),
+        Artifact("metrics.csv", content="Total ROM,Total RAM\n100,50\n", fmt=ArtifactFormat.TEXT),
+    ]
+    run.artifacts_per_stage[RunStage.RUN] = [
+        Artifact("metrics.csv", content="Total Cycles\n5\n", fmt=ArtifactFormat.TEXT)
+    ]
+    run.completed[RunStage.COMPILE] = True
+    run.completed[RunStage.RUN] = True
+    assert run.evict_artifacts
+    run.export()
+    assert all(artifact.evicted for artifact in run.artifacts_per_stage[RunStage.COMPILE])
+    main = run.get_report().main_df
+    assert main["Total ROM"][0] == 100
+    assert main["Total RAM"][0] == 50
+    assert main["Total Cycles"][0] == 5
+    # The evicted data is kept in the session directory, on the same filesystem as the exports
+    assert all(artifact._spill.parent == session.spill_dir for artifact in run.artifacts_per_stage[RunStage.COMPILE])
+    session.close()
+    assert not session.spill_dir.exists()
@@ -0,0 +1,90 @@
+#
+# Copyright (c) 2022 TUM Department of Electrical and Computer Engineering.
+#
+# This file is part of MLonMCU.
+# See https://github.com/tum-ei-eda/mlonmcu.git for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Unit tests for deriving runs from other runs."""
+
+from mlonmcu.session.session import Session
+from mlonmcu.session.run import Run, RunStage
+from mlonmcu.artifact import Artifact, ArtifactFormat
+from mlonmcu.models import SUPPORTED_FRONTENDS
+from mlonmcu.config import filter_config
+
+
+class _Component:
+    def __init__(self, config):
+        self.config = filter_config(config, "foo", {"bar": "0"}, [])
+
+
+def test_run_copy(tmp_path):
+    session = Session(idx=0, dir=tmp_path / "session")
+    run = session.create_run(config={"foo.bar": "1"})
+    session.enumerate_runs()
+    model = Artifact("model.tflite", raw=b"\x00" * 1024, fmt=ArtifactFormat.RAW)
+    run.artifacts_per_stage[RunStage.LOAD] = [model]
+    run.completed[RunStage.LOAD] = True
+    run.add_backend(_Component(run.config))
+
+    new = run.copy()
+    assert new.session is session
+    assert new.idx != run.idx
+    # Components and artifacts are shared until one of the runs is modified
+    assert new.backend is run.backend
+    assert new.artifacts_per_stage is run.artifacts_per_stage
+    new.config["foo.bar"] = "2"
+    assert run.config["foo.bar"] == "1"
+    new.lock()
+    new.unlock()
+    assert new.backend is not run.backend
+    assert new.backend.config["bar"] == "2"  # The copied component is bound to the config of the new run
+    assert run.backend.config["bar"] == "1"
+    # The data of the artifacts is still shared, the objects are not
+    new_model = new.artifacts_per_stage[RunStage.LOAD][0]
+    assert new_model is not model
+    assert new_model.raw is model.raw
+    assert new.completed[RunStage.LOAD]
+    assert new.dir != run.dir and new.dir.is_dir()
+
+
+def test_run_copy_directory(tmp_path):
+    session = Session(idx=0, dir=tmp_path / "session")
+    run = session.create_run()
+    session.runs = [run.copy(), run.copy()]
+    session.enumerate_runs()
+    # The copies only get a directory once they are numbered by the session, hence none is left behind
+    assert sorted(path.name for path in session.runs_dir.iterdir() if not path.is_symlink()) == ["0", "1"]
+    assert [run.dir for run in session.runs] == [session.runs_dir / "0", session.runs_dir / "1"]
+
+
+def test_run_copy_without_session():
+    run = Run()
+    new = run.copy()
+    assert new.session is None
+    assert new.dir != run.dir
+
+
+def test_run_shared_frontends(tmp_path):
+    session = Session(idx=0, dir=tmp_path / "session")
+    run = session.create_run(config={})
+    frontend = run.init_component(SUPPORTED_FRONTENDS["tflite"], shared=True)
+    run.add_frontend(frontend)
+    other = session.create_run(config={})
+    assert other.init_component(SUPPORTED_FRONTENDS["tflite"], shared=True) is frontend
+    assert run.copy().frontends[0] is frontend
+    different = session.create_run(config={"tflite.visualize_enable": True})
+    assert different.init_component(SUPPORTED_FRONTENDS["tflite"], shared=True) is not frontend
+    assert other.init_component(SUPPORTED_FRONTENDS["tflite"]) is not frontend
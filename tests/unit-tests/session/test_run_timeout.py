@@ -0,0 +1,65 @@
+#
+# Copyright (c) 2022 TUM Department of Electrical and Computer Engineering.
+#
+# This file is part of MLonMCU.
+# See https://github.com/tum-ei-eda/mlonmcu.git for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Unit tests for runs exceeding their timeout."""
+
+import pickle
+import subprocess
+
+import pytest
+
+from mlonmcu.session.session import Session
+from mlonmcu.session.run import RunStage
+from mlonmcu.target.common import SimulationLimitExceeded
+
+
+@pytest.mark.parametrize(
+    "error", [subprocess.TimeoutExpired(["sim"], 5), SimulationLimitExceeded("sim", 1000, unit="cycles")]
+)
+def test_run_timeout(tmp_path, error):
+    session = Session(idx=0, dir=tmp_path / "session")
+    run = session.create_run()
+
+    def _simulate():
+        raise error
+
+    run.has_stage = lambda stage: stage == RunStage.RUN
+    run.run = _simulate
+    run.process(until=RunStage.RUN)
+    assert run.failing
+    assert run.timed_out
+    assert run.failure.startswith("Timeout:")
+    post = run.get_report().post_df
+    assert post["Failing"][0]
+    assert post["Status"][0] == "Timeout"
+
+    other = session.create_run()
+    other.has_stage = run.has_stage
+    other.run = lambda: 1 / 0
+    other.process(until=RunStage.RUN)
+    assert other.failing
+    assert not other.timed_out
+    assert other.get_report().post_df["Status"][0] == "Failed"
+
+
+def test_simulation_limit_exceeded():
+    error = SimulationLimitExceeded("spike", 1000)
+    assert str(error) == "simulation did not finish within 1000 instructions"
+    copied = pickle.loads(pickle.dumps(error))  # Failures are passed back from worker processes
+    assert isinstance(copied, SimulationLimitExceeded)
+    assert str(copied) == str(error)
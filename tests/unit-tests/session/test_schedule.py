@@ -0,0 +1,189 @@
+#
+# Copyright (c) 2022 TUM Department of Electrical and Computer Engineering.
+#
+# This file is part of MLonMCU.
+# See https://github.com/tum-ei-eda/mlonmcu.git for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Unit tests for scheduling the stages of the runs in a session."""
+
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from mlonmcu.session.session import Session
+from mlonmcu.session.run import Run, RunStage
+from mlonmcu.session.shared import SharedStage
+from mlonmcu.artifact import Artifact, ArtifactFormat
+
+STAGES = [RunStage.LOAD, RunStage.BUILD, RunStage.RUN]
+
+
+def _create_session(tmp_path, config=None):
+    config = {"session.trace": False, "session.use_jobserver": False, **(config if config else {})}
+    return Session(idx=0, dir=tmp_path / "session", config=config)
+
+
+def _create_context(tmp_path):
+    results_dir = tmp_path / "results"
+    results_dir.mkdir()
+    return SimpleNamespace(environment=SimpleNamespace(paths={"results": SimpleNamespace(path=results_dir)}))
+
+
+def _create_runs(session, num, events, fail=None, delay=0.0, artifacts=False):
+    """Create runs with stand-in stage functions which record the order of the processed stages."""
+    lock = threading.Lock()
+    runs = []
+    for _ in range(num):
+        run = session.create_run(config={"run.checkpoint": False})
+
+        def _stage(run=run, stage=None):
+            with lock:
+                events.append(("start", run.idx, stage))
+            time.sleep(delay)
+            with lock:
+                events.append(("end", run.idx, stage))
+            if fail is not None and fail(run, stage):
+                raise RuntimeError(f"{RunStage(stage).name} failed")
+            if artifacts and stage != RunStage.RUN:  # The report expects the metrics of a real simulation
+                name = f"{RunStage(stage).name}.txt"
+                run.artifacts_per_stage[stage] = [Artifact(name, content=str(os.getpid()), fmt=ArtifactFormat.TEXT)]
+            run.completed[stage] = True
+
+        run.has_stage = lambda stage: stage in STAGES
+        run.load = lambda _stage=_stage: _stage(stage=RunStage.LOAD)
+        run.build = lambda _stage=_stage: _stage(stage=RunStage.BUILD)
+        run.run = lambda _stage=_stage: _stage(stage=RunStage.RUN)
+        runs.append(run)
+    return runs
+
+
+def _max_concurrency(events, stage):
+    current = 0
+    maximum = 0
+    for kind, _, stage_ in events:
+        if stage_ != stage:
+            continue
+        current += 1 if kind == "start" else -1
+        maximum = max(maximum, current)
+    return maximum
+
+
+def test_schedule_order(tmp_path):
+    session = _create_session(tmp_path, config={"session.share_stages": False})
+    events = []
+    _create_runs(session, 2, events)
+    session.process_runs(until=RunStage.DONE, num_workers=1, context=_create_context(tmp_path))
+    starts = [(idx, stage) for kind, idx, stage in events if kind == "start"]
+    # Later stages are preferred, hence the first run is finished before the second one starts
+    assert starts == [(0, stage) for stage in STAGES] + [(1, stage) for stage in STAGES]
+    assert all(run.completed[RunStage.RUN] for run in session.runs)
+
+
+def test_schedule_stage_workers(tmp_path):
+    session = _create_session(tmp_path, config={"session.share_stages": False, "session.build_workers": 1})
+    events = []
+    _create_runs(session, 4, events, delay=0.05)
+    session.process_runs(until=RunStage.DONE, num_workers=4, context=_create_context(tmp_path))
+    assert _max_concurrency(events, RunStage.BUILD) == 1
+    assert _max_concurrency(events, RunStage.LOAD) > 1
+    assert all(run.completed[RunStage.RUN] for run in session.runs)
+
+
+def test_schedule_fail_fast(tmp_path):
+    session = _create_session(tmp_path, config={"session.share_stages": False})
+    events = []
+    _create_runs(session, 3, events, fail=lambda run, stage: stage == RunStage.BUILD)
+    session.process_runs(until=RunStage.DONE, num_workers=1, context=_create_context(tmp_path))
+    builds = [idx for kind, idx, stage in events if kind == "start" and stage == RunStage.BUILD]
+    assert builds == [0]  # The runs with equal inputs are failed right away
+    assert all(run.failing for run in session.runs)
+    assert session.runs[0].failure_origin is None
+    assert [run.failure_origin for run in session.runs[1:]] == [0, 0]
+    assert not any(run.completed[RunStage.RUN] for run in session.runs)
+
+
+@pytest.mark.parametrize("per_stage", [False, True])
+def test_schedule_drain_and_export(tmp_path, monkeypatch, per_stage):
+    exports = []
+    monkeypatch.setattr(Run, "export_results", lambda self: exports.append(self.idx))
+    session = _create_session(tmp_path, config={"session.share_stages": False, "session.fail_fast": False})
+    events = []
+    _create_runs(session, 6, events, fail=lambda run, stage: run.idx % 3 == 0 and stage == RunStage.BUILD)
+    session.process_runs(
+        until=RunStage.DONE, num_workers=3, per_stage=per_stage, export=True, context=_create_context(tmp_path)
+    )
+    for run in session.runs:
+        assert run.failing == (run.idx % 3 == 0)
+        assert run.failing or run.completed[RunStage.RUN]
+    # Every run is exported exactly once, regardless of the stage it stopped at
+    assert sorted(exports) == list(range(6))
+
+
+@pytest.mark.parametrize("per_stage", [False, True])
+def test_schedule_shared_stages(tmp_path, monkeypatch, per_stage):
+    wait = SharedStage.wait
+
+    def _wait(self):
+        # Followers are only dispatched once the leader published the stage
+        assert self.event.is_set()
+        return wait(self)
+
+    monkeypatch.setattr(SharedStage, "wait", _wait)
+    session = _create_session(tmp_path)
+    events = []
+    _create_runs(session, 4, events, delay=0.05)
+    session.process_runs(until=RunStage.DONE, num_workers=4, per_stage=per_stage, context=_create_context(tmp_path))
+    for stage in STAGES:
+        starts = [idx for kind, idx, stage_ in events if kind == "start" and stage_ == stage]
+        assert len(starts) == (4 if stage == RunStage.RUN else 1)  # RUN is never shared
+    assert all(run.completed[RunStage.RUN] for run in session.runs)
+
+
+def test_schedule_processes(tmp_path):
+    session = _create_session(tmp_path)
+    events = []
+    _create_runs(session, 3, events, fail=lambda run, stage: run.idx == 2 and stage == RunStage.RUN, artifacts=True)
+    configs = [run.config for run in session.runs]
+    session.process_runs(until=RunStage.DONE, num_workers=2, executor="process", context=_create_context(tmp_path))
+    assert len(events) == 0  # The stages were processed in the workers
+    for run, config in zip(session.runs, configs):
+        assert run.session is session
+        assert run.config is config  # Only the results are merged into the run
+        for stage in STAGES[:-1]:
+            assert run.completed[stage]
+            assert run.stage_usage[stage] is not None
+            assert int(run.artifacts_per_stage[stage][0].content) != os.getpid()
+    assert [run.completed[RunStage.RUN] for run in session.runs] == [True, True, False]
+    assert session.runs[2].failing
+    assert session.runs[2].failure == "RuntimeError: RUN failed"
+
+
+def test_plan_runs(tmp_path, monkeypatch):
+    def _get_report(self):
+        raise AssertionError("the plan should not generate the full report")
+
+    monkeypatch.setattr(Run, "get_report", _get_report)
+    session = _create_session(tmp_path)
+    events = []
+    _create_runs(session, 3, events)
+    report = session.plan_runs(until=RunStage.RUN)
+    assert len(events) == 0
+    rows = report.to_records()
+    assert [row["Run"] for row in rows] == [0, 1, 2]
+    assert [row["Stages"] for row in rows] == ["LOAD,BUILD,RUN"] * 3
+    assert [row["Shared"] for row in rows] == ["-", "LOAD,BUILD", "LOAD,BUILD"]
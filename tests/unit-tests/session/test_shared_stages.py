@@ -0,0 +1,53 @@
+#
+# Copyright (c) 2022 TUM Department of Electrical and Computer Engineering.
+#
+# This file is part of MLonMCU.
+# See https://github.com/tum-ei-eda/mlonmcu.git for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Unit tests for sharing stages between runs."""
+
+import threading
+
+from mlonmcu.session.shared import SharedStageRegistry
+
+
+def test_shared_stage_registry():
+    registry = SharedStageRegistry()
+    leader, entry = registry.claim("foo", "run0")
+    assert leader
+    assert entry.leader == "run0"
+    follower, entry_ = registry.claim("foo", "run1")
+    assert not follower
+    assert entry_ is entry
+    other, _ = registry.claim("bar", "run1")
+    assert other
+    assert registry.num_shared == 1
+
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(entry_.wait()))
+    waiter.start()
+    entry.publish("run0")
+    waiter.join(timeout=10)
+    assert results == ["run0"]
+
+
+def test_shared_stage_failed():
+    registry = SharedStageRegistry()
+    _, entry = registry.claim("foo", "run0")
+    entry.publish(None, error="RuntimeError: boom")
+    _, entry_ = registry.claim("foo", "run1")
+    assert entry_.wait() is None
+    assert entry_.error == "RuntimeError: boom"
+    assert registry.fail_fast
@@ -0,0 +1,134 @@
+#
+# Copyright (c) 2022 TUM Department of Electrical and Computer Engineering.
+#
+# This file is part of MLonMCU.
+# See https://github.com/tum-ei-eda/mlonmcu.git for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Unit tests for the stage cache of the session submodule."""
+
+import os
+from types import SimpleNamespace
+
+from mlonmcu.artifact import Artifact, ArtifactFormat
+from mlonmcu.session.cache import StageCache, hash_data, hash_artifacts, hash_files
+from mlonmcu.session.session import Session
+from mlonmcu.session.run import RunStage
+
+
+def test_stage_cache_hash():
+    first = Artifact("model.tflite", raw=b"\x00\x01", fmt=ArtifactFormat.RAW)
+    second = Artifact("model.tflite", raw=b"\x00\x02", fmt=ArtifactFormat.RAW)
+    log = Artifact("out.log", content="foo", fmt=ArtifactFormat.TEXT)
+    assert hash_artifacts([first]) == hash_artifacts([first])
+    assert hash_artifacts([first]) != hash_artifacts([second])
+    assert hash_artifacts([first, log]) != hash_artifacts([first])
+    assert hash_artifacts([first, log], skip_fmts=[ArtifactFormat.TEXT]) == hash_artifacts([first])
+    assert hash_data("tvmaot", {"a": 1, "b": 2}) == hash_data("tvmaot", {"b": 2, "a": 1})
+    assert hash_data("tvmaot", {"a": 1}) != hash_data("tvmrt", {"a": 1})
+
+
+def test_stage_cache_lookup(tmp_path):
+    cache = StageCache(tmp_path)
+    key = hash_data("foo")
+    assert cache.lookup("BUILD", key) is None
+    source = Artifact("default.c", content="int x;", fmt=ArtifactFormat.SOURCE)
+    source.export(tmp_path)
+    assert cache.store("BUILD", key, [source])
+    assert cache.lookup("COMPILE", key) is None
+    restored = cache.lookup("BUILD", key)
+    assert len(restored) == 1
+    assert restored[0].name == "default.c"
+    assert restored[0].content == "int x;"
+    assert not restored[0].exported
+    assert source.exported
+
+
+def test_stage_cache_skip_path(tmp_path):
+    cache = StageCache(tmp_path)
+    key = hash_data("bar")
+    artifact = Artifact("build", path=tmp_path, fmt=ArtifactFormat.PATH)
+    assert not cache.store("BUILD", key, [artifact])
+    assert cache.lookup("BUILD", key) is None
+
+
+def test_stage_cache_hash_files(tmp_path):
+    simulator = tmp_path / "bin" / "sim"
+    simulator.parent.mkdir()
+    simulator.write_text("v1")
+    library = tmp_path / "lib" / "libsim.so"
+    library.parent.mkdir()
+    library.write_text("v1")
+    before = hash_files([simulator, library])
+    assert hash_files([simulator, library]) == before
+    assert hash_files([simulator]) != before
+    (tmp_path / "lib" / "plugin.so").write_text("v1")  # Other files of the installation are not checked
+    assert hash_files([simulator, library]) == before
+    library.write_text("v1.1")
+    stat = library.stat()
+    os.utime(library, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    assert hash_files([simulator, library]) != before
+    assert hash_files([tmp_path / "missing"]) == hash_files([tmp_path / "missing"])
+
+
+def test_stage_cache_lookup_signature(tmp_path):
+    cache = StageCache(tmp_path)
+    key = hash_data("baz")
+    signature = hash_data("config")
+    assert not cache.lookup_signature("BUILD", signature)
+    source = Artifact("default.c", content="int x;", fmt=ArtifactFormat.SOURCE)
+    assert cache.store("BUILD", key, [source], signature=signature)
+    assert cache.lookup_signature("BUILD", signature)
+    assert not cache.lookup_signature("COMPILE", signature)
+    assert list(cache._get_signature_file("BUILD", signature).parent.glob("*.tmp")) == []
+    os.remove(cache._get_entry_file("BUILD", key))
+    assert not cache.lookup_signature("BUILD", signature)
+
+
+def test_session_hash_files(tmp_path):
+    session = Session(idx=0, dir=tmp_path / "session")
+    simulator = tmp_path / "sim"
+    simulator.write_text("v1")
+    before = session.hash_files([simulator])
+    assert before == hash_files([simulator])
+    stat = simulator.stat()
+    os.utime(simulator, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    assert session.hash_files([simulator]) == before  # Only checked once per session
+
+
+def test_run_sample_cache_verify(tmp_path):
+    session = Session(idx=0, dir=tmp_path / "session")
+    keys = [hash_data(i) for i in range(1000)]
+    run = session.create_run(config={"run.cache_verify": 0.25})
+    sampled = [key for key in keys if run.sample_cache_verify(key)]
+    assert sampled == [key for key in keys if run.sample_cache_verify(key)]  # Reproducible
+    assert 150 < len(sampled) < 350
+    assert not any(session.create_run(config={"run.cache_verify": 0.0}).sample_cache_verify(key) for key in keys)
+    assert all(session.create_run(config={"run.cache_verify": 1.0}).sample_cache_verify(key) for key in keys)
+
+
+def test_run_stage_signature_target(tmp_path):
+    session = Session(idx=0, dir=tmp_path / "session")
+    runs = [session.create_run() for _ in range(3)]
+    runs[0].target = SimpleNamespace(name="spike", config={"vlen": 0})
+    runs[1].target = SimpleNamespace(name="spike", config={"vlen": 128})
+    runs[2].target = SimpleNamespace(name="etiss", config={"vlen": 0})
+    # Only tuning and the later stages measure on or compile for the target
+    for stage in [RunStage.LOAD, RunStage.BUILD]:
+        assert len({run.get_stage_signature(stage) for run in runs}) == 1
+    for stage in [RunStage.TUNE, RunStage.COMPILE]:
+        assert len({run.get_stage_signature(stage) for run in runs}) == 3
+    for run in runs:
+        run.run_config["target_to_backend"] = True
+    assert len({run.get_stage_signature(RunStage.BUILD) for run in runs}) == 3
@@ -0,0 +1,44 @@
+#
+# Copyright (c) 2022 TUM Department of Electrical and Computer Engineering.
+#
+# This file is part of MLonMCU.
+# See https://github.com/tum-ei-eda/mlonmcu.git for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Unit tests for the database of previous stage durations."""
+
+import pytest
+
+from mlonmcu.session.history import StageHistory
+
+
+def test_stage_history(tmp_path):
+    history = StageHistory(tmp_path / "history.db", num_samples=2)
+    assert history.estimate(("model", "tvmaot", "spike", ""), "BUILD") is None
+    history.record(
+        [
+            (("model", "tvmaot", "spike", ""), "BUILD", 1.0),
+            (("model", "tvmaot", "spike", ""), "BUILD", 2.0),
+            (("model", "tvmaot", "spike", ""), "BUILD", 4.0),
+            (("model", "tvmaot", "spike", "debug,muriscvnn"), "BUILD", 9.0),
+        ]
+    )
+    # Only the most recent samples are kept
+    assert history.estimate(("model", "tvmaot", "spike", ""), "BUILD") == pytest.approx(3.0)
+    # Unknown feature sets fall back to the average over all samples of the model, backend and target
+    assert history.estimate(("model", "tvmaot", "spike", "unknown"), "BUILD") == pytest.approx(5.0)
+    assert history.estimate(("model", "tvmaot", "spike", ""), "RUN") is None
+    # The estimates are persistent
+    restored = StageHistory(tmp_path / "history.db")
+    assert restored.estimate(("model", "tvmaot", "spike", ""), "BUILD") == pytest.approx(3.0)
@@ -16,3 +16,32 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import copy
+
+from mlonmcu.config import ConfigLayer, filter_config
+
+
+def test_config_layer():
+    base = ConfigLayer({"foo.a": 1, "foo.b": 2, "bar.a": 3, "baz": 4})
+    run = base.derive({"foo.a": 1, "foo.b": 5, "foo.c": 6, "baz": 4})
+    assert run.data == {"foo.b": 5, "foo.c": 6}  # Only the overrides are stored
+    assert run["foo.b"] == 5 and run["bar.a"] == 3
+    assert len(run) == 5
+    assert run.keys_with_prefix("foo") == {"foo.a", "foo.b", "foo.c"}
+    run["bar.a"] = 7
+    assert base["bar.a"] == 3
+    new = copy.deepcopy(run)
+    new["foo.b"] = 8
+    assert new.parent is base and run["foo.b"] == 5
+
+
+def test_config_view():
+    layer = ConfigLayer({"foo.a": 1, "foo.x.y": 2, "foo.req": 3, "req": 4, "afoo.a": 5}).derive({"foo.b": 6})
+    cfg = filter_config(layer, "foo", {"a": 0, "d": 7}, ["req"])
+    assert dict(cfg) == {"a": 1, "x.y": 2, "req": 3, "b": 6, "d": 7}  # afoo.a does not match the prefix
+    del layer.parent["afoo.a"]
+    assert cfg == filter_config(dict(layer), "foo", {"a": 0, "d": 7}, ["req"])
+    cfg["a"] = 8
+    assert cfg["a"] == 8 and layer["foo.a"] == 1
+    del cfg["d"]
+    assert "d" not in cfg
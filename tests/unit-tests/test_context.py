@@ -56,6 +56,24 @@ def test_open_context(monkeypatch, fake_environment_directory: Path, fake_config
     assert ctx.is_clean
 
 
+def test_discard_session(monkeypatch, fake_environment_directory: Path, fake_config_home: Path):
+    monkeypatch.chdir(fake_environment_directory)
+    create_minimal_environment_yaml(fake_environment_directory / "environment.yml")
+    with mlonmcu.context.MlonMcuContext() as context:
+        first = context.create_session()
+        first.close()
+        second = context.create_session()
+        latest = context.environment.paths["temp"].path / "sessions" / "latest"
+        assert latest.resolve() == second.dir.resolve()
+        context.discard_session(second)
+        assert not second.dir.exists()
+        assert latest.resolve() == first.dir.resolve()  # Restored instead of dangling
+        assert context.create_session().idx == second.idx
+        context.discard_session(context.sessions[-1])
+        context.discard_session(first)
+        assert not latest.is_symlink()
+
+
 # def test_open_context_by_env(monkeypatch, fake_environment_directory: Path, fake_config_home: Path):
 #     monkeypatch.chdir(fake_environment_directory)
 #     create_minimal_environment_yaml(fake_environment_directory / "environment.yml")
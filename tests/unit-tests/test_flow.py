@@ -16,3 +16,126 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+"""Unit tests for the flow module."""
+
+import os
+import threading
+import subprocess
+import multiprocessing
+
+import pytest
+
+from mlonmcu.flow.tvm.backend.tvmc_server import TVMCServer, get_tvmc_server
+from mlonmcu.setup.process import ProcessCancelled
+from mlonmcu.setup.usage import measure_usage
+
+# Stand-in for the tvmc entry point which echoes its arguments or exits/crashes on request
+FAKE_TVMC = """
+import os
+import sys
+import time
+
+
+def main():
+    args = sys.argv[1:]
+    if args[-1] == "crash":
+        os._exit(3)
+    if args[-1] == "hang":
+        time.sleep(60)
+    print(os.getcwd())
+    print(" ".join(args), file=sys.stderr)
+    sys.exit(2 if args[-1] == "fail" else 0)
+"""
+
+
+@pytest.fixture
+def fake_tvm(tmp_path):
+    package = tmp_path / "python" / "tvm" / "driver" / "tvmc"
+    package.mkdir(parents=True)
+    for directory in [package.parent.parent, package.parent]:
+        (directory / "__init__.py").write_text("")
+    (package / "__init__.py").write_text("")
+    (package / "main.py").write_text(FAKE_TVMC)
+    env = dict(os.environ)
+    env["PYTHONPATH"] = str(tmp_path / "python")
+    return env
+
+
+def test_tvmc_server(fake_tvm, tmp_path):
+    server = TVMCServer(fake_tvm, max_workers=2)
+    out = server.invoke("compile", "model.tflite", cwd=tmp_path)
+    assert out.splitlines() == [str(tmp_path), "compile model.tflite"]
+    assert server.num_workers == 1
+    with pytest.raises(AssertionError):
+        server.invoke("compile", "fail")
+    # Concurrent commands are processed by up to two workers
+    results = []
+    threads = [threading.Thread(target=lambda i=i: results.append(server.invoke("compile", str(i)))) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+    assert len(results) == 8
+    assert server.num_workers <= 2
+    # Crashed workers are replaced
+    with pytest.raises(RuntimeError):
+        server.invoke("compile", "crash")
+    assert "compile again" in server.invoke("compile", "again")
+    server.close()
+    assert server.num_workers == 0
+
+
+def test_tvmc_server_broken_tvm(tmp_path):
+    (tmp_path / "tvm").mkdir()
+    (tmp_path / "tvm" / "__init__.py").write_text("raise ImportError('broken')")
+    server = TVMCServer({**os.environ, "PYTHONPATH": str(tmp_path)}, max_workers=1)
+    with pytest.raises(RuntimeError, match="Unable to start tvmc worker"):
+        server.invoke("compile", "model.tflite")
+    assert server.num_workers == 0
+
+
+def test_tvmc_server_timeout(fake_tvm):
+    server = TVMCServer(fake_tvm, max_workers=1)
+    with pytest.raises(subprocess.TimeoutExpired):
+        server.invoke("compile", "hang", timeout=0.5)
+    assert server.num_workers == 0  # The busy worker was killed
+    cancel_event = threading.Event()
+    timer = threading.Timer(0.5, cancel_event.set)
+    timer.start()
+    with pytest.raises(ProcessCancelled):
+        server.invoke("compile", "hang", cancel_event=cancel_event)
+    timer.join()
+    assert server.num_workers == 0
+    assert "compile again" in server.invoke("compile", "again", timeout=60)
+    server.close()
+
+
+def test_tvmc_server_usage(fake_tvm):
+    server = TVMCServer(fake_tvm, max_workers=1)
+    with measure_usage() as usage:
+        server.invoke("compile", "model.tflite")
+    assert usage.num_processes == 1
+    assert usage.child_cpu_time >= 0.0
+    assert usage.max_rss > 0
+    server.close()
+
+
+@pytest.mark.skipif(not hasattr(os, "register_at_fork"), reason="requires fork")
+def test_tvmc_server_fork(fake_tvm):
+    server = get_tvmc_server(fake_tvm, max_workers=1)
+    server.invoke("compile", "model.tflite")
+
+    def _child(queue):
+        # The workers of the parent must not be used by forked children
+        child_server = get_tvmc_server(fake_tvm, max_workers=1)
+        queue.put((child_server is server, child_server.num_workers))
+
+    ctx = multiprocessing.get_context("fork")
+    queue = ctx.Queue()
+    process = ctx.Process(target=_child, args=(queue,))
+    process.start()
+    result = queue.get(timeout=60)
+    process.join(timeout=60)
+    assert result == (False, 0)
+    assert get_tvmc_server(fake_tvm) is server
+    server.close()
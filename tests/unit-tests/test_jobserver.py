@@ -0,0 +1,63 @@
+#
+# Copyright (c) 2022 TUM Department of Electrical and Computer Engineering.
+#
+# This file is part of MLonMCU.
+# See https://github.com/tum-ei-eda/mlonmcu.git for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Unit tests for the jobserver used to limit the number of parallel build jobs."""
+
+import threading
+
+from mlonmcu.setup.jobserver import Jobserver, get_jobserver, set_jobserver, hold_token
+
+
+def test_jobserver_tokens():
+    jobserver = Jobserver(2)
+    first = jobserver.acquire()
+    second = jobserver.acquire()
+    acquired = threading.Event()
+
+    def _take():
+        with jobserver.token():
+            acquired.set()
+
+    waiter = threading.Thread(target=_take)
+    waiter.start()
+    assert not acquired.wait(timeout=0.1)  # The pool is empty
+    jobserver.release(first)
+    assert acquired.wait(timeout=10)
+    waiter.join()
+    jobserver.release(second)
+    kwargs = jobserver.update_kwargs({"cwd": "/tmp"})
+    assert kwargs["cwd"] == "/tmp"
+    assert f"--jobserver-auth={jobserver.read_fd},{jobserver.write_fd}" in kwargs["env"]["MAKEFLAGS"]
+    assert kwargs["pass_fds"] == (jobserver.read_fd, jobserver.write_fd)
+    jobserver.close()
+
+
+def test_jobserver_global():
+    assert get_jobserver() is None
+    with hold_token():
+        pass
+    jobserver = Jobserver(1)
+    set_jobserver(jobserver)
+    try:
+        with hold_token():
+            pass
+        with hold_token():
+            pass
+    finally:
+        set_jobserver(None)
+        jobserver.close()
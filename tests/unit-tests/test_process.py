@@ -0,0 +1,95 @@
+#
+# Copyright (c) 2022 TUM Department of Electrical and Computer Engineering.
+#
+# This file is part of MLonMCU.
+# See https://github.com/tum-ei-eda/mlonmcu.git for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Unit tests for the subprocess engine."""
+
+import os
+import sys
+import time
+import threading
+import subprocess
+
+import pytest
+
+from mlonmcu.setup.process import OutputBuffer, ProcessCancelled, stream_process
+from mlonmcu.setup.utils import exec_getout
+from mlonmcu.target.common import execute
+
+
+def test_stream_process():
+    lines = []
+    output = OutputBuffer(spill_limit=1000)
+    script = "import sys\nfor i in range(1000): print(i)\nsys.stderr.write('done')\nsys.exit(3)"
+    exit_code = stream_process([sys.executable, "-c", script], output=output, line_func=lines.append)
+    assert exit_code == 3
+    assert output.file is not None  # Spilled to disk
+    assert output.getvalue().splitlines() == [str(i) for i in range(1000)] + ["done"]
+    assert lines == output.getvalue().splitlines()
+    output.close()
+    # Stop after the first matching line, the command would block otherwise
+    blocking = "import time\nfor i in range(11): print(i, flush=True)\ntime.sleep(60)"
+    start = time.monotonic()
+    exit_code = stream_process([sys.executable, "-c", blocking], line_func=lambda line: line == "10")
+    assert exit_code != 0
+    assert time.monotonic() - start < 30
+
+
+def test_stream_process_timeout_cancel():
+    cmd = [sys.executable, "-c", "import time; print('start', flush=True); time.sleep(60)"]
+    output = OutputBuffer()
+    with pytest.raises(subprocess.TimeoutExpired) as err:
+        stream_process(cmd, output=output, timeout=0.5)
+    assert err.value.output.strip() == "start"
+    event = threading.Event()
+    threading.Timer(0.5, event.set).start()
+    with pytest.raises(ProcessCancelled):
+        stream_process(cmd, cancel_event=event)
+
+
+@pytest.mark.skipif(os.name != "posix", reason="requires process groups")
+def test_stream_process_timeout_kills_group(tmp_path):
+    # The wrapper prints the pid of a child which would outlive it if only the wrapper was terminated
+    child = "import time; time.sleep(60)"
+    script = (
+        "import subprocess, sys, time\n"
+        f"p = subprocess.Popen([sys.executable, '-c', {child!r}])\n"
+        "print(p.pid, flush=True)\n"
+        "time.sleep(60)"
+    )
+    output = OutputBuffer()
+    with pytest.raises(subprocess.TimeoutExpired):
+        stream_process([sys.executable, "-c", script], output=output, timeout=1)
+    pid = int(output.getvalue().split()[0])
+    for _ in range(50):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            break
+        time.sleep(0.1)
+    else:
+        pytest.fail("child process is still running")
+
+
+def test_exec_getout_execute():
+    cmd = [sys.executable, "-c", "print('foo')"]
+    assert exec_getout(*cmd, print_output=False) == "foo\n"
+    printed = []
+    assert execute(*cmd, live=True, print_func=printed.append) == "foo\n"
+    assert printed == ["foo"]
+    with pytest.raises(AssertionError):
+        execute(sys.executable, "-c", "import sys; sys.exit(1)", print_func=printed.append, err_func=printed.append)
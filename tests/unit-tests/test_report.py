@@ -0,0 +1,99 @@
+#
+# Copyright (c) 2022 TUM Department of Electrical and Computer Engineering.
+#
+# This file is part of MLonMCU.
+# See https://github.com/tum-ei-eda/mlonmcu.git for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+import csv
+import json
+
+from mlonmcu.report import Report, ReportSink
+
+
+def _create_report(idx, failing=False):
+    report = Report()
+    post = {"Comment": "-"}
+    if failing:
+        post["Failing"] = True
+    report.set(pre=[{"Run": idx}], main=[{"Total Cycles": idx * 10}], post=[post])
+    return report
+
+
+def test_report_add():
+    merged = Report()
+    merged.add([_create_report(i, failing=i == 1) for i in range(3)])
+    df = merged.df
+    assert list(df.columns) == ["Run", "Total Cycles", "Comment", "Failing"]
+    assert list(df["Run"]) == [0, 1, 2]
+    assert df["Failing"].isna().sum() == 2
+    assert merged.df is df  # Cached until modified
+    merged.add(_create_report(3))
+    assert len(merged.df) == 4
+
+
+def test_report_inplace():
+    report = Report()
+    report.add([_create_report(i) for i in range(2)])
+    report.main_df["Average Cycles"] = report.main_df["Total Cycles"] / 2
+    assert "Average Cycles" in report.df.columns
+    report.post_df = report.post_df.rename(columns={"Comment": "Note"})
+    assert "Note" in report.df.columns
+
+
+def test_report_sink_csv(tmp_path):
+    sink = ReportSink(tmp_path / "report.csv")
+    sink.write_row({"Run": 0, "Failing": True})
+    sink.write(_create_report(1))
+    with open(tmp_path / "report.csv", "r", newline="") as handle:
+        rows = list(csv.DictReader(handle))
+    assert list(rows[0].keys()) == ["Run", "Failing", "Total Cycles", "Comment"]
+    assert rows[0]["Total Cycles"] == ""
+    assert rows[1] == {"Run": "1", "Failing": "", "Total Cycles": "10", "Comment": "-"}
+
+
+def test_report_sink_jsonl(tmp_path):
+    sink = ReportSink(tmp_path / "report.jsonl")
+    sink.write(_create_report(0))
+    sink.write(_create_report(1))
+    with open(tmp_path / "report.jsonl", "r") as handle:
+        rows = [json.loads(line) for line in handle]
+    assert [row["Run"] for row in rows] == [0, 1]
+
+
+def test_report_sink_jsonl_missing(tmp_path):
+    sink = ReportSink(tmp_path / "report.jsonl")
+    report = Report()
+    report.add([_create_report(0), _create_report(1, failing=True)])
+    report.df  # Missing cells are NaN once the dataframe was materialized
+    sink.write(report)
+    sink.write_row({"Run": 2, "Total Cycles": float("inf"), "Config": {"foo.bar": float("nan")}})
+    with open(tmp_path / "report.jsonl", "r") as handle:
+        lines = handle.read().splitlines()
+    assert "NaN" not in "".join(lines)
+    rows = [json.loads(line) for line in lines]
+    assert rows[0]["Failing"] is None
+    assert rows[1]["Failing"] is True
+    assert rows[2] == {"Run": 2, "Total Cycles": "inf", "Config": {"foo.bar": None}}
+
+
+def test_report_to_records():
+    report = Report()
+    report.add([_create_report(0), _create_report(1, failing=True)])
+    assert report.to_records() == [
+        {"Run": 0, "Total Cycles": 0, "Comment": "-"},
+        {"Run": 1, "Total Cycles": 10, "Comment": "-", "Failing": True},
+    ]
+    report.main_df  # Materialized parts are combined via the dataframe
+    assert report.to_records()[1]["Failing"]
@@ -20,6 +20,8 @@ import pytest
 import mock
 from mlonmcu.setup.task import get_combs, TaskFactory, TaskType, TaskGraph
 from mlonmcu.setup.setup import Setup
+from mlonmcu.setup.cache import TaskCache
+from mlonmcu.config import resolve_required_config
 
 TestTaskFactory = TaskFactory()
 
@@ -112,3 +114,26 @@ def test_task_graph():
     assert len(order) == len(nodes)
     assert order.index("NodeB") > order.index("NodeA") and order.index("NodeB") > order.index("NodeC")
     assert order.index("NodeC") > order.index("NodeA")
+
+
+def test_task_cache(tmp_path):
+    cache = TaskCache()
+    cache["tvm.build_dir"] = "default"
+    cache["tvm.build_dir", ("debug",)] = "debug"
+    cache["tvm.build_dir", ("riscv",)] = "riscv"
+    cache["tvm.build_dir", ("debug", "riscv")] = "debug_riscv"
+    assert cache.find_best_match("tvm.build_dir", ["debug", "foo"]) == "debug"
+    assert cache.find_best_match("tvm.build_dir", ["debug", "riscv"]) == "debug_riscv"
+    assert cache.find_best_match("tvm.build_dir") == "default"
+    # The most specific hint combination is used
+    assert resolve_required_config(["tvm.build_dir"], cache=cache, hints=["riscv"]) == {"tvm.build_dir": "riscv"}
+    assert resolve_required_config(["tvm.build_dir"], cache=cache, hints=["arm"]) == {"tvm.build_dir": "default"}
+    cache["tvm.build_dir", ("arm",)] = "arm"  # Invalidates memoized lookups
+    assert resolve_required_config(["tvm.build_dir"], cache=cache, hints=["arm"]) == {"tvm.build_dir": "arm"}
+
+    cache_file = tmp_path / "cache.ini"
+    cache.write_to_file(cache_file)
+    restored = TaskCache()
+    restored.read_from_file(cache_file)
+    assert restored.find_best_match("tvm.build_dir", ["debug", "riscv"]) == "debug_riscv"
+    assert len(restored) == len(cache)
@@ -23,6 +23,9 @@ from mlonmcu.target.common import execute, cli
 from mlonmcu.target.target import Target
 from mlonmcu.target.etiss_pulpino import EtissPulpinoTarget
 from mlonmcu.target.host_x86 import HostX86Target
+from mlonmcu.target.corstone300 import Corstone300Target
+from mlonmcu.target.ovpsim import OVPSimTarget
+from mlonmcu.target.common import SimulationLimitExceeded
 
 
 class CustomTarget(Target):
@@ -131,3 +134,29 @@ def test_target_host_x86(features, example_elf_file, capsys):
     t.exec("/bin/date")
 
     t.inspect(example_elf_file)
+
+
+def test_target_corstone300_limits():
+    config = {"corstone300.exe": "fvp", "cmsisnn.dir": "cmsis", "arm_gcc.install_dir": "gcc"}
+    t = Corstone300Target(config={**config, "corstone300.max_cycles": 1000})
+    out = "Total Cycles: 900\nApplication exit code: 0.\n"
+    assert t.parse_stdout(out) == 900
+    with pytest.raises(SimulationLimitExceeded, match="did not finish within 1000 cycles"):
+        t.parse_stdout("Total Cycles: 1000\n")
+    # The instruction limit is used as cycle limit
+    t = Corstone300Target(config={**config, "corstone300.max_instructions": 2000})
+    with mock.patch("mlonmcu.target.corstone300.execute") as execute_:
+        t.exec("program")
+    args = execute_.call_args.args
+    assert args[args.index("--cyclelimit") + 1] == "2000"
+    with pytest.raises(SimulationLimitExceeded, match="2000 cycles"):
+        t.parse_stdout("Total Cycles: 2000\n")
+
+
+def test_target_ovpsim_limits():
+    config = {"ovpsim.exe": "ovpsim", "riscv_gcc.install_dir": "gcc", "riscv_gcc.name": "riscv32"}
+    t = OVPSimTarget(config={**config, "ovpsim.max_instructions": 1000})
+    assert t.parse_stdout("  Simulated instructions: 999\n") == (999, None)
+    # OVPsim prints the statistics of truncated runs as well
+    with pytest.raises(SimulationLimitExceeded, match="1000 instructions"):
+        t.parse_stdout("  Simulated instructions: 1,000\n")
@@ -0,0 +1,72 @@
+#
+# Copyright (c) 2022 TUM Department of Electrical and Computer Engineering.
+#
+# This file is part of MLonMCU.
+# See https://github.com/tum-ei-eda/mlonmcu.git for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Unit tests for the trace recorder."""
+
+import sys
+import json
+import threading
+
+from mlonmcu.setup.trace import Tracer, set_tracer, trace_span
+from mlonmcu.setup.usage import run_checked
+
+
+def test_tracer(tmp_path):
+    tracer = Tracer(tmp_path / "trace")
+    set_tracer(tracer)
+    try:
+        with trace_span("BUILD", cat="stage"):
+            run_checked([sys.executable, "-c", "pass"])
+    finally:
+        set_tracer(None)
+    tracer.write(tmp_path / "trace.json")
+    assert not (tmp_path / "trace").exists()
+    with open(tmp_path / "trace.json", "r") as handle:
+        events = json.load(handle)["traceEvents"]
+    spans = {event["cat"]: event for event in events if event["ph"] == "X"}
+    assert set(spans.keys()) == {"stage", "command"}
+    stage, command = spans["stage"], spans["command"]
+    assert command["name"].startswith("python")
+    assert stage["ts"] <= command["ts"] and command["ts"] + command["dur"] <= stage["ts"] + stage["dur"]
+    assert stage["tid"] == command["tid"]
+    assert len([event for event in events if event["ph"] == "M"]) == 1
+
+
+def test_tracer_threads(tmp_path):
+    tracer = Tracer(tmp_path / "trace")
+    barrier = threading.Barrier(4)
+
+    def _record():
+        barrier.wait()
+        for i in range(50):
+            with tracer.span(f"span{i}"):
+                pass
+
+    threads = [threading.Thread(target=_record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(tracer.files) == 4  # One event file per thread
+    tracer.write(tmp_path / "trace.json")
+    assert len(tracer.files) == 0
+    with open(tmp_path / "trace.json", "r") as handle:
+        events = json.load(handle)["traceEvents"]
+    assert len([event for event in events if event["ph"] == "X"]) == 200
+    names = [event for event in events if event["ph"] == "M"]
+    assert len(names) == len({event["tid"] for event in names}) == 4
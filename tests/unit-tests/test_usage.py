@@ -0,0 +1,64 @@
+#
+# Copyright (c) 2022 TUM Department of Electrical and Computer Engineering.
+#
+# This file is part of MLonMCU.
+# See https://github.com/tum-ei-eda/mlonmcu.git for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Unit tests for measuring the resource usage of stages."""
+
+import sys
+import time
+import signal
+import subprocess
+
+import pytest
+
+from mlonmcu.setup.usage import Popen, measure_usage, run_checked, get_usage
+
+
+def test_measure_usage():
+    assert get_usage() is None
+    with measure_usage() as outer:
+        with measure_usage() as inner:
+            run_checked([sys.executable, "-c", "sum(range(1000000))"])
+        assert get_usage() is outer
+    assert get_usage() is None
+    assert inner.num_processes == 1
+    assert inner.child_cpu_time > 0
+    assert inner.max_rss > 0
+    assert outer.num_processes == 1
+    assert outer.wall_time >= inner.wall_time > 0
+
+
+def test_popen_poll_usage():
+    with measure_usage() as usage:
+        process = Popen([sys.executable, "-c", "sum(range(1000000))"])
+        while process.poll() is None:  # Reaping the child via poll() also records its usage
+            time.sleep(0.01)
+        assert process.wait() == 0
+    assert process.rusage is not None
+    assert usage.num_processes == 1
+    assert usage.child_cpu_time > 0
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="requires POSIX signals")
+def test_popen_wait_timeout():
+    with measure_usage() as usage:
+        with Popen([sys.executable, "-c", "import time; time.sleep(60)"]) as process:
+            with pytest.raises(subprocess.TimeoutExpired):
+                process.wait(timeout=0.1)
+            process.send_signal(signal.SIGTERM)
+            assert process.wait(timeout=60) == -signal.SIGTERM
+    assert usage.num_processes == 1